@@ -0,0 +1,178 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+from concurrency import CONCURRENCY_MANAGERS, DEADLOCK_POLICIES
+from engine import SimulationEngine, BACKOFF_POLICIES
+from workload import WorkloadConfig, generate_workload
+
+BENCHMARK_FORMAT_VERSION = 1
+
+BENCHMARK_WORKLOADS = {
+    'low_contention': dict(num_items=10000, key_distribution='uniform', read_ratio=0.8, txn_length=4),
+    'high_contention': dict(num_items=100, key_distribution='zipf', zipf_theta=0.99, read_ratio=0.5, txn_length=4),
+    'read_heavy': dict(num_items=1000, key_distribution='zipf', zipf_theta=0.8, read_ratio=0.95, txn_length=5),
+    'write_heavy': dict(num_items=1000, key_distribution='zipf', zipf_theta=0.8, read_ratio=0.2, txn_length=5),
+    'long_transactions': dict(num_items=1000, key_distribution='uniform', read_ratio=0.8, txn_length=20, length_distribution='geometric'),
+}
+
+BENCHMARK_MANAGERS = {name: (name, {}) for name in CONCURRENCY_MANAGERS}
+BENCHMARK_MANAGERS.update({
+    f"locking_{policy}": ('locking', {'deadlock_policy': policy})
+    for policy in DEADLOCK_POLICIES if policy != 'detection'
+})
+
+def benchmark_metrics(stats):
+    attempts = stats.commits + stats.aborts
+    return {
+        'commits_per_second': stats.throughput(),
+        'operations_per_second': stats.operations_per_second(),
+        'abort_rate': stats.aborts / attempts if attempts else 0.0,
+        'restart_rate': stats.restarts / attempts if attempts else 0.0,
+        'deadlocks': stats.deadlocks,
+        'messages_per_commit': stats.messages / stats.commits if stats.commits else 0.0,
+    }
+
+def run_case(manager_name, workload_name, num_transactions, seed, repeat, think_time=0.0, restart_aborted=False, max_restarts=None, backoff='immediate'):
+    mechanism, manager_options = BENCHMARK_MANAGERS[manager_name]
+    config = WorkloadConfig(num_transactions=num_transactions, seed=seed, **BENCHMARK_WORKLOADS[workload_name])
+    initial_data_items, transactions = generate_workload(config)
+
+    runs = []
+    for _ in range(repeat):
+        engine = SimulationEngine(
+            mechanism,
+            initial_data_items,
+            transactions,
+            manager_options=manager_options,
+            think_time=think_time,
+            restart_aborted=restart_aborted,
+            max_restarts=max_restarts,
+            backoff=backoff,
+            seed=seed,
+        )
+        engine.start()
+        runs.append(engine.run())
+
+    wall_times = [stats.wall_time for stats in runs]
+    median_run = sorted(runs, key=lambda stats: stats.wall_time)[len(runs) // 2]
+    return {
+        'mechanism': manager_name,
+        'manager_options': manager_options,
+        'workload': workload_name,
+        'config': config.as_dict(),
+        'repeat': repeat,
+        'wall_time_median': statistics.median(wall_times),
+        'wall_time_min': min(wall_times),
+        'wall_time_max': max(wall_times),
+        'metrics': benchmark_metrics(median_run),
+        'stats': median_run.as_dict(),
+    }
+
+def run_benchmarks(mechanisms=None, workloads=None, num_transactions=2000, seed=42, repeat=3, think_time=0.0,
+                   restart_aborted=False, max_restarts=None, backoff='immediate', progress_callback=None):
+    mechanisms = mechanisms or sorted(BENCHMARK_MANAGERS)
+    workloads = workloads or list(BENCHMARK_WORKLOADS)
+    results = []
+    for workload_name in workloads:
+        for mechanism in mechanisms:
+            result = run_case(mechanism, workload_name, num_transactions, seed, repeat, think_time, restart_aborted, max_restarts, backoff)
+            results.append(result)
+            if progress_callback is not None:
+                progress_callback(result)
+    return {
+        'format_version': BENCHMARK_FORMAT_VERSION,
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {
+            'num_transactions': num_transactions,
+            'seed': seed,
+            'repeat': repeat,
+            'think_time': think_time,
+            'restart_aborted': restart_aborted,
+            'max_restarts': max_restarts,
+            'backoff': backoff,
+        },
+        'results': results,
+    }
+
+def compare_results(current, baseline, metric='commits_per_second'):
+    previous = {(result['mechanism'], result['workload']): result['metrics'] for result in baseline['results']}
+    rows = []
+    for result in current['results']:
+        key = (result['mechanism'], result['workload'])
+        if key not in previous:
+            continue
+        old_value = previous[key].get(metric, 0.0)
+        new_value = result['metrics'].get(metric, 0.0)
+        change = (new_value - old_value) / old_value if old_value else 0.0
+        rows.append((result['workload'], result['mechanism'], old_value, new_value, change))
+    return rows
+
+def format_result(result):
+    metrics = result['metrics']
+    return (
+        f"{result['workload']:<18} {result['mechanism']:<22} "
+        f"{metrics['commits_per_second']:>10.1f} {metrics['operations_per_second']:>11.1f} "
+        f"{metrics['abort_rate']:>7.1%} {metrics['restart_rate']:>8.1%} "
+        f"{metrics['deadlocks']:>9} {metrics['messages_per_commit']:>9.2f}"
+    )
+
+BENCHMARK_HEADER = (
+    f"{'Workload':<18} {'Mechanism':<22} {'Commits/s':>10} {'Ops/s':>11} "
+    f"{'Aborts':>7} {'Restarts':>8} {'Deadlocks':>9} {'Msgs/txn':>9}"
+)
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the concurrency managers on standard workloads")
+    parser.add_argument("--mechanism", action="append", choices=sorted(BENCHMARK_MANAGERS), help="mechanism to benchmark (repeatable, default: all)")
+    parser.add_argument("--workload", action="append", choices=list(BENCHMARK_WORKLOADS), help="workload to run (repeatable, default: all)")
+    parser.add_argument("--transactions", type=int, default=2000, help="transactions per workload")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the median run by wall time is reported")
+    parser.add_argument("--think-time", type=float, default=0.0, help="simulated think time between a transaction's operations")
+    parser.add_argument("--restart", action="store_true", help="restart aborted transactions instead of dropping them")
+    parser.add_argument("--max-restarts", type=int, default=None, help="give up on a transaction after this many restarts")
+    parser.add_argument("--backoff", choices=BACKOFF_POLICIES, default="immediate", help="delay policy before restarting an aborted transaction")
+    parser.add_argument("--output", default=None, help="write results as JSON to this file")
+    parser.add_argument("--baseline", default=None, help="JSON results of an earlier run to compare throughput against")
+    return parser
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    if args.repeat < 1:
+        raise ValueError("--repeat must be at least 1")
+
+    print(BENCHMARK_HEADER)
+    report = run_benchmarks(
+        args.mechanism,
+        args.workload,
+        num_transactions=args.transactions,
+        seed=args.seed,
+        repeat=args.repeat,
+        think_time=args.think_time,
+        restart_aborted=args.restart,
+        max_restarts=args.max_restarts,
+        backoff=args.backoff,
+        progress_callback=lambda result: print(format_result(result), flush=True),
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        print()
+        print(f"{'Workload':<18} {'Mechanism':<22} {'Baseline':>10} {'Current':>10} {'Change':>8}")
+        for workload_name, mechanism, old_value, new_value, change in compare_results(report, baseline):
+            print(f"{workload_name:<18} {mechanism:<22} {old_value:>10.1f} {new_value:>10.1f} {change:>+8.1%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1341 @@
+import bisect
+import random
+import zlib
+from collections import deque
+
+class DataItem:
+    __slots__ = ('name', 'value', 'read_timestamp', 'write_timestamp')
+
+    def __init__(self, name, initial_value):
+        self.name = name
+        self.value = initial_value
+        self.reset_concurrency_state()
+
+    def reset_concurrency_state(self):
+        self.read_timestamp = 0
+        self.write_timestamp = 0
+
+    def __repr__(self):
+        return f"DataItem({self.name}, Value={self.value})"
+
+class Transaction:
+    def __init__(self, tid, operations_list, timestamp=None):
+        self.id = tid
+        self.operations = operations_list
+        self.start_time = None
+        self.finish_time = None
+        self.reset_state(timestamp)
+
+    def reset_state(self, timestamp=None):
+        self.state = "RUNNING"
+        self.current_op_index = 0
+        self.locks_held = {}
+        self.waiting_for = None
+        self.abort_cause = None
+        self.undo_log = []
+        self.timestamp = timestamp if timestamp is not None else 0
+
+    def current_operation(self):
+        if self.current_op_index < len(self.operations):
+            return self.operations[self.current_op_index]
+        return None
+
+    def spawn(self, timestamp):
+        return Transaction(self.id, self.operations, timestamp)
+
+    def __repr__(self):
+        return f"Transaction({self.id}, State={self.state})"
+
+class LazyTransaction(Transaction):
+    def __init__(self, tid, operation_factory, timestamp=None):
+        self.id = tid
+        self.operation_factory = operation_factory
+        self.start_time = None
+        self.finish_time = None
+        self.reset_state(timestamp)
+
+    @property
+    def operations(self):
+        return self.operation_factory()
+
+    def reset_state(self, timestamp=None):
+        super().reset_state(timestamp)
+        self.pending_operations = iter(self.operation_factory())
+        self.pulled_index = -1
+        self.pulled_operation = None
+
+    def current_operation(self):
+        while self.pulled_index < self.current_op_index:
+            self.pulled_operation = next(self.pending_operations, None)
+            self.pulled_index += 1
+        return self.pulled_operation
+
+    def spawn(self, timestamp):
+        return LazyTransaction(self.id, self.operation_factory, timestamp)
+
+ABORT_CAUSES = (
+    'read_too_old',
+    'write_conflict',
+    'version_collected',
+    'validation_failed',
+    'deadlock_victim',
+    'wait_die',
+    'wounded',
+    'missing_item',
+    'participant_lost',
+    'other',
+)
+
+LOCK_COMPATIBILITY = {
+    'S': frozenset(['S']),
+    'X': frozenset(),
+}
+
+LOCK_UPGRADES = {
+    ('S', 'S'): 'S',
+    ('S', 'X'): 'X',
+    ('X', 'S'): 'X',
+    ('X', 'X'): 'X',
+}
+
+DATABASE_RESOURCE = "DB"
+
+HIERARCHICAL_MODES = ('IS', 'IX', 'S', 'SIX', 'X')
+
+HIERARCHICAL_COMPATIBILITY = {
+    'IS': frozenset(['IS', 'IX', 'S', 'SIX']),
+    'IX': frozenset(['IS', 'IX']),
+    'S': frozenset(['IS', 'S']),
+    'SIX': frozenset(['IS']),
+    'X': frozenset(),
+}
+
+IMPLIED_MODES = {
+    'IS': frozenset(['IS']),
+    'IX': frozenset(['IS', 'IX']),
+    'S': frozenset(['IS', 'S']),
+    'SIX': frozenset(['IS', 'IX', 'S', 'SIX']),
+    'X': frozenset(HIERARCHICAL_MODES),
+}
+
+HIERARCHICAL_UPGRADES = {
+    (held, requested): min((mode for mode in HIERARCHICAL_MODES if IMPLIED_MODES[mode] >= IMPLIED_MODES[held] | IMPLIED_MODES[requested]), key=lambda mode: len(IMPLIED_MODES[mode]))
+    for held in HIERARCHICAL_MODES
+    for requested in HIERARCHICAL_MODES
+}
+
+INTENTION_MODES = {
+    'S': 'IS',
+    'X': 'IX',
+}
+
+COVERED_MODES = {
+    'IS': frozenset(),
+    'IX': frozenset(),
+    'S': frozenset(['S']),
+    'SIX': frozenset(['S']),
+    'X': frozenset(['S', 'X']),
+}
+
+class LockRequest:
+    __slots__ = ('t_id', 'mode', 'is_upgrade', 'priority')
+
+    def __init__(self, t_id, mode, is_upgrade=False, priority=None):
+        self.t_id = t_id
+        self.mode = mode
+        self.is_upgrade = is_upgrade
+        self.priority = priority
+
+class LockEntry:
+    __slots__ = ('granted', 'waiters')
+
+    def __init__(self):
+        self.granted = {}
+        self.waiters = deque()
+
+class LockTable:
+    def __init__(self, compatibility=LOCK_COMPATIBILITY, upgrades=LOCK_UPGRADES):
+        self.compatibility = compatibility
+        self.upgrades = upgrades
+        self.entries = {}
+
+    def is_compatible(self, entry, t_id, mode):
+        compatible_modes = self.compatibility[mode]
+        for holder_id, held_mode in entry.granted.items():
+            if holder_id != t_id and held_mode not in compatible_modes:
+                return False
+        return True
+
+    def incompatible_holders(self, entry, index):
+        request = entry.waiters[index]
+        compatible_modes = self.compatibility[request.mode]
+        return [holder_id for holder_id, held_mode in entry.granted.items() if holder_id != request.t_id and held_mode not in compatible_modes]
+
+    def blockers_at(self, entry, index):
+        blocking_ids = self.incompatible_holders(entry, index)
+        if index > 0:
+            blocking_ids.append(entry.waiters[index - 1].t_id)
+        return blocking_ids
+
+    def conflicting_at(self, entry, index):
+        conflicting_ids = self.incompatible_holders(entry, index)
+        conflicting_ids.extend(entry.waiters[earlier].t_id for earlier in range(index))
+        return conflicting_ids
+
+    def queue_position(self, entry, priority):
+        position = len(entry.waiters)
+        while position > 0 and entry.waiters[position - 1].priority is not None and entry.waiters[position - 1].priority > priority:
+            position -= 1
+        return position
+
+    def request(self, t_id, resource, mode, priority=None):
+        entry = self.entries.get(resource)
+        if entry is None:
+            entry = self.entries[resource] = LockEntry()
+
+        held_mode = entry.granted.get(t_id)
+        if held_mode is not None:
+            target_mode = self.upgrades[(held_mode, mode)]
+            if target_mode == held_mode:
+                return "HELD", held_mode, None
+            if self.is_compatible(entry, t_id, target_mode):
+                entry.granted[t_id] = target_mode
+                return "UPGRADED", target_mode, None
+            if priority is not None:
+                position = self.queue_position(entry, priority)
+            else:
+                position = 0
+                while position < len(entry.waiters) and entry.waiters[position].is_upgrade:
+                    position += 1
+            entry.waiters.insert(position, LockRequest(t_id, target_mode, True, priority))
+            return "WAITING", target_mode, position
+
+        position = len(entry.waiters) if priority is None else self.queue_position(entry, priority)
+        if position == 0 and self.is_compatible(entry, t_id, mode):
+            entry.granted[t_id] = mode
+            return "GRANTED", mode, None
+        entry.waiters.insert(position, LockRequest(t_id, mode, False, priority))
+        return "WAITING", mode, position
+
+    def grant_waiters(self, entry):
+        granted = []
+        while entry.waiters:
+            request = entry.waiters[0]
+            if not self.is_compatible(entry, request.t_id, request.mode):
+                break
+            entry.waiters.popleft()
+            entry.granted[request.t_id] = request.mode
+            granted.append(request)
+        return granted
+
+    def release(self, t_id, resource):
+        entry = self.entries.get(resource)
+        if entry is None:
+            return None, []
+        mode = entry.granted.pop(t_id, None)
+        granted = self.grant_waiters(entry)
+        if not entry.granted and not entry.waiters:
+            del self.entries[resource]
+        return mode, granted
+
+    def cancel(self, t_id, resource):
+        entry = self.entries.get(resource)
+        if entry is None:
+            return [], None
+        position = None
+        for index, request in enumerate(entry.waiters):
+            if request.t_id == t_id:
+                position = index
+                del entry.waiters[index]
+                break
+        granted = self.grant_waiters(entry)
+        if not entry.granted and not entry.waiters:
+            del self.entries[resource]
+        elif position is not None:
+            position = max(0, position - len(granted))
+        return granted, position
+
+    def holders(self, resource):
+        entry = self.entries.get(resource)
+        return dict(entry.granted) if entry is not None else {}
+
+    def waiting(self, resource):
+        entry = self.entries.get(resource)
+        return [request.t_id for request in entry.waiters] if entry is not None else []
+
+    def queue_length(self, resource):
+        entry = self.entries.get(resource)
+        return len(entry.waiters) if entry is not None else 0
+
+class HolderList:
+    __slots__ = ('holders', 'waiter_id')
+
+    def __init__(self, holders, waiter_id):
+        self.holders = holders
+        self.waiter_id = waiter_id
+
+    def __str__(self):
+        holder_info = ", ".join(f"T{holder_id} ({held_mode})" for holder_id, held_mode in self.holders.items() if holder_id != self.waiter_id)
+        return holder_info or 'earlier waiters'
+
+VICTIM_POLICIES = {
+    'fewest_ops': lambda t: t.current_op_index,
+    'youngest': lambda t: -t.timestamp,
+    'fewest_locks': lambda t: len(t.locks_held),
+}
+
+DEADLOCK_POLICIES = ('detection', 'wait_die', 'wound_wait')
+
+def older_conflicts(transaction, conflicting):
+    return [other for other in conflicting if other.timestamp < transaction.timestamp]
+
+def younger_conflicts(transaction, conflicting):
+    return [other for other in conflicting if other.timestamp > transaction.timestamp]
+
+def choose_victim(members, victim_cost):
+    return min(members, key=lambda t: (victim_cost(t), -t.timestamp))
+
+class WaitForGraph:
+    def __init__(self):
+        self.waits_for = {}
+        self.waited_by = {}
+
+    def set_waits(self, waiter_id, holder_ids):
+        current = self.waits_for.get(waiter_id, {})
+        wanted = dict.fromkeys(holder_ids)
+        wanted.pop(waiter_id, None)
+        for holder_id in current:
+            if holder_id not in wanted:
+                waiters = self.waited_by.get(holder_id)
+                if waiters is not None:
+                    waiters.pop(waiter_id, None)
+                    if not waiters:
+                        del self.waited_by[holder_id]
+        added = [holder_id for holder_id in wanted if holder_id not in current]
+        for holder_id in added:
+            self.waited_by.setdefault(holder_id, {})[waiter_id] = None
+        if wanted:
+            self.waits_for[waiter_id] = wanted
+        else:
+            self.waits_for.pop(waiter_id, None)
+        return added
+
+    def find_path(self, start_id, target_id, excluded=()):
+        if start_id in excluded or target_id in excluded:
+            return None
+        if start_id not in self.waits_for or target_id not in self.waited_by:
+            return None
+        forward = {start_id: None}
+        backward = {target_id: None}
+        forward_frontier = [start_id]
+        backward_frontier = [target_id]
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, edges, seen, other = forward_frontier, self.waits_for, forward, backward
+            else:
+                frontier, edges, seen, other = backward_frontier, self.waited_by, backward, forward
+            next_frontier = []
+            for node_id in frontier:
+                for next_id in edges.get(node_id, ()):
+                    if next_id in seen or next_id in excluded:
+                        continue
+                    seen[next_id] = node_id
+                    if next_id in other:
+                        return self.join_path(forward, backward, next_id)
+                    next_frontier.append(next_id)
+            if frontier is forward_frontier:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+        return None
+
+    def join_path(self, forward, backward, meeting_id):
+        path = []
+        node_id = meeting_id
+        while node_id is not None:
+            path.append(node_id)
+            node_id = forward[node_id]
+        path.reverse()
+        node_id = backward[meeting_id]
+        while node_id is not None:
+            path.append(node_id)
+            node_id = backward[node_id]
+        return [path[-1]] + path[:-1]
+
+    def remove_waits(self, waiter_id):
+        for holder_id in self.waits_for.pop(waiter_id, ()):
+            waiters = self.waited_by.get(holder_id)
+            if waiters is not None:
+                waiters.pop(waiter_id, None)
+                if not waiters:
+                    del self.waited_by[holder_id]
+
+    def remove_transaction(self, t_id):
+        self.remove_waits(t_id)
+        for waiter_id in self.waited_by.pop(t_id, ()):
+            holders = self.waits_for.get(waiter_id)
+            if holders is not None:
+                holders.pop(t_id, None)
+                if not holders:
+                    del self.waits_for[waiter_id]
+
+    def clear(self):
+        self.waits_for.clear()
+        self.waited_by.clear()
+
+class LockingConcurrencyManager:
+    restart_with_original_timestamp = True
+
+    def __init__(self, data_items_dict, log_callback, message_counter_callback, victim_policy="youngest", wait_for_graph=None, deadlock_policy="detection"):
+        if victim_policy not in VICTIM_POLICIES:
+            raise ValueError(f"Unknown deadlock victim policy: {victim_policy}")
+        if deadlock_policy not in DEADLOCK_POLICIES:
+            raise ValueError(f"Unknown deadlock policy: {deadlock_policy}")
+        self.data_items = data_items_dict
+        self.log_message = log_callback
+        self.update_message_count = message_counter_callback
+        self.victim_cost = VICTIM_POLICIES[victim_policy]
+        self.lock_table = LockTable()
+        self.wait_for_graph = wait_for_graph if wait_for_graph is not None else WaitForGraph()
+        self.transactions = {}
+        self.deadlock_victims = []
+        self.deadlock_policy = deadlock_policy
+        self.detects_deadlocks = deadlock_policy == "detection"
+        self.wounding_for = None
+        self.on_wakeup = None
+        self.on_abort = None
+        self.peak_lock_entries = 0
+
+    def acquire_lock(self, transaction, data_item, lock_type):
+        return self.lock_resource(transaction, data_item.name, lock_type)
+
+    def lock_resource(self, transaction, resource, lock_type):
+        self.log_message("T{t} requests {mode} lock on {item}.", "blue", t=transaction.id, item=resource, mode=lock_type)
+        self.update_message_count(1)
+        self.transactions[transaction.id] = transaction
+
+        held_mode = transaction.locks_held.get(resource)
+        priority = transaction.timestamp if self.deadlock_policy == "wound_wait" else None
+        status, mode, position = self.lock_table.request(transaction.id, resource, lock_type, priority)
+        if status == "HELD":
+            self.log_message("T{t} already holds {mode} lock on {item}.", "green", t=transaction.id, item=resource, mode=mode)
+            return True
+        if status == "GRANTED" or status == "UPGRADED":
+            transaction.locks_held[resource] = mode
+            transaction.state = "RUNNING"
+            if status == "UPGRADED":
+                self.log_message("T{t} upgraded {held} lock to {mode} lock on {item}.", "green", t=transaction.id, item=resource, mode=mode, held=held_mode)
+                self.update_waits(resource, (0,))
+            else:
+                self.log_message("T{t} granted {mode} lock on {item}.", "green", t=transaction.id, item=resource, mode=mode)
+                if len(self.lock_table.entries) > self.peak_lock_entries:
+                    self.peak_lock_entries = len(self.lock_table.entries)
+            self.update_message_count(1)
+            return True
+
+        holders = HolderList(self.lock_table.holders(resource), transaction.id)
+        self.log_message("T{t} cannot get {mode} lock on {item}. Held by {holders}. T{t} is WAITING.", "orange", t=transaction.id, item=resource, mode=mode, holders=holders)
+        transaction.state = "WAITING"
+        transaction.waiting_for = resource
+        if self.deadlock_policy == "wait_die":
+            return self.wait_or_die(transaction, resource, position)
+        if self.deadlock_policy == "wound_wait":
+            return self.wound_or_wait(transaction, resource, position)
+        self.update_waits(resource, (position, position + 1))
+        return False
+
+    def conflicting_transactions(self, resource, position):
+        conflicting_ids = self.lock_table.conflicting_at(self.lock_table.entries[resource], position)
+        return [self.transactions[t_id] for t_id in conflicting_ids if t_id in self.transactions]
+
+    def wait_or_die(self, transaction, resource, position):
+        older = older_conflicts(transaction, self.conflicting_transactions(resource, position))
+        if older:
+            self.abort_transaction(transaction, f"Wait-Die (TS={transaction.timestamp} is younger than T{older[0].id} TS={older[0].timestamp})", 'wait_die')
+        return False
+
+    def wound_or_wait(self, transaction, resource, position):
+        holder_ids = self.lock_table.incompatible_holders(self.lock_table.entries[resource], position)
+        younger = younger_conflicts(transaction, [self.transactions[t_id] for t_id in holder_ids if t_id in self.transactions])
+        if not younger:
+            return False
+        self.wounding_for = transaction.id
+        try:
+            for victim in younger:
+                if victim.state == "ABORTED":
+                    continue
+                self.abort_transaction(victim, f"Wounded by older T{transaction.id} (TS={transaction.timestamp} < TS={victim.timestamp})", 'wounded')
+                if self.on_abort is not None:
+                    self.on_abort(victim)
+        finally:
+            self.wounding_for = None
+        return transaction.state == "RUNNING"
+
+    def update_waits(self, resource, positions):
+        if not self.detects_deadlocks:
+            return
+        entry = self.lock_table.entries.get(resource)
+        if entry is None:
+            return
+        for index in sorted(set(positions)):
+            if index < len(entry.waiters):
+                waiter_id = entry.waiters[index].t_id
+                for blocker_id in self.wait_for_graph.set_waits(waiter_id, self.lock_table.blockers_at(entry, index)):
+                    self.check_cycle(waiter_id, blocker_id)
+
+    def check_cycle(self, waiter_id, blocker_id):
+        cycle = self.wait_for_graph.find_path(blocker_id, waiter_id, self.deadlock_victims)
+        while cycle:
+            self.resolve_cycle(cycle)
+            cycle = self.wait_for_graph.find_path(blocker_id, waiter_id, self.deadlock_victims)
+
+    def wake_waiters(self, resource, granted_requests):
+        for request in granted_requests:
+            waiter = self.transactions.get(request.t_id)
+            if waiter is None:
+                continue
+            waiter.locks_held[resource] = request.mode
+            waiter.waiting_for = None
+            waiter.state = "RUNNING"
+            self.wait_for_graph.remove_waits(waiter.id)
+            self.log_message("T{t} granted {mode} lock on {item} after waiting.", "green", t=waiter.id, item=resource, mode=request.mode)
+            self.update_message_count(1)
+            if self.on_wakeup is not None and waiter.id != self.wounding_for:
+                self.on_wakeup(waiter)
+
+    def release_lock(self, transaction, resource):
+        mode, granted_requests = self.lock_table.release(transaction.id, resource)
+        transaction.locks_held.pop(resource, None)
+        if mode is not None:
+            self.log_message("T{t} releases {mode} lock on {item}.", "green", t=transaction.id, item=resource, mode=mode)
+            self.update_message_count(1)
+        self.wake_waiters(resource, granted_requests)
+        self.update_waits(resource, (0,))
+
+    def release_all_locks(self, transaction):
+        self.wait_for_graph.remove_transaction(transaction.id)
+        if transaction.waiting_for is not None:
+            resource = transaction.waiting_for
+            transaction.waiting_for = None
+            granted_requests, position = self.lock_table.cancel(transaction.id, resource)
+            self.wake_waiters(resource, granted_requests)
+            if position is not None:
+                self.update_waits(resource, (0, position))
+        for resource in list(transaction.locks_held):
+            self.release_lock(transaction, resource)
+        transaction.locks_held.clear()
+        self.transactions.pop(transaction.id, None)
+
+    def process_operation(self, transaction, op_type, data_item, value=None):
+        if op_type == 'read':
+            if self.acquire_lock(transaction, data_item, 'S'):
+                self.log_message("T{t} reads {item} (value: {value}).", "green", t=transaction.id, item=data_item.name, value=data_item.value)
+                return True
+            return False
+        elif op_type == 'write':
+            if self.acquire_lock(transaction, data_item, 'X'):
+                transaction.undo_log.append((data_item, data_item.value))
+                data_item.value = value
+                self.log_message("T{t} writes {value} to {item}.", "green", t=transaction.id, item=data_item.name, value=value)
+                return True
+            return False
+        elif op_type == 'request_lock':
+            if self.acquire_lock(transaction, data_item, value):
+                self.log_message("T{t} explicitly acquired {mode} lock on {item}.", "green", t=transaction.id, item=data_item.name, mode=value)
+                return True
+            return False
+        return False
+
+    def commit_transaction(self, transaction):
+        self.log_message("T{t} is COMMITTING.", "green", t=transaction.id)
+        self.update_message_count(1)
+        transaction.undo_log.clear()
+        self.release_all_locks(transaction)
+        transaction.state = "COMMITTED"
+        self.log_message("T{t} COMMITTED successfully.", "green", t=transaction.id)
+
+    def abort_transaction(self, transaction, reason, cause='other'):
+        self.log_message("T{t} ABORTED (Reason: {reason}).", "red", t=transaction.id, reason=reason)
+        self.update_message_count(1)
+        transaction.abort_cause = cause
+        self.roll_back(transaction)
+        self.release_all_locks(transaction)
+        transaction.state = "ABORTED"
+
+    def roll_back(self, transaction):
+        if not transaction.undo_log:
+            return
+        for data_item, value in reversed(transaction.undo_log):
+            data_item.value = value
+            self.log_message("T{t} restores {item} to {value}.", "green", t=transaction.id, item=data_item.name, value=value)
+        self.log_message("T{t} rolled back {count} writes.", "blue", t=transaction.id, count=len(transaction.undo_log))
+        transaction.undo_log.clear()
+
+    def queue_length(self, resource):
+        return self.lock_table.queue_length(resource)
+
+    def lock_stats(self):
+        return {'lock_entries': len(self.lock_table.entries), 'peak_lock_entries': self.peak_lock_entries}
+
+    def resolve_cycle(self, cycle):
+        members = [self.transactions[t_id] for t_id in cycle if t_id in self.transactions]
+        victim = choose_victim(members, self.victim_cost)
+        self.log_message("Wait-for cycle {cycle}. Victim: T{t}.", "red", t=victim.id, cycle=" -> ".join(cycle + cycle[:1]))
+        self.deadlock_victims.append(victim.id)
+
+    def detect_deadlock(self):
+        victims = self.deadlock_victims
+        self.deadlock_victims = []
+        return victims
+
+class HierarchicalLockingConcurrencyManager(LockingConcurrencyManager):
+    def __init__(self, data_items_dict, log_callback, message_counter_callback, partitions=8, partitioning='hash', escalation_threshold=32,
+                 victim_policy="youngest", wait_for_graph=None, deadlock_policy="detection"):
+        if escalation_threshold is not None and escalation_threshold < 1:
+            raise ValueError("Escalation threshold must be at least 1.")
+        super().__init__(data_items_dict, log_callback, message_counter_callback, victim_policy, wait_for_graph, deadlock_policy)
+        self.lock_table = LockTable(HIERARCHICAL_COMPATIBILITY, HIERARCHICAL_UPGRADES)
+        self.partitioner = Partitioner(data_items_dict, partitions, partitioning)
+        self.escalation_threshold = escalation_threshold
+        self.fine_locks = {}
+        self.escalations = 0
+
+    def partition_of(self, item_name):
+        return f"{DATABASE_RESOURCE}/P{self.partitioner.primary(item_name)}"
+
+    def acquire_lock(self, transaction, data_item, lock_type):
+        if lock_type not in INTENTION_MODES:
+            raise ValueError(f"Unknown item lock mode: {lock_type}")
+        partition = self.partition_of(data_item.name)
+        intention = INTENTION_MODES[lock_type]
+        for ancestor in (DATABASE_RESOURCE, partition):
+            held_mode = transaction.locks_held.get(ancestor)
+            if held_mode is not None:
+                if lock_type in COVERED_MODES[held_mode]:
+                    self.log_message("T{t}: {mode} access to {item} is covered by its {held} lock on {ancestor}.", "green", t=transaction.id, item=data_item.name, mode=lock_type, held=held_mode, ancestor=ancestor)
+                    return True
+                if HIERARCHICAL_UPGRADES[(held_mode, intention)] == held_mode:
+                    continue
+            if not self.lock_resource(transaction, ancestor, intention):
+                return False
+        if not self.lock_resource(transaction, data_item.name, lock_type):
+            return False
+        if self.escalation_threshold is not None:
+            items = self.fine_locks.setdefault(transaction.id, {}).setdefault(partition, set())
+            items.add(data_item.name)
+            if len(items) > self.escalation_threshold:
+                self.escalate(transaction, partition, items)
+        return True
+
+    def escalate(self, transaction, partition, items):
+        wanted = 'X' if any(transaction.locks_held.get(name) == 'X' for name in items) else 'S'
+        target = HIERARCHICAL_UPGRADES[(transaction.locks_held[partition], wanted)]
+        if not self.lock_table.is_compatible(self.lock_table.entries[partition], transaction.id, target):
+            self.log_message("T{t} cannot escalate to {mode} on {item} yet; keeping {count} item locks.", "orange", t=transaction.id, item=partition, mode=target, count=len(items))
+            return
+        self.lock_resource(transaction, partition, target)
+        self.escalations += 1
+        covered = [name for name in items if transaction.locks_held.get(name) in COVERED_MODES[target]]
+        for name in covered:
+            self.release_lock(transaction, name)
+            items.discard(name)
+        self.log_message("T{t} escalated {count} item locks to a {mode} lock on {item}.", "blue", t=transaction.id, item=partition, mode=target, count=len(covered))
+
+    def release_all_locks(self, transaction):
+        self.fine_locks.pop(transaction.id, None)
+        super().release_all_locks(transaction)
+
+    def lock_stats(self):
+        stats = super().lock_stats()
+        stats['escalations'] = self.escalations
+        return stats
+
+class PendingWrites:
+    __slots__ = ('base_value', 'base_timestamp', 'writes')
+
+    def __init__(self, data_item):
+        self.base_value = data_item.value
+        self.base_timestamp = data_item.write_timestamp
+        self.writes = []
+
+    def commit(self, t_id):
+        for write in self.writes:
+            if write[0] == t_id:
+                write[3] = True
+        self.fold()
+
+    def remove(self, t_id):
+        self.writes = [write for write in self.writes if write[0] != t_id]
+        self.fold()
+
+    def fold(self):
+        while self.writes and self.writes[0][3]:
+            _, self.base_timestamp, self.base_value, _ = self.writes.pop(0)
+
+    def newest(self):
+        if self.writes:
+            _, write_timestamp, value, _ = self.writes[-1]
+            return value, write_timestamp
+        return self.base_value, self.base_timestamp
+
+class TimestampConcurrencyManager:
+    def __init__(self, data_items_dict, log_callback, message_counter_callback):
+        self.data_items = data_items_dict
+        self.log_message = log_callback
+        self.update_message_count = message_counter_callback
+        self.pending_writes = {}
+
+    def process_operation(self, transaction, op_type, data_item, value=None):
+        ts = transaction.timestamp
+
+        if op_type == 'read':
+            self.log_message("T{t} (TS={ts}) attempts to READ {item}.", "blue", t=transaction.id, item=data_item.name, ts=ts)
+            self.update_message_count(1)
+
+            if ts < data_item.write_timestamp:
+                self.abort_transaction(transaction, f"Read Old Data (TS={ts} < WriteTS={data_item.write_timestamp})", 'read_too_old')
+                return False
+            else:
+                data_item.read_timestamp = max(data_item.read_timestamp, ts)
+                self.log_message("T{t} READS {item} (value: {value}). {item} ReadTS updated to {ts}.", "green", t=transaction.id, item=data_item.name, ts=data_item.read_timestamp, value=data_item.value)
+                return True
+        elif op_type == 'write':
+            self.log_message("T{t} (TS={ts}) attempts to WRITE {value} to {item}.", "blue", t=transaction.id, item=data_item.name, ts=ts, value=value)
+            self.update_message_count(1)
+
+            if ts < data_item.read_timestamp or ts < data_item.write_timestamp:
+                self.abort_transaction(transaction, f"Write Conflict (TS={ts} < ReadTS={data_item.read_timestamp} or WriteTS={data_item.write_timestamp})", 'write_conflict')
+                return False
+            else:
+                pending = self.pending_writes.get(data_item.name)
+                if pending is None:
+                    pending = self.pending_writes[data_item.name] = PendingWrites(data_item)
+                pending.writes.append([transaction.id, ts, value, False])
+                transaction.undo_log.append(data_item)
+                data_item.value = value
+                data_item.write_timestamp = ts
+                self.log_message("T{t} WRITES {value} to {item}. {item} WriteTS updated to {ts}.", "green", t=transaction.id, item=data_item.name, ts=data_item.write_timestamp, value=value)
+                return True
+        elif op_type == 'request_lock':
+            self.log_message("T{t}: timestamp ordering takes no locks; {mode} lock request on {item} is a no-op.", "blue", t=transaction.id, item=data_item.name, mode=value)
+            return True
+        return False
+
+    def commit_transaction(self, transaction):
+        self.log_message("T{t} is COMMITTING.", "green", t=transaction.id)
+        self.update_message_count(1)
+        for data_item in transaction.undo_log:
+            pending = self.pending_writes.get(data_item.name)
+            if pending is not None:
+                pending.commit(transaction.id)
+                if not pending.writes:
+                    del self.pending_writes[data_item.name]
+        transaction.undo_log.clear()
+        transaction.state = "COMMITTED"
+        self.log_message("T{t} COMMITTED successfully.", "green", t=transaction.id)
+
+    def abort_transaction(self, transaction, reason, cause='other'):
+        self.log_message("T{t} ABORTED (Reason: {reason}).", "red", t=transaction.id, reason=reason)
+        self.update_message_count(1)
+        transaction.abort_cause = cause
+        self.roll_back(transaction)
+        transaction.state = "ABORTED"
+
+    def roll_back(self, transaction):
+        if not transaction.undo_log:
+            return
+        for data_item in transaction.undo_log:
+            pending = self.pending_writes.get(data_item.name)
+            if pending is None:
+                continue
+            pending.remove(transaction.id)
+            data_item.value, data_item.write_timestamp = pending.newest()
+            self.log_message("T{t} restores {item} to {value} (WriteTS {ts}).", "green", t=transaction.id, item=data_item.name, value=data_item.value, ts=data_item.write_timestamp)
+            if not pending.writes:
+                del self.pending_writes[data_item.name]
+        self.log_message("T{t} rolled back {count} writes.", "blue", t=transaction.id, count=len(transaction.undo_log))
+        transaction.undo_log.clear()
+
+class Version:
+    __slots__ = ('write_timestamp', 'read_timestamp', 'value', 'creator')
+
+    def __init__(self, write_timestamp, value, creator=None):
+        self.write_timestamp = write_timestamp
+        self.read_timestamp = write_timestamp
+        self.value = value
+        self.creator = creator
+
+class VersionChain:
+    __slots__ = ('timestamps', 'versions')
+
+    def __init__(self, initial_value):
+        self.timestamps = [0]
+        self.versions = [Version(0, initial_value)]
+
+    def visible_index(self, ts):
+        return bisect.bisect_right(self.timestamps, ts) - 1
+
+    def insert(self, version):
+        index = bisect.bisect_right(self.timestamps, version.write_timestamp)
+        self.timestamps.insert(index, version.write_timestamp)
+        self.versions.insert(index, version)
+
+    def remove_created_by(self, t_id):
+        keep = [version for version in self.versions if version.creator != t_id]
+        self.versions = keep
+        self.timestamps = [version.write_timestamp for version in keep]
+
+    def prune_before(self, ts):
+        index = bisect.bisect_left(self.timestamps, ts) - 1
+        if index > 0:
+            del self.versions[:index]
+            del self.timestamps[:index]
+        return index
+
+    def latest(self):
+        return self.versions[-1]
+
+class MultiversionTimestampConcurrencyManager:
+    def __init__(self, data_items_dict, log_callback, message_counter_callback, thomas_write_rule=True, gc_interval=64):
+        self.data_items = data_items_dict
+        self.log_message = log_callback
+        self.update_message_count = message_counter_callback
+        self.thomas_write_rule = thomas_write_rule
+        self.gc_interval = gc_interval
+        self.chains = {name: VersionChain(item.value) for name, item in data_items_dict.items()}
+        self.active_timestamps = []
+        self.active_ids = set()
+        self.written_items = {}
+        self.skipped_writes = {}
+        self.multiversion_items = set()
+        self.finished_since_gc = 0
+        self.versions_collected = 0
+        self.writes_skipped = 0
+
+    def begin_transaction(self, transaction):
+        if transaction.id not in self.active_ids:
+            self.active_ids.add(transaction.id)
+            bisect.insort(self.active_timestamps, transaction.timestamp)
+
+    def end_transaction(self, transaction):
+        if transaction.id in self.active_ids:
+            self.active_ids.discard(transaction.id)
+            del self.active_timestamps[bisect.bisect_left(self.active_timestamps, transaction.timestamp)]
+        self.written_items.pop(transaction.id, None)
+        self.skipped_writes.pop(transaction.id, None)
+        self.finished_since_gc += 1
+        if self.finished_since_gc >= self.gc_interval:
+            self.collect_garbage()
+
+    def chain_for(self, data_item):
+        chain = self.chains.get(data_item.name)
+        if chain is None:
+            chain = self.chains[data_item.name] = VersionChain(data_item.value)
+        return chain
+
+    def has_reader_between(self, ts, next_ts):
+        index = bisect.bisect_right(self.active_timestamps, ts)
+        return index < len(self.active_timestamps) and self.active_timestamps[index] < next_ts
+
+    def is_committed(self, version):
+        return version.creator is None or version.creator not in self.active_ids
+
+    def refresh_item(self, data_item, chain):
+        latest = chain.latest()
+        data_item.value = latest.value
+        data_item.write_timestamp = latest.write_timestamp
+        data_item.read_timestamp = max(version.read_timestamp for version in chain.versions)
+
+    def process_operation(self, transaction, op_type, data_item, value=None):
+        ts = transaction.timestamp
+        chain = self.chain_for(data_item)
+        self.begin_transaction(transaction)
+
+        if op_type == 'read':
+            self.log_message("T{t} (TS={ts}) attempts to READ {item}.", "blue", t=transaction.id, item=data_item.name, ts=ts)
+            self.update_message_count(1)
+
+            own_writes = self.skipped_writes.get(transaction.id)
+            if own_writes is not None and data_item.name in own_writes:
+                self.log_message("T{t} READS its own skipped write of {item} (value: {value}).", "green", t=transaction.id, item=data_item.name, ts=ts, value=own_writes[data_item.name])
+                return True
+            index = chain.visible_index(ts)
+            if index < 0:
+                self.abort_transaction(transaction, f"Version Collected (TS={ts} < oldest version {chain.timestamps[0]} of {data_item.name})", 'version_collected')
+                return False
+            version = chain.versions[index]
+            if ts > version.read_timestamp:
+                version.read_timestamp = ts
+                data_item.read_timestamp = max(data_item.read_timestamp, ts)
+            self.log_message("T{t} READS {item} version WTS={version} (value: {value}).", "green", t=transaction.id, item=data_item.name, ts=ts, version=version.write_timestamp, value=version.value)
+            return True
+        elif op_type == 'write':
+            self.log_message("T{t} (TS={ts}) attempts to WRITE {value} to {item}.", "blue", t=transaction.id, item=data_item.name, ts=ts, value=value)
+            self.update_message_count(1)
+
+            index = chain.visible_index(ts)
+            if index < 0:
+                self.abort_transaction(transaction, f"Version Collected (TS={ts} < oldest version {chain.timestamps[0]} of {data_item.name})", 'version_collected')
+                return False
+            version = chain.versions[index]
+            if version.write_timestamp == ts:
+                version.value = value
+                self.refresh_item(data_item, chain)
+                self.log_message("T{t} overwrites its own version of {item} with {value}.", "green", t=transaction.id, item=data_item.name, ts=ts, value=value)
+                return True
+            if version.read_timestamp > ts:
+                self.abort_transaction(transaction, f"Write Conflict (TS={ts} < ReadTS={version.read_timestamp} of version WTS={version.write_timestamp})", 'write_conflict')
+                return False
+            if self.thomas_write_rule and index + 1 < len(chain.versions) and self.is_committed(chain.versions[index + 1]) and not self.has_reader_between(ts, chain.timestamps[index + 1]):
+                self.writes_skipped += 1
+                self.skipped_writes.setdefault(transaction.id, {})[data_item.name] = value
+                self.log_message("T{t} WRITE to {item} skipped by Thomas write rule (newer version WTS={version}).", "orange", t=transaction.id, item=data_item.name, ts=ts, version=chain.timestamps[index + 1])
+                return True
+
+            chain.insert(Version(ts, value, transaction.id))
+            self.written_items.setdefault(transaction.id, set()).add(data_item.name)
+            self.multiversion_items.add(data_item.name)
+            self.refresh_item(data_item, chain)
+            self.log_message("T{t} WRITES {value} to {item} as version WTS={ts} ({versions} versions).", "green", t=transaction.id, item=data_item.name, ts=ts, value=value, versions=len(chain.versions))
+            return True
+        elif op_type == 'request_lock':
+            self.log_message("T{t}: multiversion timestamp ordering takes no locks; {mode} lock request on {item} is a no-op.", "blue", t=transaction.id, item=data_item.name, mode=value)
+            return True
+        return False
+
+    def collect_garbage(self):
+        self.finished_since_gc = 0
+        if not self.multiversion_items:
+            return 0
+        horizon = self.active_timestamps[0] if self.active_timestamps else float("inf")
+        collected = 0
+        for name in list(self.multiversion_items):
+            chain = self.chains[name]
+            collected += chain.prune_before(horizon)
+            if len(chain.versions) == 1:
+                self.multiversion_items.discard(name)
+        self.versions_collected += collected
+        return collected
+
+    def commit_transaction(self, transaction):
+        self.log_message("T{t} is COMMITTING.", "green", t=transaction.id)
+        self.update_message_count(1)
+        transaction.state = "COMMITTED"
+        self.end_transaction(transaction)
+        self.log_message("T{t} COMMITTED successfully.", "green", t=transaction.id)
+
+    def abort_transaction(self, transaction, reason, cause='other'):
+        self.log_message("T{t} ABORTED (Reason: {reason}).", "red", t=transaction.id, reason=reason)
+        self.update_message_count(1)
+        transaction.abort_cause = cause
+        for name in self.written_items.get(transaction.id, ()):
+            chain = self.chains[name]
+            chain.remove_created_by(transaction.id)
+            data_item = self.data_items[name]
+            self.refresh_item(data_item, chain)
+            self.log_message("T{t}'s versions of {item} removed; latest is {value} (WriteTS {ts}).", "green", t=transaction.id, item=name, value=data_item.value, ts=data_item.write_timestamp)
+        transaction.state = "ABORTED"
+        self.end_transaction(transaction)
+
+VALIDATION_MODES = ('backward', 'forward')
+FORWARD_VICTIMS = ('readers', 'validator')
+
+class Workspace:
+    __slots__ = ('transaction', 'start', 'read_set', 'writes')
+
+    def __init__(self, transaction, start):
+        self.transaction = transaction
+        self.start = start
+        self.read_set = set()
+        self.writes = {}
+
+class OptimisticConcurrencyManager:
+    def __init__(self, data_items_dict, log_callback, message_counter_callback, validation='backward', forward_victim='readers'):
+        if validation not in VALIDATION_MODES:
+            raise ValueError(f"Unknown validation mode: {validation}")
+        if forward_victim not in FORWARD_VICTIMS:
+            raise ValueError(f"Unknown forward validation victim: {forward_victim}")
+        self.data_items = data_items_dict
+        self.log_message = log_callback
+        self.update_message_count = message_counter_callback
+        self.validation = validation
+        self.forward_victim = forward_victim
+        self.workspaces = {}
+        self.commit_counter = 0
+        self.last_commit = {}
+        self.active_readers = {}
+        self.on_abort = None
+
+    def begin_transaction(self, transaction):
+        workspace = self.workspaces.get(transaction.id)
+        if workspace is None:
+            workspace = self.workspaces[transaction.id] = Workspace(transaction, self.commit_counter)
+        return workspace
+
+    def process_operation(self, transaction, op_type, data_item, value=None):
+        workspace = self.begin_transaction(transaction)
+
+        if op_type == 'read':
+            self.update_message_count(1)
+            if data_item.name not in workspace.read_set:
+                workspace.read_set.add(data_item.name)
+                if self.validation == 'forward':
+                    self.active_readers.setdefault(data_item.name, {})[transaction.id] = None
+            if data_item.name in workspace.writes:
+                self.log_message("T{t} reads {item} from its workspace (value: {value}).", "green", t=transaction.id, item=data_item.name, value=workspace.writes[data_item.name])
+            else:
+                self.log_message("T{t} reads {item} (value: {value}).", "green", t=transaction.id, item=data_item.name, value=data_item.value)
+            return True
+        elif op_type == 'write':
+            workspace.writes[data_item.name] = value
+            self.log_message("T{t} writes {value} to {item} in its workspace.", "green", t=transaction.id, item=data_item.name, value=value)
+            return True
+        elif op_type == 'request_lock':
+            self.log_message("T{t}: optimistic concurrency takes no locks; {mode} lock request on {item} is a no-op.", "blue", t=transaction.id, item=data_item.name, mode=value)
+            return True
+        return False
+
+    def validate_backward(self, transaction, workspace):
+        conflicts = [name for name in workspace.read_set if self.last_commit.get(name, 0) > workspace.start]
+        if conflicts:
+            return f"Backward Validation Failed (read {', '.join(sorted(conflicts))} overwritten by a later commit)"
+        return None
+
+    def validate_forward(self, transaction, workspace):
+        conflicts = {}
+        for name in workspace.writes:
+            for t_id in self.active_readers.get(name, ()):
+                if t_id != transaction.id and t_id not in conflicts:
+                    conflicts[t_id] = name
+        if not conflicts:
+            return None
+        if self.forward_victim == 'validator':
+            t_id, name = next(iter(conflicts.items()))
+            return f"Forward Validation Failed (writes {name} read by active T{t_id})"
+        for t_id, name in conflicts.items():
+            reader = self.workspaces[t_id].transaction
+            self.abort_transaction(reader, f"Forward Validation: committing T{transaction.id} writes {name}, which it read", 'validation_failed')
+            if self.on_abort is not None:
+                self.on_abort(reader)
+        return None
+
+    def end_transaction(self, transaction):
+        workspace = self.workspaces.pop(transaction.id, None)
+        if workspace is None or self.validation != 'forward':
+            return workspace
+        for name in workspace.read_set:
+            readers = self.active_readers[name]
+            readers.pop(transaction.id, None)
+            if not readers:
+                del self.active_readers[name]
+        return workspace
+
+    def commit_transaction(self, transaction):
+        workspace = self.begin_transaction(transaction)
+        self.log_message("T{t} enters {validation} validation.", "blue", t=transaction.id, validation=self.validation)
+        self.update_message_count(1)
+
+        if self.validation == 'backward':
+            failure = self.validate_backward(transaction, workspace)
+        else:
+            failure = self.validate_forward(transaction, workspace)
+        if failure is not None:
+            self.abort_transaction(transaction, failure, 'validation_failed')
+            return
+
+        self.commit_counter += 1
+        for name, value in workspace.writes.items():
+            data_item = self.data_items[name]
+            data_item.value = value
+            data_item.write_timestamp = self.commit_counter
+            self.last_commit[name] = self.commit_counter
+            self.log_message("T{t} installs {value} into {item} (WriteTS {ts}).", "green", t=transaction.id, item=name, value=value, ts=self.commit_counter)
+        if workspace.writes:
+            self.update_message_count(1)
+        self.end_transaction(transaction)
+        transaction.state = "COMMITTED"
+        self.log_message("T{t} COMMITTED successfully (commit #{commit}, {writes} writes installed).", "green", t=transaction.id, commit=self.commit_counter, writes=len(workspace.writes))
+
+    def abort_transaction(self, transaction, reason, cause='other'):
+        self.log_message("T{t} ABORTED (Reason: {reason}).", "red", t=transaction.id, reason=reason)
+        self.update_message_count(1)
+        transaction.abort_cause = cause
+        self.end_transaction(transaction)
+        transaction.state = "ABORTED"
+
+PARTITIONING_SCHEMES = ('hash', 'range')
+
+class Partitioner:
+    def __init__(self, item_names, num_sites, scheme='hash', replication_factor=1):
+        if scheme not in PARTITIONING_SCHEMES:
+            raise ValueError(f"Unknown partitioning scheme: {scheme}")
+        if num_sites < 1 or not 1 <= replication_factor <= num_sites:
+            raise ValueError("Replication factor must be between 1 and the number of sites.")
+        self.num_sites = num_sites
+        self.scheme = scheme
+        self.replication_factor = replication_factor
+        self.placement = {}
+        names = list(item_names)
+        for index, name in enumerate(names):
+            if scheme == 'range':
+                primary = index * num_sites // len(names)
+            else:
+                primary = self.hash_site(name)
+            self.placement[name] = self.replica_sites(primary)
+
+    def hash_site(self, name):
+        return zlib.crc32(name.encode("utf-8")) % self.num_sites
+
+    def replica_sites(self, primary):
+        return tuple((primary + offset) % self.num_sites for offset in range(self.replication_factor))
+
+    def replicas(self, name):
+        placement = self.placement.get(name)
+        if placement is None:
+            placement = self.placement[name] = self.replica_sites(self.hash_site(name))
+        return placement
+
+    def primary(self, name):
+        return self.replicas(name)[0]
+
+class Network:
+    def __init__(self, latency=1.0, latency_jitter=0.0, loss_rate=0.0, retransmit_timeout=None, seed=None):
+        if latency < 0 or latency_jitter < 0:
+            raise ValueError("Network latency must not be negative.")
+        if not 0.0 <= loss_rate < 1.0:
+            raise ValueError("Message loss rate must be in [0, 1).")
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.loss_rate = loss_rate
+        self.retransmit_timeout = retransmit_timeout if retransmit_timeout is not None else 2 * latency + latency_jitter
+        self.rng = random.Random(seed)
+        self.messages_sent = 0
+        self.messages_lost = 0
+        self.messages_by_kind = {}
+
+    def send(self, source, destination, kind, max_retransmits=None):
+        delay = 0.0
+        attempts = 1
+        delivered = True
+        while self.loss_rate and self.rng.random() < self.loss_rate:
+            delay += self.retransmit_timeout
+            if max_retransmits is not None and attempts > max_retransmits:
+                delivered = False
+                break
+            attempts += 1
+        self.messages_sent += attempts
+        self.messages_lost += attempts - 1 if delivered else attempts
+        self.messages_by_kind[kind] = self.messages_by_kind.get(kind, 0) + attempts
+        if not delivered:
+            return delay, attempts, False
+        delay += self.latency
+        if self.latency_jitter:
+            delay += self.rng.uniform(0.0, self.latency_jitter)
+        return delay, attempts, True
+
+class Site:
+    def __init__(self, site_id):
+        self.id = site_id
+        self.data_items = {}
+        self.participants = {}
+        self.manager = None
+        self.local_messages = 0
+
+    def count_local_message(self, count=1):
+        self.local_messages += count
+
+SITE_PROTOCOLS = {
+    'locking': LockingConcurrencyManager,
+    'timestamping': TimestampConcurrencyManager,
+}
+
+class DistributedConcurrencyManager:
+    def __init__(self, data_items_dict, log_callback, message_counter_callback, sites=4, partitioning='hash', replication_factor=1,
+                 site_protocol='locking', latency=1.0, latency_jitter=0.0, loss_rate=0.0, retransmit_timeout=None,
+                 victim_policy='youngest', seed=None, vote_retransmits=None):
+        if site_protocol not in SITE_PROTOCOLS:
+            raise ValueError(f"Unknown site protocol: {site_protocol}")
+        self.data_items = data_items_dict
+        self.log_message = log_callback
+        self.update_message_count = message_counter_callback
+        self.site_protocol = site_protocol
+        self.partitioner = Partitioner(data_items_dict, sites, partitioning, replication_factor)
+        self.network = Network(latency, latency_jitter, loss_rate, retransmit_timeout, seed)
+        self.vote_retransmits = vote_retransmits
+        self.transactions = {}
+        self.home_sites = {}
+        self.pending_delay = 0.0
+        self.committed_transactions = 0
+        self.cross_site_transactions = 0
+        self.on_wakeup = None
+
+        self.sites = [Site(site_id) for site_id in range(sites)]
+        for name, item in data_items_dict.items():
+            for index, site_id in enumerate(self.partitioner.replicas(name)):
+                self.sites[site_id].data_items[name] = item if index == 0 else DataItem(name, item.value)
+
+        site_options = {}
+        if site_protocol == 'locking':
+            site_options = {'victim_policy': victim_policy, 'wait_for_graph': WaitForGraph()}
+        for site in self.sites:
+            site.manager = SITE_PROTOCOLS[site_protocol](site.data_items, self.site_logger(site.id), site.count_local_message, **site_options)
+            if hasattr(site.manager, "on_wakeup"):
+                site.manager.on_wakeup = self.site_wakeup(site.id)
+
+    def site_logger(self, site_id):
+        return lambda template, color="black", **fields: self.log_message(template, color, site=site_id, **fields)
+
+    def site_wakeup(self, site_id):
+        return lambda participant: self.wake_participant(site_id, participant)
+
+    def send(self, source, destination, kind):
+        delay, attempts, _ = self.network.send(source, destination, kind)
+        self.update_message_count(attempts)
+        return delay
+
+    def collect_vote(self, home, site_id):
+        delay, attempts, delivered = self.network.send(home, site_id, 'prepare', self.vote_retransmits)
+        self.update_message_count(attempts)
+        if delivered:
+            reply_delay, attempts, delivered = self.network.send(site_id, home, 'vote', self.vote_retransmits)
+            self.update_message_count(attempts)
+            delay += reply_delay
+        return delay, delivered
+
+    def round_trip(self, home, site_id, request_kind, reply_kind):
+        if site_id == home:
+            return 0.0
+        return self.send(home, site_id, request_kind) + self.send(site_id, home, reply_kind)
+
+    def participant(self, transaction, site_id):
+        participants = self.sites[site_id].participants
+        participant = participants.get(transaction.id)
+        if participant is None:
+            participant = participants[transaction.id] = Transaction(transaction.id, [], transaction.timestamp)
+        participant.current_op_index = transaction.current_op_index
+        return participant
+
+    def participant_sites(self, t_id):
+        return [site for site in self.sites if t_id in site.participants]
+
+    def target_sites(self, home, op_type, item_name, value):
+        replicas = self.partitioner.replicas(item_name)
+        if op_type == 'read' or (op_type == 'request_lock' and value == 'S'):
+            return (home,) if home in replicas else replicas[:1]
+        return replicas
+
+    def process_operation(self, transaction, op_type, data_item, value=None):
+        self.transactions[transaction.id] = transaction
+        home = self.home_sites.get(transaction.id)
+        if home is None:
+            home = self.home_sites[transaction.id] = self.partitioner.primary(data_item.name)
+
+        delay = 0.0
+        for site_id in self.target_sites(home, op_type, data_item.name, value):
+            site = self.sites[site_id]
+            participant = self.participant(transaction, site_id)
+            delay = max(delay, self.round_trip(home, site_id, 'operation', 'reply'))
+            if not site.manager.process_operation(participant, op_type, site.data_items[data_item.name], value):
+                self.pending_delay += delay
+                if participant.state == "ABORTED":
+                    self.abort_transaction(transaction, f"Aborted at site S{site_id}", participant.abort_cause or 'other')
+                else:
+                    transaction.state = participant.state
+                    transaction.waiting_for = data_item.name
+                return False
+
+        transaction.state = "RUNNING"
+        self.pending_delay += delay
+        return True
+
+    def wake_participant(self, site_id, participant):
+        transaction = self.transactions.get(participant.id)
+        if transaction is None or transaction.state != "WAITING":
+            return
+        home = self.home_sites.get(transaction.id, site_id)
+        if site_id != home:
+            self.send(site_id, home, 'grant')
+        transaction.state = "RUNNING"
+        transaction.waiting_for = None
+        if self.on_wakeup is not None:
+            self.on_wakeup(transaction)
+
+    def commit_transaction(self, transaction):
+        home = self.home_sites.get(transaction.id)
+        sites = self.participant_sites(transaction.id)
+        remote = [site.id for site in sites if site.id != home]
+
+        if remote:
+            self.log_message("T{t} starts two-phase commit at S{home} with participants {participants}.", "blue", t=transaction.id, home=home, participants=", ".join(f"S{site_id}" for site_id in remote))
+            votes = [self.collect_vote(home, site_id) for site_id in remote]
+            prepare_delay = max(delay for delay, _ in votes)
+            lost = [site_id for site_id, (_, delivered) in zip(remote, votes) if not delivered]
+            if lost:
+                self.pending_delay += prepare_delay
+                self.abort_transaction(transaction, f"No vote from {', '.join(f'S{site_id}' for site_id in lost)}; participant presumed lost", 'participant_lost')
+                return
+            self.log_message("T{t}: all participants voted YES.", "green", t=transaction.id)
+            commit_delay = max(self.round_trip(home, site_id, 'commit', 'ack') for site_id in remote)
+            self.pending_delay += prepare_delay + commit_delay
+            self.cross_site_transactions += 1
+
+        for site in sites:
+            site.manager.commit_transaction(site.participants.pop(transaction.id))
+        transaction.state = "COMMITTED"
+        self.committed_transactions += 1
+        self.forget(transaction)
+
+    def abort_transaction(self, transaction, reason, cause='other'):
+        self.log_message("T{t} ABORTED globally (Reason: {reason}).", "red", t=transaction.id, reason=reason)
+        transaction.abort_cause = cause
+        home = self.home_sites.get(transaction.id)
+        for site in self.participant_sites(transaction.id):
+            participant = site.participants.pop(transaction.id)
+            if participant.state != "ABORTED":
+                site.manager.abort_transaction(participant, reason, cause)
+            if home is not None:
+                self.round_trip(home, site.id, 'abort', 'ack')
+        transaction.state = "ABORTED"
+        transaction.waiting_for = None
+        self.forget(transaction)
+
+    def queue_length(self, resource):
+        return sum(site.manager.queue_length(resource) for site in self.sites if resource in site.data_items and hasattr(site.manager, "queue_length"))
+
+    def forget(self, transaction):
+        self.transactions.pop(transaction.id, None)
+        self.home_sites.pop(transaction.id, None)
+
+    def detect_deadlock(self):
+        if self.site_protocol != 'locking':
+            return []
+        victims = {}
+        for site in self.sites:
+            victims.update(dict.fromkeys(site.manager.detect_deadlock()))
+        return list(victims)
+
+    def take_delay(self):
+        delay = self.pending_delay
+        self.pending_delay = 0.0
+        return delay
+
+    def network_stats(self):
+        return {
+            'sites': len(self.sites),
+            'messages_sent': self.network.messages_sent,
+            'messages_lost': self.network.messages_lost,
+            'messages_by_kind': dict(self.network.messages_by_kind),
+            'local_messages': sum(site.local_messages for site in self.sites),
+            'committed_transactions': self.committed_transactions,
+            'cross_site_transactions': self.cross_site_transactions,
+            'cross_site_ratio': self.cross_site_transactions / self.committed_transactions if self.committed_transactions else 0.0,
+        }
+
+CONCURRENCY_MANAGERS = {
+    'locking': LockingConcurrencyManager,
+    'hierarchical': HierarchicalLockingConcurrencyManager,
+    'timestamping': TimestampConcurrencyManager,
+    'distributed': DistributedConcurrencyManager,
+    'mvto': MultiversionTimestampConcurrencyManager,
+    'optimistic': OptimisticConcurrencyManager,
+}
@@ -0,0 +1,735 @@
+import argparse
+import heapq
+import itertools
+import random
+import sys
+import time
+
+from concurrency import DataItem, Transaction, CONCURRENCY_MANAGERS, VICTIM_POLICIES, DEADLOCK_POLICIES, PARTITIONING_SCHEMES, SITE_PROTOCOLS, VALIDATION_MODES, FORWARD_VICTIMS
+from eventlog import EventLog, CallbackSink, JsonlTraceSink, SEVERITY_LEVELS
+from metrics import MetricsCollector, format_metrics, write_csv, write_prometheus
+from scenario import ScenarioFile, SCENARIO_FORMATS
+from scheduletrace import ScheduleRecorder, ScheduleTrace, NO_INDEX
+from workload import WorkloadConfig, KEY_DISTRIBUTIONS, LENGTH_DISTRIBUTIONS, generate_workload, stream_workload
+
+DEFAULT_SERVICE_TIMES = {
+    'read': 1.0,
+    'write': 2.0,
+    'request_lock': 0.5,
+    'commit': 1.0,
+    'restart': 1.0,
+}
+
+BACKOFF_POLICIES = ('immediate', 'exponential', 'jittered')
+
+def backoff_delay(policy, restarts, base, cap, rng):
+    if policy == 'immediate':
+        return 0.0
+    backoff = min(cap, base * 2.0 ** min(restarts, 63))
+    if policy == 'jittered':
+        backoff = rng.uniform(0.0, backoff)
+    return backoff
+
+DEFAULT_INITIAL_DATA_ITEMS = {
+    'X': 100,
+    'Y': 200,
+    'Z': 300
+}
+
+def default_scenarios():
+    return {
+        'locking': [
+            Transaction('T1', [('read', 'X'), ('write', 'Y', 150), ('read', 'Z')]),
+            Transaction('T2', [('read', 'Y'), ('write', 'X', 250), ('read', 'Z')]),
+            Transaction('T3', [('request_lock', 'X', 'X'), ('request_lock', 'Y', 'X')]),
+            Transaction('T4', [('request_lock', 'Y', 'X'), ('request_lock', 'X', 'X')]),
+            Transaction('T5', [('read', 'X'), ('write', 'X', 110)]),
+        ],
+        'hierarchical': [
+            Transaction('T1', [('read', 'X'), ('write', 'Y', 150), ('read', 'Z')]),
+            Transaction('T2', [('read', 'Y'), ('write', 'X', 250), ('read', 'Z')]),
+            Transaction('T3', [('request_lock', 'X', 'X'), ('request_lock', 'Y', 'X')]),
+            Transaction('T4', [('request_lock', 'Y', 'X'), ('request_lock', 'X', 'X')]),
+            Transaction('T5', [('read', 'X'), ('write', 'X', 110)]),
+        ],
+        'timestamping': [
+            Transaction('T1', [('read', 'X'), ('write', 'Y', 150)]),
+            Transaction('T2', [('read', 'Y'), ('write', 'X', 250)]),
+            Transaction('T3', [('write', 'X', 500)]),
+            Transaction('T4', [('read', 'X'), ('write', 'Y', 550)]),
+            Transaction('T5', [('write', 'Y', 10)]),
+            Transaction('T6', [('read', 'Y'), ('write', 'Z', 20)]),
+            Transaction('T7', [('read', 'Y'), ('write', 'X', 70)]),
+            Transaction('T8', [('write', 'Y', 80)]),
+        ],
+        'mvto': [
+            Transaction('T1', [('read', 'X'), ('write', 'Y', 150)]),
+            Transaction('T2', [('read', 'Y'), ('write', 'X', 250)]),
+            Transaction('T3', [('write', 'X', 500)]),
+            Transaction('T4', [('read', 'X'), ('write', 'Y', 550)]),
+            Transaction('T5', [('write', 'Y', 10)]),
+            Transaction('T6', [('read', 'Y'), ('write', 'Z', 20)]),
+            Transaction('T7', [('read', 'Y'), ('write', 'X', 70)]),
+            Transaction('T8', [('write', 'Y', 80)]),
+        ],
+        'optimistic': [
+            Transaction('T1', [('read', 'X'), ('write', 'Y', 150), ('read', 'Z')]),
+            Transaction('T2', [('read', 'Y'), ('write', 'X', 250), ('read', 'Z')]),
+            Transaction('T3', [('read', 'Z'), ('write', 'Z', 330)]),
+            Transaction('T4', [('read', 'X'), ('read', 'Y')]),
+            Transaction('T5', [('read', 'X'), ('write', 'X', 110)]),
+        ],
+        'distributed': [
+            Transaction('T1', [('read', 'X'), ('write', 'Y', 150), ('read', 'Z')]),
+            Transaction('T2', [('read', 'Y'), ('write', 'X', 250), ('read', 'Z')]),
+            Transaction('T3', [('request_lock', 'X', 'X'), ('request_lock', 'Y', 'X')]),
+            Transaction('T4', [('request_lock', 'Y', 'X'), ('request_lock', 'X', 'X')]),
+            Transaction('T5', [('read', 'X'), ('write', 'X', 110)]),
+        ],
+    }
+
+class SimulationStats:
+    def __init__(self):
+        self.steps = 0
+        self.operations = 0
+        self.commits = 0
+        self.aborts = 0
+        self.restarts = 0
+        self.retried_transactions = 0
+        self.max_retries = 0
+        self.deadlocks = 0
+        self.messages = 0
+        self.replay_skipped = 0
+        self.wall_time = 0.0
+        self.simulated_time = 0.0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record_latency(self, latency):
+        self.total_latency += latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+    def throughput(self):
+        return self.commits / self.wall_time if self.wall_time > 0 else 0.0
+
+    def simulated_throughput(self):
+        return self.commits / self.simulated_time if self.simulated_time > 0 else 0.0
+
+    def mean_latency(self):
+        return self.total_latency / self.commits if self.commits else 0.0
+
+    def operations_per_second(self):
+        return self.operations / self.wall_time if self.wall_time > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            'steps': self.steps,
+            'operations': self.operations,
+            'commits': self.commits,
+            'aborts': self.aborts,
+            'restarts': self.restarts,
+            'retried_transactions': self.retried_transactions,
+            'max_retries': self.max_retries,
+            'deadlocks': self.deadlocks,
+            'messages': self.messages,
+            'replay_skipped': self.replay_skipped,
+            'wall_time': self.wall_time,
+            'simulated_time': self.simulated_time,
+            'throughput': self.throughput(),
+            'operations_per_second': self.operations_per_second(),
+            'simulated_throughput': self.simulated_throughput(),
+            'mean_latency': self.mean_latency(),
+            'max_latency': self.max_latency,
+        }
+
+class SimulationEngine:
+    def __init__(self, mechanism, initial_data_items, transaction_templates, log_callback=None, message_counter_callback=None, manager_options=None, service_times=None, think_time=0.0, restart_aborted=False, max_restarts=None, event_log=None, recorder=None, replay=None, metrics=None,
+                 backoff='immediate', backoff_base=1.0, backoff_cap=1024.0, seed=None, arrival_rate=None, multiprogramming_level=None, retain_finished=True):
+        if mechanism not in CONCURRENCY_MANAGERS:
+            raise ValueError(f"Unknown concurrency mechanism: {mechanism}")
+        if backoff not in BACKOFF_POLICIES:
+            raise ValueError(f"Unknown backoff policy: {backoff}")
+        if arrival_rate is not None and multiprogramming_level is not None:
+            raise ValueError("Use either an arrival rate or a multiprogramming level, not both.")
+        if arrival_rate is not None and arrival_rate <= 0 or multiprogramming_level is not None and multiprogramming_level < 1:
+            raise ValueError("The arrival rate and multiprogramming level must be positive.")
+        self.mechanism = mechanism
+        self.initial_data_items = initial_data_items
+        self.transaction_templates = transaction_templates
+        self.log_callback = log_callback
+        self.event_log = event_log if event_log is not None else EventLog()
+        if log_callback is not None:
+            self.event_log.add_sink(CallbackSink(log_callback))
+        self.log_message = self.event_log.log
+        self.message_counter_callback = message_counter_callback
+        self.manager_options = manager_options or {}
+        self.service_times = dict(DEFAULT_SERVICE_TIMES)
+        if service_times:
+            self.service_times.update(service_times)
+        self.think_time = think_time
+        self.restart_aborted = restart_aborted
+        self.max_restarts = max_restarts
+        self.backoff = backoff
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.restart_counts = {}
+        self.arrival_rate = arrival_rate
+        self.multiprogramming_level = multiprogramming_level
+        self.retain_finished = retain_finished
+        self.pending_transactions = iter(())
+        self.recorder = recorder
+        self.metrics = metrics
+        self.replay_source = replay
+        self.replay = None
+        self.replay_admitted = 0
+
+        self.data_items = {}
+        self.transactions = {}
+        self.event_queue = []
+        self.event_sequence = 0
+        self.clock = 0.0
+        self.concurrency_manager = None
+        self.global_timestamp_counter = 0
+        self.message_count = 0
+        self.stats = SimulationStats()
+        self.finished = False
+        self.reset()
+
+    def update_message_count(self, count=1):
+        self.message_count += count
+        self.stats.messages = self.message_count
+        if self.message_counter_callback is not None:
+            self.message_counter_callback(self.message_count)
+
+    def reset(self):
+        self.message_count = 0
+        self.update_message_count(0)
+        self.global_timestamp_counter = 0
+        self.stats = SimulationStats()
+        self.finished = False
+
+        self.data_items.clear()
+        for name, value in self.initial_data_items.items():
+            self.data_items[name] = DataItem(name, value)
+
+        self.transactions.clear()
+        self.event_queue = []
+        self.event_sequence = 0
+        self.clock = 0.0
+        self.concurrency_manager = None
+
+    def start(self):
+        self.message_count = 0
+        self.update_message_count(0)
+        self.global_timestamp_counter = 0
+        self.stats = SimulationStats()
+        self.finished = False
+
+        for item in self.data_items.values():
+            item.reset_concurrency_state()
+
+        self.transactions.clear()
+        self.restart_counts.clear()
+        self.rng.seed(self.seed)
+        self.event_queue = []
+        self.event_sequence = 0
+        self.clock = 0.0
+        self.event_log.time = 0.0
+        self.replay = iter(self.replay_source) if self.replay_source is not None else None
+        self.pending_transactions = iter(self.transaction_templates)
+        self.replay_admitted = 0
+
+        manager_class = CONCURRENCY_MANAGERS[self.mechanism]
+        self.concurrency_manager = manager_class(self.data_items, self.log_message, self.update_message_count, **self.manager_options)
+        if hasattr(self.concurrency_manager, "on_wakeup"):
+            self.concurrency_manager.on_wakeup = self.wake_transaction
+        if hasattr(self.concurrency_manager, "on_abort"):
+            self.concurrency_manager.on_abort = self.transaction_aborted
+
+        if self.replay is None:
+            if self.arrival_rate is not None:
+                self.schedule_arrival(self.clock)
+            else:
+                self.admit(self.multiprogramming_level)
+
+    def admit(self, limit=None):
+        admitted = 0
+        for template in itertools.islice(self.pending_transactions, limit):
+            self.global_timestamp_counter += 1
+            self.admit_transaction(template, self.global_timestamp_counter)
+            admitted += 1
+        return admitted
+
+    def admit_transaction(self, template, timestamp):
+        self.replay_admitted += 1
+        new_t = template.spawn(timestamp)
+        new_t.start_time = self.clock if self.replay is None else None
+        self.transactions[new_t.id] = new_t
+        if hasattr(self.concurrency_manager, "begin_transaction"):
+            self.concurrency_manager.begin_transaction(new_t)
+        if self.recorder is not None:
+            self.record(new_t, 0, 'begin', None, timestamp, "started")
+        self.schedule(new_t, self.clock)
+
+    def schedule_arrival(self, at_time):
+        self.event_sequence += 1
+        heapq.heappush(self.event_queue, (at_time, self.event_sequence, None, 0))
+
+    def transaction_finished(self, transaction):
+        if not self.retain_finished:
+            self.transactions.pop(transaction.id, None)
+            self.restart_counts.pop(transaction.id, None)
+        if self.multiprogramming_level is not None and self.replay is None:
+            self.admit(1)
+
+    def schedule(self, transaction, at_time):
+        if self.replay is not None:
+            return
+        self.event_sequence += 1
+        heapq.heappush(self.event_queue, (at_time, self.event_sequence, transaction, self.restart_counts.get(transaction.id, 0)))
+
+    def wake_transaction(self, transaction):
+        if self.metrics is not None:
+            self.metrics.wait_ended(transaction.id, self.clock)
+        self.schedule(transaction, self.clock)
+
+    def transaction_aborted(self, transaction, deadlock=False, restartable=True):
+        self.stats.aborts += 1
+        if self.metrics is not None:
+            self.metrics.wait_ended(transaction.id, self.clock)
+            self.metrics.transaction_aborted(transaction.abort_cause)
+        if deadlock:
+            self.stats.deadlocks += 1
+        if not (self.restart_aborted and restartable):
+            self.transaction_finished(transaction)
+            return
+        restarts = self.restart_counts.get(transaction.id, 0)
+        if self.max_restarts is not None and restarts >= self.max_restarts:
+            self.log_message("T{t} reached the restart limit ({limit}) and stays ABORTED.", "red", t=transaction.id, limit=self.max_restarts)
+            self.transaction_finished(transaction)
+            return
+        self.restart_counts[transaction.id] = restarts + 1
+        self.stats.restarts += 1
+        if restarts == 0:
+            self.stats.retried_transactions += 1
+        if restarts + 1 > self.stats.max_retries:
+            self.stats.max_retries = restarts + 1
+
+        timestamp = transaction.timestamp
+        if not getattr(self.concurrency_manager, "restart_with_original_timestamp", False):
+            self.global_timestamp_counter += 1
+            timestamp = self.global_timestamp_counter
+        transaction.reset_state(timestamp)
+        delay = self.restart_delay(restarts)
+        self.log_message("T{t} RESTARTS (attempt {attempt}, TS={ts}) after {delay:.2f}.", "blue", t=transaction.id, ts=timestamp, attempt=restarts + 2, delay=delay)
+        if self.replay is not None:
+            return
+        if hasattr(self.concurrency_manager, "begin_transaction"):
+            self.concurrency_manager.begin_transaction(transaction)
+        if self.recorder is not None:
+            self.record(transaction, 0, 'begin', None, timestamp, "started")
+        self.schedule(transaction, self.clock + delay)
+
+    def restart_delay(self, restarts):
+        return self.service_times['restart'] + backoff_delay(self.backoff, restarts, self.backoff_base, self.backoff_cap, self.rng)
+
+    def next_replayed_event(self):
+        for record in self.replay:
+            if record.op_type == 'begin':
+                self.replay_begin(record)
+                continue
+            if record.position != NO_INDEX and record.position >= self.replay_admitted:
+                self.admit(record.position + 1 - self.replay_admitted)
+            transaction = self.transactions.get(record.transaction)
+            if transaction is not None and transaction.state == "RUNNING" and transaction.current_op_index == record.op_index:
+                self.clock = max(self.clock, record.time)
+                self.event_log.time = self.clock
+                if transaction.start_time is None:
+                    transaction.start_time = self.clock
+                return transaction
+            self.stats.replay_skipped += 1
+        self.admit()
+        self.replay = None
+        self.event_queue = []
+        for transaction in self.transactions.values():
+            if transaction.state == "RUNNING":
+                if transaction.start_time is None:
+                    transaction.start_time = self.clock
+                if hasattr(self.concurrency_manager, "begin_transaction"):
+                    self.concurrency_manager.begin_transaction(transaction)
+                self.schedule(transaction, self.clock)
+        return None
+
+    def replay_begin(self, record):
+        self.global_timestamp_counter = max(self.global_timestamp_counter, record.value)
+        if record.attempt == 0:
+            if record.position != NO_INDEX and record.position >= self.replay_admitted:
+                self.admit(record.position - self.replay_admitted)
+                template = next(self.pending_transactions, None)
+                if template is not None:
+                    self.admit_transaction(template, record.value)
+            return
+        transaction = self.transactions.get(record.transaction)
+        if transaction is None or transaction.state != "RUNNING" or transaction.current_op_index != 0:
+            self.stats.replay_skipped += 1
+            return
+        transaction.timestamp = record.value
+        if hasattr(self.concurrency_manager, "begin_transaction"):
+            self.concurrency_manager.begin_transaction(transaction)
+        if self.recorder is not None:
+            self.record(transaction, 0, 'begin', None, transaction.timestamp, "started")
+
+    def next_event(self):
+        if self.replay is not None:
+            transaction = self.next_replayed_event()
+            if transaction is not None:
+                return transaction
+        while self.event_queue:
+            at_time, _, transaction, attempt = heapq.heappop(self.event_queue)
+            if transaction is None:
+                self.clock = at_time
+                self.event_log.time = at_time
+                if self.admit(1):
+                    self.schedule_arrival(at_time + self.rng.expovariate(self.arrival_rate))
+                continue
+            if transaction.state != "COMMITTED" and transaction.state != "ABORTED" and attempt == self.restart_counts.get(transaction.id, 0):
+                self.clock = at_time
+                self.event_log.time = at_time
+                return transaction
+        return None
+
+    def step(self):
+        current_t = self.next_event()
+
+        if current_t is None:
+            if not self.finished:
+                self.finished = True
+                self.stats.simulated_time = max(self.stats.simulated_time, self.clock)
+                unfinished = [t for t in self.transactions.values() if t.state == "RUNNING" or t.state == "WAITING"]
+                if unfinished:
+                    parked = sum(1 for t in unfinished if t.state == "WAITING")
+                    self.log_message("No runnable transactions left; {unfinished} unfinished ({parked} WAITING). Simulation stalled.", "red", unfinished=len(unfinished), parked=parked)
+                else:
+                    self.log_message("All transactions have completed or aborted. Simulation finished.", "green")
+            return False
+
+        self.stats.steps += 1
+        op_index = current_t.current_op_index
+        operation = current_t.current_operation()
+
+        if operation is None:
+            self.log_message("T{t}: All operations processed. Attempting COMMIT.", "blue", t=current_t.id)
+            self.concurrency_manager.commit_transaction(current_t)
+            if self.recorder is not None:
+                self.record(current_t, op_index, 'commit', None, None, "aborted" if current_t.state == "ABORTED" else "committed")
+            if current_t.state == "ABORTED":
+                self.transaction_aborted(current_t)
+                self.resolve_deadlocks()
+                return True
+            current_t.finish_time = self.clock + self.service_times['commit'] + self.network_delay()
+            self.stats.commits += 1
+            self.stats.record_latency(current_t.finish_time - current_t.start_time)
+            if self.metrics is not None:
+                self.metrics.transaction_committed(current_t.finish_time - current_t.start_time)
+            self.stats.simulated_time = max(self.stats.simulated_time, current_t.finish_time)
+            self.transaction_finished(current_t)
+            self.resolve_deadlocks()
+            return True
+
+        op_type, item_name, *value_arg = operation
+        value = value_arg[0] if value_arg else None
+        data_item = self.data_items.get(item_name)
+
+        if not data_item:
+            self.concurrency_manager.abort_transaction(current_t, f"Data item {item_name} not found for {current_t.id}.", 'missing_item')
+            if self.recorder is not None:
+                self.record(current_t, op_index, op_type, item_name, value, "aborted")
+            self.transaction_aborted(current_t, restartable=False)
+            return True
+
+        op_succeeded = self.concurrency_manager.process_operation(current_t, op_type, data_item, value)
+        delay = self.network_delay()
+        if self.recorder is not None:
+            self.record(current_t, op_index, op_type, item_name, value, "ok" if op_succeeded else "aborted" if current_t.state == "ABORTED" else "blocked")
+
+        if op_succeeded:
+            self.stats.operations += 1
+            current_t.current_op_index += 1
+            self.schedule(current_t, self.clock + self.service_times.get(op_type, 0.0) + self.think_time + delay)
+        elif current_t.state == "ABORTED":
+            self.transaction_aborted(current_t)
+        elif self.metrics is not None and current_t.state == "WAITING":
+            self.metrics.wait_began(current_t.id, item_name, self.clock, self.queue_length(item_name))
+
+        self.resolve_deadlocks()
+        return True
+
+    def queue_length(self, item_name):
+        if hasattr(self.concurrency_manager, "queue_length"):
+            return self.concurrency_manager.queue_length(item_name)
+        return 0
+
+    def record(self, transaction, op_index, op_type, item_name, value, outcome):
+        self.recorder.record(self.clock, transaction.id, op_index, self.restart_counts.get(transaction.id, 0), op_type, item_name, value, outcome)
+
+    def network_delay(self):
+        if hasattr(self.concurrency_manager, "take_delay"):
+            return self.concurrency_manager.take_delay()
+        return 0.0
+
+    def resolve_deadlocks(self):
+        if not hasattr(self.concurrency_manager, "detect_deadlock"):
+            return
+        victim_ids = self.concurrency_manager.detect_deadlock()
+        while victim_ids:
+            self.log_message("\n{banner}\n!!! DEADLOCK DETECTED, aborting victims: {victims} !!!\n{banner}\n", "red", banner='*' * 30, victims=', '.join(victim_ids))
+            for victim_id in victim_ids:
+                t_to_abort = self.transactions.get(victim_id)
+                if t_to_abort and t_to_abort.state == "WAITING":
+                    self.concurrency_manager.abort_transaction(t_to_abort, "Deadlock Resolution", 'deadlock_victim')
+                    self.transaction_aborted(t_to_abort, deadlock=True)
+            victim_ids = self.concurrency_manager.detect_deadlock()
+
+    def run(self, max_steps=None):
+        started = time.perf_counter()
+        steps = 0
+        while max_steps is None or steps < max_steps:
+            if not self.step():
+                break
+            steps += 1
+        self.stats.wall_time += time.perf_counter() - started
+        return self.stats
+
+def format_stats(mechanism, stats):
+    return "\n".join([
+        f"Mechanism:          {mechanism}",
+        f"Steps:              {stats.steps}",
+        f"Operations:         {stats.operations}",
+        f"Committed:          {stats.commits}",
+        f"Aborted:            {stats.aborts}",
+        f"Restarts:           {stats.restarts} ({stats.retried_transactions} transactions, max {stats.max_retries} per transaction)",
+        f"Deadlocks:          {stats.deadlocks}",
+        f"Total Messages:     {stats.messages}",
+        f"Wall time:          {stats.wall_time:.4f} s",
+        f"Simulated time:     {stats.simulated_time:.1f}",
+        f"Mean latency:       {stats.mean_latency():.2f} (simulated)",
+        f"Throughput:         {stats.throughput():.1f} commits/s",
+        f"Operations/s:       {stats.operations_per_second():.1f}",
+    ])
+
+def format_lock_stats(lock_stats):
+    lines = [f"Lock table entries: {lock_stats['lock_entries']} (peak {lock_stats['peak_lock_entries']})"]
+    if 'escalations' in lock_stats:
+        lines.append(f"Lock escalations:   {lock_stats['escalations']}")
+    return "\n".join(lines)
+
+def format_network_stats(network_stats):
+    by_kind = ", ".join(f"{kind}={count}" for kind, count in sorted(network_stats['messages_by_kind'].items()))
+    return "\n".join([
+        f"Sites:              {network_stats['sites']}",
+        f"Network messages:   {network_stats['messages_sent']} ({network_stats['messages_lost']} lost)",
+        f"Messages by kind:   {by_kind or 'none'}",
+        f"Site-local msgs:    {network_stats['local_messages']}",
+        f"Cross-site commits: {network_stats['cross_site_transactions']} of {network_stats['committed_transactions']} ({network_stats['cross_site_ratio']:.1%})",
+    ])
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="DDBMS Concurrency Simulator")
+    parser.add_argument("--headless", action="store_true", help="run the simulation without the GUI and print a summary")
+    parser.add_argument("--mechanism", choices=sorted(CONCURRENCY_MANAGERS), default="locking")
+    parser.add_argument("--victim-policy", choices=sorted(VICTIM_POLICIES), default="youngest", help="deadlock victim selection for the locking mechanism")
+    parser.add_argument("--deadlock-policy", choices=DEADLOCK_POLICIES, default="detection", help="deadlock handling for the locking mechanism")
+    parser.add_argument("--restart", action="store_true", help="restart aborted transactions instead of dropping them")
+    parser.add_argument("--max-restarts", type=int, default=None, help="give up on a transaction after this many restarts")
+    parser.add_argument("--backoff", choices=BACKOFF_POLICIES, default="immediate", help="delay policy before restarting an aborted transaction")
+    parser.add_argument("--backoff-base", type=float, default=1.0, help="first exponential backoff delay; doubled on every further restart")
+    parser.add_argument("--backoff-cap", type=float, default=1024.0, help="upper bound of the exponential backoff delay")
+    parser.add_argument("--service-time", action="append", default=[], metavar="OP=TIME", help="simulated service time of an operation type (read, write, request_lock, commit, restart)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="simulated think time between a transaction's operations")
+    parser.add_argument("--max-steps", type=int, default=None, help="stop after this many scheduler steps")
+    parser.add_argument("--verbose", action="store_true", help="print every log message to stdout")
+    parser.add_argument("--trace", default=None, metavar="FILE", help="write every log event as JSON lines to this file")
+    parser.add_argument("--log-level", choices=list(SEVERITY_LEVELS), default="debug", help="drop log events below this severity")
+    parser.add_argument("--record", default=None, metavar="FILE", help="record the executed schedule to this binary trace file")
+    parser.add_argument("--replay", default=None, metavar="FILE", help="replay the workload and interleaving of a recorded schedule")
+    parser.add_argument("--metrics", action="store_true", help="collect contention and latency metrics and print a summary")
+    parser.add_argument("--metrics-prometheus", default=None, metavar="FILE", help="write collected metrics in Prometheus text format to this file")
+    parser.add_argument("--metrics-csv", default=None, metavar="FILE", help="write collected metrics as CSV to this file")
+
+    parser.add_argument("--validation", choices=VALIDATION_MODES, default="backward", help="validation mode for the optimistic mechanism")
+    parser.add_argument("--forward-victim", choices=FORWARD_VICTIMS, default="readers", help="under forward validation, abort the conflicting active readers or the validating transaction")
+
+    hierarchical = parser.add_argument_group("hierarchical locking", "options for --mechanism hierarchical (also uses --partitioning, --victim-policy and --deadlock-policy)")
+    hierarchical.add_argument("--partitions", type=int, default=8, help="number of lock partitions between the database and its items")
+    hierarchical.add_argument("--escalation-threshold", type=int, default=32, help="item locks under one partition before escalating to a partition lock (0 disables)")
+
+    mvto = parser.add_argument_group("multiversion timestamp ordering", "options for --mechanism mvto")
+    mvto.add_argument("--no-thomas-write-rule", dest="thomas_write_rule", action="store_false", help="insert obsolete writes as versions instead of skipping them")
+    mvto.add_argument("--gc-interval", type=int, default=64, help="finished transactions between version garbage collections")
+
+    distributed = parser.add_argument_group("distributed mode", "options for --mechanism distributed")
+    distributed.add_argument("--sites", type=int, default=4, help="number of simulated sites")
+    distributed.add_argument("--partitioning", choices=PARTITIONING_SCHEMES, default="hash", help="placement of items on sites or lock partitions")
+    distributed.add_argument("--replication-factor", type=int, default=1, help="copies of each item; reads use one copy, writes all copies")
+    distributed.add_argument("--site-protocol", choices=sorted(SITE_PROTOCOLS), default="locking", help="concurrency manager run at each site")
+    distributed.add_argument("--latency", type=float, default=1.0, help="simulated one-way message latency")
+    distributed.add_argument("--latency-jitter", type=float, default=0.0, help="extra uniform random latency per message")
+    distributed.add_argument("--loss-rate", type=float, default=0.0, help="probability a message is lost and retransmitted")
+    distributed.add_argument("--vote-retransmits", type=int, default=None, help="retransmissions of a two-phase commit prepare or vote before the coordinator presumes the participant lost and aborts (default: retry forever)")
+
+    workload = parser.add_argument_group("synthetic workload", "replace the built-in scenario with a generated one when --transactions is given")
+    workload.add_argument("--transactions", type=int, default=None, help="number of generated transactions")
+    workload.add_argument("--items", type=int, default=1000, help="number of generated data items")
+    workload.add_argument("--key-distribution", choices=KEY_DISTRIBUTIONS, default="zipf")
+    workload.add_argument("--zipf-theta", type=float, default=0.99)
+    workload.add_argument("--hotspot-fraction", type=float, default=0.1, help="fraction of items that are hot (hotspot distribution)")
+    workload.add_argument("--hotspot-probability", type=float, default=0.9, help="probability an access goes to a hot item (hotspot distribution)")
+    workload.add_argument("--read-ratio", type=float, default=0.8)
+    workload.add_argument("--lock-request-ratio", type=float, default=0.0, help="fraction of operations that are explicit request_lock operations")
+    workload.add_argument("--txn-length", type=int, default=5, help="mean number of operations per transaction")
+    workload.add_argument("--length-distribution", choices=LENGTH_DISTRIBUTIONS, default="fixed")
+    workload.add_argument("--seed", type=int, default=None)
+    workload.add_argument("--stream", action="store_true", help="generate each transaction's operations on demand instead of up front")
+
+    admission = parser.add_argument_group("streaming and admission", "bound the number of live transactions for very large workloads")
+    admission.add_argument("--scenario", default=None, metavar="FILE", help="stream the workload from a JSONL or CSV scenario file")
+    admission.add_argument("--scenario-format", choices=SCENARIO_FORMATS, default=None, help="scenario file format (default: from the file extension)")
+    admission.add_argument("--arrival-rate", type=float, default=None, help="admit transactions as a Poisson process with this rate per unit of simulated time")
+    admission.add_argument("--mpl", type=int, default=None, help="multiprogramming level: keep at most this many transactions live")
+    return parser
+
+def workload_config_from_args(args):
+    return WorkloadConfig(
+        num_items=args.items,
+        num_transactions=args.transactions,
+        key_distribution=args.key_distribution,
+        zipf_theta=args.zipf_theta,
+        hotspot_fraction=args.hotspot_fraction,
+        hotspot_probability=args.hotspot_probability,
+        read_ratio=args.read_ratio,
+        lock_request_ratio=args.lock_request_ratio,
+        txn_length=args.txn_length,
+        length_distribution=args.length_distribution,
+        seed=args.seed,
+    )
+
+def parse_service_times(pairs):
+    service_times = {}
+    for pair in pairs:
+        op_type, _, duration = pair.partition("=")
+        if op_type not in DEFAULT_SERVICE_TIMES or not duration:
+            raise ValueError(f"Invalid service time: {pair}")
+        service_times[op_type] = float(duration)
+    return service_times
+
+def manager_options_from_args(args, mechanism):
+    manager_options = {}
+    if mechanism == "locking":
+        manager_options['victim_policy'] = args.victim_policy
+        manager_options['deadlock_policy'] = args.deadlock_policy
+    elif mechanism == "hierarchical":
+        manager_options.update(
+            victim_policy=args.victim_policy,
+            deadlock_policy=args.deadlock_policy,
+            partitions=args.partitions,
+            partitioning=args.partitioning,
+            escalation_threshold=args.escalation_threshold or None,
+        )
+    elif mechanism == "optimistic":
+        manager_options.update(validation=args.validation, forward_victim=args.forward_victim)
+    elif mechanism == "mvto":
+        manager_options.update(thomas_write_rule=args.thomas_write_rule, gc_interval=args.gc_interval)
+    elif mechanism == "distributed":
+        manager_options.update(
+            sites=args.sites,
+            partitioning=args.partitioning,
+            replication_factor=args.replication_factor,
+            site_protocol=args.site_protocol,
+            latency=args.latency,
+            latency_jitter=args.latency_jitter,
+            loss_rate=args.loss_rate,
+            vote_retransmits=args.vote_retransmits,
+            victim_policy=args.victim_policy,
+            seed=args.seed,
+        )
+    return manager_options
+
+def run_headless(args):
+    event_log = EventLog(level=SEVERITY_LEVELS[args.log_level])
+    if args.verbose:
+        event_log.add_sink(CallbackSink(lambda message, color="black": print(message)))
+    if args.trace:
+        event_log.add_sink(JsonlTraceSink(args.trace))
+
+    manager_options = manager_options_from_args(args, args.mechanism)
+
+    replay = ScheduleTrace(args.replay) if args.replay else None
+    streaming = replay is not None or args.scenario is not None or args.stream
+    if replay is not None:
+        initial_data_items, transactions = replay.initial_data_items, replay.transactions()
+    elif args.scenario is not None:
+        transactions = ScenarioFile(args.scenario, args.scenario_format)
+        initial_data_items = transactions.initial_data_items
+    elif args.transactions is not None and args.stream:
+        initial_data_items, transactions = stream_workload(workload_config_from_args(args))
+    elif args.transactions is not None:
+        initial_data_items, transactions = generate_workload(workload_config_from_args(args))
+    else:
+        initial_data_items, transactions = DEFAULT_INITIAL_DATA_ITEMS, default_scenarios()[args.mechanism]
+    recorder = ScheduleRecorder(args.record, initial_data_items, transactions) if args.record else None
+    metrics = MetricsCollector() if args.metrics or args.metrics_prometheus or args.metrics_csv else None
+
+    engine = SimulationEngine(
+        args.mechanism,
+        initial_data_items,
+        transactions,
+        manager_options=manager_options,
+        service_times=parse_service_times(args.service_time),
+        think_time=args.think_time,
+        restart_aborted=args.restart,
+        max_restarts=args.max_restarts,
+        backoff=args.backoff,
+        backoff_base=args.backoff_base,
+        backoff_cap=args.backoff_cap,
+        seed=args.seed,
+        arrival_rate=args.arrival_rate,
+        multiprogramming_level=args.mpl,
+        retain_finished=not streaming,
+        event_log=event_log,
+        recorder=recorder,
+        replay=replay,
+        metrics=metrics,
+    )
+    engine.start()
+    try:
+        stats = engine.run(args.max_steps)
+    finally:
+        event_log.close()
+        if recorder is not None:
+            recorder.close()
+        if replay is not None:
+            replay.close()
+    print(format_stats(args.mechanism, stats))
+    if replay is not None:
+        print(f"Diverged records:   {stats.replay_skipped} of {len(replay)}")
+    if metrics is not None:
+        print(format_metrics(metrics))
+        if args.metrics_prometheus:
+            write_prometheus(metrics, args.metrics_prometheus)
+        if args.metrics_csv:
+            write_csv(metrics, args.metrics_csv)
+    if hasattr(engine.concurrency_manager, "lock_stats"):
+        print(format_lock_stats(engine.concurrency_manager.lock_stats()))
+    if hasattr(engine.concurrency_manager, "network_stats"):
+        print(format_network_stats(engine.concurrency_manager.network_stats()))
+    return 0
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    return run_headless(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
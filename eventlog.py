@@ -0,0 +1,171 @@
+import json
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+SEVERITY_NAMES = {DEBUG: 'debug', INFO: 'info', WARNING: 'warning', ERROR: 'error'}
+SEVERITY_LEVELS = {name: level for level, name in SEVERITY_NAMES.items()}
+
+SEVERITY_BY_COLOR = {
+    'blue': DEBUG,
+    'black': INFO,
+    'green': INFO,
+    'orange': WARNING,
+    'red': ERROR,
+}
+
+class Event:
+    __slots__ = ('seq', 'time', 'severity', 'color', 'template', 't_id', 'item', 'mode', 'ts', 'site', 'details')
+
+    def __init__(self, seq, time, severity, color, template, t_id, item, mode, ts, site, details):
+        self.seq = seq
+        self.time = time
+        self.severity = severity
+        self.color = color
+        self.template = template
+        self.t_id = t_id
+        self.item = item
+        self.mode = mode
+        self.ts = ts
+        self.site = site
+        self.details = details
+
+    def format(self):
+        if self.t_id is None and self.item is None and self.mode is None and self.ts is None and not self.details:
+            message = self.template
+        else:
+            details = {name: value() if callable(value) else value for name, value in self.details.items()}
+            message = self.template.format(t=self.t_id, item=self.item, mode=self.mode, ts=self.ts, **details)
+        if self.site is not None:
+            return f"[S{self.site}] {message}"
+        return message
+
+    def as_dict(self):
+        record = {'seq': self.seq, 'time': self.time, 'level': SEVERITY_NAMES[self.severity]}
+        for name in ('t_id', 'item', 'mode', 'ts', 'site'):
+            value = getattr(self, name)
+            if value is not None:
+                record[name] = value
+        for name, value in self.details.items():
+            record[name] = value() if callable(value) else value
+        return record
+
+class NullSink:
+    def write(self, event):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class CallbackSink:
+    def __init__(self, callback):
+        self.callback = callback
+
+    def write(self, event):
+        self.callback(event.format(), event.color)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class RingBufferSink:
+    def __init__(self, capacity=10000):
+        self.events = deque(maxlen=capacity)
+        self.dropped = 0
+
+    def write(self, event):
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append(event)
+
+    def drain(self):
+        events = list(self.events)
+        self.events.clear()
+        dropped = self.dropped
+        self.dropped = 0
+        return events, dropped
+
+    def clear(self):
+        self.events.clear()
+        self.dropped = 0
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class JsonlTraceSink:
+    def __init__(self, path, buffer_size=1 << 20):
+        self.file = open(path, "w", encoding="utf-8", buffering=buffer_size)
+        self.template_ids = {}
+
+    def write(self, event):
+        template_id = self.template_ids.get(event.template)
+        if template_id is None:
+            template_id = self.template_ids[event.template] = len(self.template_ids)
+            self.file.write(json.dumps({'template': template_id, 'text': event.template}, separators=(",", ":")) + "\n")
+        record = event.as_dict()
+        record['event'] = template_id
+        self.file.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+def read_trace(path):
+    templates = {}
+    with open(path, encoding="utf-8") as trace_file:
+        for line in trace_file:
+            record = json.loads(line)
+            if 'text' in record:
+                templates[record['template']] = record['text']
+                continue
+            record['template'] = templates[record.pop('event')]
+            yield record
+
+class EventLog:
+    def __init__(self, sinks=(), level=DEBUG):
+        self.sinks = []
+        self.level = level
+        self.time = 0.0
+        self.sequence = 0
+        for sink in sinks:
+            self.add_sink(sink)
+
+    def add_sink(self, sink):
+        if not isinstance(sink, NullSink):
+            self.sinks.append(sink)
+
+    def enabled(self, severity=DEBUG):
+        return bool(self.sinks) and severity >= self.level
+
+    def log(self, template, color="black", t=None, item=None, mode=None, ts=None, site=None, **details):
+        if not self.sinks:
+            return
+        severity = SEVERITY_BY_COLOR.get(color, INFO)
+        if severity < self.level:
+            return
+        self.sequence += 1
+        event = Event(self.sequence, self.time, severity, color, template, t, item, mode, ts, site, details)
+        for sink in self.sinks:
+            sink.write(event)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
@@ -1,264 +1,178 @@
+import sys
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 
-class DataItem:
-    def __init__(self, name, initial_value):
-        self.name = name
-        self.value = initial_value
-        self.reset_concurrency_state()
-
-    def reset_concurrency_state(self):
-        self.lock_owner = None
-        self.lock_type = None
-        self.waiting_queue = []
-        self.read_timestamp = 0
-        self.write_timestamp = 0
-
-    def __repr__(self):
-        return f"DataItem({self.name}, Value={self.value})"
-
-class Transaction:
-    def __init__(self, tid, operations_list, timestamp=None):
-        self.id = tid
-        self.operations = operations_list
-        self.reset_state(timestamp)
-
-    def reset_state(self, timestamp=None):
-        self.state = "RUNNING"
-        self.current_op_index = 0
-        self.locks_held = []
-        self.timestamp = timestamp if timestamp is not None else 0
-
-    def __repr__(self):
-        return f"Transaction({self.id}, State={self.state})"
-
-class LockingConcurrencyManager:
-    def __init__(self, data_items_dict, log_callback, message_counter_callback):
-        self.data_items = data_items_dict
-        self.log_message = log_callback
-        self.update_message_count = message_counter_callback
-
-    def acquire_lock(self, transaction, data_item, lock_type):
-        self.log_message(f"T{transaction.id} requests {lock_type} lock on {data_item.name}.", "blue")
-        self.update_message_count(1)
-
-        if data_item.lock_owner is None:
-            data_item.lock_owner = transaction.id
-            data_item.lock_type = lock_type
-            transaction.locks_held.append(data_item)
-            transaction.state = "RUNNING"
-            self.log_message(f"T{transaction.id} granted {lock_type} lock on {data_item.name}.", "green")
-            self.update_message_count(1)
-            return True
-        elif data_item.lock_owner == transaction.id:
-            if lock_type == 'S' and data_item.lock_type == 'X':
-                self.log_message(f"T{transaction.id} already holds X lock on {data_item.name}. S request is compatible.", "green")
-                return True
-            elif lock_type == 'X' and data_item.lock_type == 'S':
-                if not data_item.waiting_queue:
-                    data_item.lock_type = 'X'
-                    self.log_message(f"T{transaction.id} upgraded S lock to X lock on {data_item.name}.", "green")
-                    self.update_message_count(1)
-                    return True
-                else:
-                    self.log_message(f"T{transaction.id} cannot upgrade S to X on {data_item.name} (other transactions waiting).", "orange")
-            elif lock_type == data_item.lock_type:
-                self.log_message(f"T{transaction.id} already holds {lock_type} lock on {data_item.name}.", "green")
-                return True
+from engine import (SimulationEngine, DEFAULT_INITIAL_DATA_ITEMS, default_scenarios, build_arg_parser, run_headless,
+                    manager_options_from_args, parse_service_times, workload_config_from_args)
+from eventlog import EventLog, RingBufferSink
+from metrics import MetricsCollector, format_metrics
+from workload import generate_workload
+
+LOG_FLUSH_INTERVAL_MS = 100
+LOG_BUFFER_CAPACITY = 5000
+LOG_MAX_LINES = 5000
+AUTO_RUN_INTERVAL_MS = 30
+METRICS_REFRESH_INTERVAL_MS = 500
+MAX_STEPS_PER_TICK = 1000
+ROW_HEIGHT = 20
+
+MECHANISM_CHOICES = (
+    ("Locking", "locking"),
+    ("Hierarchical", "hierarchical"),
+    ("Timestamping", "timestamping"),
+    ("Optimistic", "optimistic"),
+    ("MVTO", "mvto"),
+    ("Distributed", "distributed"),
+)
+
+STATE_COLORS = {
+    "COMMITTED": "green",
+    "ABORTED": "red",
+    "WAITING": "orange",
+    "RUNNING": "black",
+}
+
+class ChangeTracker:
+    def __init__(self):
+        self.items = set()
+        self.transactions = set()
+
+    def write(self, event):
+        if event.t_id is not None:
+            self.transactions.add(event.t_id)
+        if event.item is not None:
+            self.items.add(event.item)
+
+    def take(self):
+        items, transactions = self.items, self.transactions
+        self.items, self.transactions = set(), set()
+        return items, transactions
+
+    def clear(self):
+        self.items.clear()
+        self.transactions.clear()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class VirtualList:
+    def __init__(self, parent, columns, row_provider):
+        self.row_provider = row_provider
+        self.keys = []
+        self.positions = {}
+        self.offset = 0
+        self.visible_rows = 0
+
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=[name for name, _ in columns], show="headings", selectmode="none", height=1)
+        for name, width in columns:
+            self.tree.heading(name, text=name)
+            self.tree.column(name, width=width, anchor="w", stretch=True)
+        for state, color in STATE_COLORS.items():
+            self.tree.tag_configure(state, foreground=color)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.scroll)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.tree.bind("<Configure>", self.resize)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll("scroll", -1 if event.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda event: self.scroll("scroll", -1, "units"))
+        self.tree.bind("<Button-5>", lambda event: self.scroll("scroll", 1, "units"))
+
+    def pack(self, **options):
+        self.frame.pack(**options)
+
+    def set_keys(self, keys):
+        self.keys = list(keys)
+        self.positions = {key: index for index, key in enumerate(self.keys)}
+        self.offset = 0
+        self.render()
+
+    def resize(self, event):
+        rows = max(1, (event.height - ROW_HEIGHT) // ROW_HEIGHT)
+        if rows == self.visible_rows:
+            return
+        for index in range(self.visible_rows, rows):
+            self.tree.insert("", "end", iid=f"row{index}")
+        for index in range(rows, self.visible_rows):
+            self.tree.delete(f"row{index}")
+        self.visible_rows = rows
+        self.render()
+
+    def scroll(self, action, amount, unit=None):
+        limit = max(0, len(self.keys) - self.visible_rows)
+        if action == "moveto":
+            offset = int(float(amount) * len(self.keys))
+        elif unit == "pages":
+            offset = self.offset + int(amount) * self.visible_rows
+        else:
+            offset = self.offset + int(amount)
+        offset = min(max(0, offset), limit)
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def render_row(self, row):
+        index = self.offset + row
+        if index < len(self.keys):
+            values, tag = self.row_provider(self.keys[index])
+            self.tree.item(f"row{row}", values=values, tags=(tag,) if tag else ())
         else:
-            is_compatible = False
-            if data_item.lock_type == 'S' and lock_type == 'S':
-                is_compatible = True
-                self.log_message(f"T{transaction.id} also granted S lock on {data_item.name} (shared).", "green")
-                self.update_message_count(1)
-                transaction.locks_held.append(data_item)
-                return True
-
-            if not is_compatible:
-                self.log_message(f"T{transaction.id} cannot get {lock_type} lock on {data_item.name}. T{data_item.lock_owner} holds {data_item.lock_type} lock. T{transaction.id} is WAITING.", "orange")
-                if transaction.id not in data_item.waiting_queue:
-                    data_item.waiting_queue.append(transaction.id)
-                transaction.state = "WAITING"
-                return False
-
-        return False
-
-    def release_lock(self, transaction, data_item):
-        if data_item.lock_owner == transaction.id or (data_item.lock_type == 'S' and transaction.id in data_item.waiting_queue):
-            if data_item.lock_owner == transaction.id:
-                self.log_message(f"T{transaction.id} releases {data_item.lock_type} lock on {data_item.name}.", "green")
-                self.update_message_count(1)
-                data_item.lock_owner = None
-                data_item.lock_type = None
-
-            if data_item in transaction.locks_held:
-                transaction.locks_held.remove(data_item)
-
-            if data_item.waiting_queue:
-                self.log_message(f"Lock on {data_item.name} is now free. Waiting transactions ({data_item.waiting_queue}) will re-attempt.", "green")
-
-    def release_all_locks(self, transaction):
-        for item in list(transaction.locks_held):
-            self.release_lock(transaction, item)
-        transaction.locks_held.clear()
-
-    def process_operation(self, transaction, op_type, data_item, value=None):
-        if op_type == 'read':
-            if self.acquire_lock(transaction, data_item, 'S'):
-                self.log_message(f"T{transaction.id} reads {data_item.name} (value: {data_item.value}).", "green")
-                return True
-            return False
-        elif op_type == 'write':
-            if self.acquire_lock(transaction, data_item, 'X'):
-                data_item.value = value
-                self.log_message(f"T{transaction.id} writes {value} to {data_item.name}.", "green")
-                return True
-            return False
-        elif op_type == 'request_lock':
-            if self.acquire_lock(transaction, data_item, value):
-                self.log_message(f"T{transaction.id} explicitly acquired {value} lock on {data_item.name}.", "green")
-                return True
-            return False
-        return False
-
-    def commit_transaction(self, transaction):
-        self.log_message(f"T{transaction.id} is COMMITTING.", "green")
-        self.update_message_count(1)
-        self.release_all_locks(transaction)
-        transaction.state = "COMMITTED"
-        self.log_message(f"T{transaction.id} COMMITTED successfully.", "green")
-
-    def abort_transaction(self, transaction, reason):
-        self.log_message(f"T{transaction.id} ABORTED (Reason: {reason}).", "red")
-        self.update_message_count(1)
-        self.release_all_locks(transaction)
-        transaction.state = "ABORTED"
-        for item in self.data_items.values():
-            if transaction.id in item.waiting_queue:
-                item.waiting_queue.remove(transaction.id)
-
-    def detect_deadlock(self, all_transactions):
-        waiting_transactions = [t for t in all_transactions if t.state == "WAITING"]
-        if not waiting_transactions:
-            return []
-
-        wait_for_graph = {}
-
-        for waiting_t in waiting_transactions:
-            if waiting_t.current_op_index < len(waiting_t.operations):
-                op_type, item_name, *_ = waiting_t.operations[waiting_t.current_op_index]
-                data_item = self.data_items.get(item_name)
-
-                if data_item and data_item.lock_owner and data_item.lock_owner != waiting_t.id:
-                    if waiting_t.id not in wait_for_graph:
-                        wait_for_graph[waiting_t.id] = []
-                    wait_for_graph[waiting_t.id].append(data_item.lock_owner)
-                elif data_item and waiting_t.id in data_item.waiting_queue and data_item.lock_owner is not None:
-                    if waiting_t.id not in wait_for_graph:
-                        wait_for_graph[waiting_t.id] = []
-                    wait_for_graph[waiting_t.id].append(data_item.lock_owner)
-
-        deadlocked_ids = []
-        for t_id, waits_for_list in wait_for_graph.items():
-            for waits_for_tid in waits_for_list:
-                if waits_for_tid in wait_for_graph and t_id in wait_for_graph[waits_for_tid]:
-                    if t_id not in deadlocked_ids:
-                        deadlocked_ids.append(t_id)
-                    if waits_for_tid not in deadlocked_ids:
-                        deadlocked_ids.append(waits_for_tid)
-        return deadlocked_ids
-
-class TimestampConcurrencyManager:
-    def __init__(self, data_items_dict, log_callback, message_counter_callback):
-        self.data_items = data_items_dict
-        self.log_message = log_callback
-        self.update_message_count = message_counter_callback
-
-    def process_operation(self, transaction, op_type, data_item, value=None):
-        ts = transaction.timestamp
-
-        if op_type == 'read':
-            self.log_message(f"T{transaction.id} (TS={ts}) attempts to READ {data_item.name}.", "blue")
-            self.update_message_count(1)
-
-            if ts < data_item.write_timestamp:
-                self.abort_transaction(transaction, f"Read Old Data (TS={ts} < WriteTS={data_item.write_timestamp})")
-                return False
-            else:
-                data_item.read_timestamp = max(data_item.read_timestamp, ts)
-                self.log_message(f"T{transaction.id} READS {data_item.name} (value: {data_item.value}). {data_item.name} ReadTS updated to {data_item.read_timestamp}.", "green")
-                return True
-        elif op_type == 'write':
-            self.log_message(f"T{transaction.id} (TS={ts}) attempts to WRITE {value} to {data_item.name}.", "blue")
-            self.update_message_count(1)
-
-            if ts < data_item.read_timestamp or ts < data_item.write_timestamp:
-                self.abort_transaction(transaction, f"Write Conflict (TS={ts} < ReadTS={data_item.read_timestamp} or WriteTS={data_item.write_timestamp})")
-                return False
-            else:
-                data_item.value = value
-                data_item.write_timestamp = ts
-                self.log_message(f"T{transaction.id} WRITES {value} to {data_item.name}. {data_item.name} WriteTS updated to {data_item.write_timestamp}.", "green")
-                return True
-        return False
-
-    def commit_transaction(self, transaction):
-        self.log_message(f"T{transaction.id} is COMMITTING.", "green")
-        self.update_message_count(1)
-        transaction.state = "COMMITTED"
-        self.log_message(f"T{transaction.id} COMMITTED successfully.", "green")
-
-    def abort_transaction(self, transaction, reason):
-        self.log_message(f"T{transaction.id} ABORTED (Reason: {reason}).", "red")
-        self.update_message_count(1)
-        transaction.state = "ABORTED"
+            self.tree.item(f"row{row}", values=(), tags=())
+
+    def render(self):
+        for row in range(self.visible_rows):
+            self.render_row(row)
+        total = len(self.keys)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def refresh(self, changed_keys):
+        for key in changed_keys:
+            index = self.positions.get(key)
+            if index is not None and self.offset <= index < self.offset + self.visible_rows:
+                self.render_row(index - self.offset)
 
 class DDBMS_Simulator_GUI:
-    def __init__(self, master):
+    def __init__(self, master, args=None):
         self.master = master
         master.title("DDBMS Concurrency Simulator")
         master.geometry("900x800")
         master.resizable(True, True)
 
-        self.data_items = {}
+        self.args = args if args is not None else build_arg_parser().parse_args([])
         self.transactions_config = {}
-        self.current_transactions = {}
-        self.concurrency_manager = None
-        self.current_mechanism = "locking"
+        self.current_mechanism = self.args.mechanism
+        self.engine = None
+        self.metrics = None
         self.message_count = 0
-        self.global_timestamp_counter = 0
+        self.auto_running = False
+        self.auto_run_job = None
+        self.log_buffer = RingBufferSink(LOG_BUFFER_CAPACITY)
+        self.change_tracker = ChangeTracker()
+        self.event_log = EventLog([self.log_buffer, self.change_tracker])
 
         self.setup_simulation_scenarios()
         self.create_widgets()
         self.reset_simulation()
+        self.master.after(LOG_FLUSH_INTERVAL_MS, self.flush_log)
+        self.master.after(METRICS_REFRESH_INTERVAL_MS, self.refresh_metrics)
 
     def setup_simulation_scenarios(self):
-        self.initial_data_items = {
-            'X': 100,
-            'Y': 200,
-            'Z': 300
-        }
-
-        self.transactions_config['locking'] = [
-            Transaction('T1', [('read', 'X'), ('write', 'Y', 150), ('read', 'Z')]),
-            Transaction('T2', [('read', 'Y'), ('write', 'X', 250), ('read', 'Z')]),
-            Transaction('T3', [('request_lock', 'X', 'X'), ('request_lock', 'Y', 'X')]),
-            Transaction('T4', [('request_lock', 'Y', 'X'), ('request_lock', 'X', 'X')]),
-            Transaction('T5', [('read', 'X'), ('write', 'X', 110)]),
-        ]
-
-        self.transactions_config['timestamping'] = [
-            Transaction('T1', [('read', 'X'), ('write', 'Y', 150)]),
-            Transaction('T2', [('read', 'Y'), ('write', 'X', 250)]),
-            Transaction('T3', [('write', 'X', 500)]),
-            Transaction('T4', [('read', 'X'), ('write', 'Y', 550)]),
-            Transaction('T5', [('write', 'Y', 10)]),
-            Transaction('T6', [('read', 'Y'), ('write', 'Z', 20)]),
-            Transaction('T7', [('read', 'Y'), ('write', 'X', 70)]),
-            Transaction('T8', [('write', 'Y', 80)]),
-        ]
+        if self.args.transactions is not None:
+            self.initial_data_items, transactions = generate_workload(workload_config_from_args(self.args))
+            self.transactions_config.update({mechanism: transactions for _, mechanism in MECHANISM_CHOICES})
+        else:
+            self.initial_data_items = dict(DEFAULT_INITIAL_DATA_ITEMS)
+            self.transactions_config.update(default_scenarios())
 
     def create_widgets(self):
+        ttk.Style(self.master).configure("Treeview", rowheight=ROW_HEIGHT)
         paned_window = ttk.PanedWindow(self.master, orient=tk.VERTICAL)
         paned_window.pack(fill=tk.BOTH, expand=True)
 
@@ -272,42 +186,37 @@ class DDBMS_Simulator_GUI:
         self.next_step_button.pack(side="left", padx=5, pady=5)
         self.next_step_button.config(state="disabled")
 
+        self.auto_run_button = ttk.Button(control_frame, text="Auto Run", command=self.toggle_auto_run)
+        self.auto_run_button.pack(side="left", padx=5, pady=5)
+        self.auto_run_button.config(state="disabled")
+
         self.reset_button = ttk.Button(control_frame, text="Reset", command=self.reset_simulation)
         self.reset_button.pack(side="left", padx=5, pady=5)
 
-        self.mechanism_var = tk.StringVar(value="locking")
-        ttk.Radiobutton(control_frame, text="Locking", variable=self.mechanism_var, value="locking", command=self.select_mechanism).pack(side="left", padx=10)
-        ttk.Radiobutton(control_frame, text="Timestamping", variable=self.mechanism_var, value="timestamping", command=self.select_mechanism).pack(side="left", padx=5)
+        self.speed_var = tk.IntVar(value=1)
+        ttk.Label(control_frame, text="Steps/tick:").pack(side="left", padx=(10, 2))
+        ttk.Scale(control_frame, from_=1, to=MAX_STEPS_PER_TICK, orient="horizontal", length=120,
+                  command=lambda value: self.speed_var.set(int(float(value)))).pack(side="left")
+        ttk.Label(control_frame, textvariable=self.speed_var, width=5).pack(side="left", padx=2)
+
+        self.mechanism_var = tk.StringVar(value=self.current_mechanism)
+        for label, mechanism in MECHANISM_CHOICES:
+            ttk.Radiobutton(control_frame, text=label, variable=self.mechanism_var, value=mechanism, command=self.select_mechanism).pack(side="left", padx=5)
 
         data_frame = ttk.LabelFrame(paned_window, text="Data Items Status")
         paned_window.add(data_frame)
-        self.data_item_labels = {}
-        for item_name in self.initial_data_items.keys():
-            label = ttk.Label(data_frame, text="", font=("Helvetica", 10))
-            label.pack(padx=5, pady=2, anchor="w")
-            self.data_item_labels[item_name] = label
+        self.data_item_list = VirtualList(data_frame, (("Item", 80), ("Value", 80), ("State", 500)), self.data_item_row)
+        self.data_item_list.pack(fill="both", expand=True)
 
         transaction_frame = ttk.LabelFrame(paned_window, text="Transactions Status")
         paned_window.add(transaction_frame)
+        self.transaction_list = VirtualList(transaction_frame, (("Transaction", 100), ("State", 100), ("TS", 60), ("Next Op", 300)), self.transaction_row)
+        self.transaction_list.pack(fill="both", expand=True)
 
-        transaction_canvas = tk.Canvas(transaction_frame)
-        scrollbar = ttk.Scrollbar(transaction_frame, orient="vertical", command=transaction_canvas.yview)
-        self.transaction_scrollable_frame = ttk.Frame(transaction_canvas)
-
-        self.transaction_scrollable_frame.bind(
-            "<Configure>",
-            lambda e: transaction_canvas.configure(
-                scrollregion=transaction_canvas.bbox("all")
-            )
-        )
-
-        transaction_canvas.create_window((0, 0), window=self.transaction_scrollable_frame, anchor="nw")
-        transaction_canvas.configure(yscrollcommand=scrollbar.set)
-
-        transaction_canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
-        self.transaction_labels = {}
+        metrics_frame = ttk.LabelFrame(paned_window, text="Contention Metrics")
+        paned_window.add(metrics_frame)
+        self.metrics_text = tk.Text(metrics_frame, wrap="word", height=6, state="disabled", font=("Courier New", 9))
+        self.metrics_text.pack(fill="both", expand=True)
 
         log_frame = ttk.LabelFrame(paned_window, text="Simulation Log")
         paned_window.add(log_frame)
@@ -321,56 +230,71 @@ class DDBMS_Simulator_GUI:
         self.message_count_label = ttk.Label(self.master, text="Total Messages: 0", font=("Helvetica", 10, "bold"))
         self.message_count_label.pack(pady=5)
 
-        help_label = ttk.Label(self.master, text="Use 'Start Simulation' to begin, 'Next Step' to proceed step-by-step, and 'Reset' to start over.", font=("Helvetica", 9, "italic"))
+        help_label = ttk.Label(self.master, text="Use 'Start Simulation' to begin, 'Next Step' to proceed step-by-step, 'Auto Run' to run continuously, and 'Reset' to start over.", font=("Helvetica", 9, "italic"))
         help_label.pack(pady=5)
 
     def log_message(self, message, color="black"):
-        self.log_text.config(state="normal")
-        self.log_text.insert("end", message + "\n", color)
-        self.log_text.see("end")
-        self.log_text.config(state="disabled")
-
-    def update_message_count(self, count=1):
-        self.message_count += count
+        self.event_log.log(message, color)
+
+    def flush_log(self):
+        events, dropped = self.log_buffer.drain()
+        if events or dropped:
+            chunks = []
+            if dropped:
+                chunks.extend((f"... {dropped} earlier events dropped ...\n", "orange"))
+            for event in events:
+                chunks.extend((event.format() + "\n", event.color))
+            self.log_text.config(state="normal")
+            self.log_text.insert("end", *chunks)
+            excess = int(self.log_text.index("end-1c").split(".")[0]) - LOG_MAX_LINES
+            if excess > 0:
+                self.log_text.delete("1.0", f"{excess + 1}.0")
+            self.log_text.see("end")
+            self.log_text.config(state="disabled")
+        self.master.after(LOG_FLUSH_INTERVAL_MS, self.flush_log)
+
+    def refresh_metrics(self):
+        self.metrics_text.config(state="normal")
+        self.metrics_text.delete("1.0", "end")
+        self.metrics_text.insert("end", format_metrics(self.metrics))
+        self.metrics_text.config(state="disabled")
+        self.master.after(METRICS_REFRESH_INTERVAL_MS, self.refresh_metrics)
+
+    def update_message_count(self, total):
+        self.message_count = total
+
+    def data_item_row(self, item_name):
+        item = self.engine.data_items[item_name]
+        manager = self.engine.concurrency_manager
+        if hasattr(manager, "lock_table"):
+            holders = manager.lock_table.holders(item_name)
+            waiting = manager.lock_table.waiting(item_name)
+            holder_list = ", ".join(f"{holder_id}({mode})" for holder_id, mode in holders.items())
+            owner_info = f"Holders: {holder_list if holder_list else 'None'}"
+            waiting_info = f"Waiting: {', '.join(waiting)}" if waiting else ""
+            return (item_name, item.value, f"{owner_info} {waiting_info}"), None
+        return (item_name, item.value, f"Read TS: {item.read_timestamp}, Write TS: {item.write_timestamp}"), None
+
+    def transaction_row(self, t_id):
+        transaction = self.engine.transactions.get(t_id)
+        if transaction is None:
+            return (t_id, "", "", ""), None
+        op_info = ""
+        current_op = transaction.current_operation() if transaction.state == "RUNNING" else None
+        if current_op is not None:
+            op_info = f"{current_op[0]} {current_op[1]}"
+        return (transaction.id, transaction.state, transaction.timestamp, op_info), transaction.state
+
+    def update_gui_status(self, full=False):
+        changed_items, changed_transactions = self.change_tracker.take()
+        if full:
+            self.data_item_list.render()
+            self.transaction_list.render()
+        else:
+            self.data_item_list.refresh(changed_items)
+            self.transaction_list.refresh(changed_transactions)
         self.message_count_label.config(text=f"Total Messages: {self.message_count}")
 
-    def update_gui_status(self):
-        for item_name, item in self.data_items.items():
-            if self.current_mechanism == "locking":
-                owner_info = f"Owner: {item.lock_owner if item.lock_owner else 'None'}, Type: {item.lock_type if item.lock_type else 'None'}"
-                waiting_info = f"Waiting: {', '.join(item.waiting_queue)}" if item.waiting_queue else ""
-                self.data_item_labels[item_name].config(text=f"{item_name}: Value={item.value}, {owner_info} {waiting_info}")
-            else:
-                ts_info = f"Read TS: {item.read_timestamp}, Write TS: {item.write_timestamp}"
-                self.data_item_labels[item_name].config(text=f"{item_name}: Value={item.value}, {ts_info}")
-
-        for t_id in self.transactions_config[self.current_mechanism]:
-            if t_id.id not in self.transaction_labels:
-                label = ttk.Label(self.transaction_scrollable_frame, text="", font=("Helvetica", 10))
-                label.pack(padx=5, pady=2, anchor="w")
-                self.transaction_labels[t_id.id] = label
-
-            transaction = self.current_transactions.get(t_id.id)
-            if transaction:
-                op_info = ""
-                if transaction.state == "RUNNING" and transaction.current_op_index < len(transaction.operations):
-                    current_op = transaction.operations[transaction.current_op_index]
-                    op_info = f"Next Op: {current_op[0]} {current_op[1]}"
-
-                ts_display = f"TS={transaction.timestamp}" if self.current_mechanism == "timestamping" else ""
-                self.transaction_labels[t_id.id].config(text=f"{transaction.id}: State={transaction.state} {ts_display} {op_info}")
-
-                if transaction.state == "COMMITTED":
-                    self.transaction_labels[t_id.id].config(foreground="green")
-                elif transaction.state == "ABORTED":
-                    self.transaction_labels[t_id.id].config(foreground="red")
-                elif transaction.state == "WAITING":
-                    self.transaction_labels[t_id.id].config(foreground="orange")
-                else:
-                    self.transaction_labels[t_id.id].config(foreground="black")
-            else:
-                self.transaction_labels[t_id.id].config(text="", foreground="black")
-
     def select_mechanism(self):
         new_mechanism = self.mechanism_var.get()
         if self.current_mechanism != new_mechanism:
@@ -379,116 +303,99 @@ class DDBMS_Simulator_GUI:
             self.log_message(f"Concurrency mechanism set to: {self.current_mechanism.upper()}", "blue")
 
     def reset_simulation(self):
+        self.stop_auto_run()
+        self.log_buffer.clear()
+        self.change_tracker.clear()
         self.log_text.config(state="normal")
         self.log_text.delete(1.0, "end")
         self.log_text.config(state="disabled")
 
-        self.message_count = 0
-        self.update_message_count(0)
-        self.global_timestamp_counter = 0
-
         self.start_button.config(state="normal")
         self.next_step_button.config(state="disabled")
+        self.auto_run_button.config(state="disabled")
+
+        self.metrics = MetricsCollector()
+        self.engine = SimulationEngine(
+            self.current_mechanism,
+            self.initial_data_items,
+            self.transactions_config[self.current_mechanism],
+            message_counter_callback=self.update_message_count,
+            manager_options=manager_options_from_args(self.args, self.current_mechanism),
+            service_times=parse_service_times(self.args.service_time),
+            think_time=self.args.think_time,
+            restart_aborted=self.args.restart,
+            max_restarts=self.args.max_restarts,
+            backoff=self.args.backoff,
+            backoff_base=self.args.backoff_base,
+            backoff_cap=self.args.backoff_cap,
+            seed=self.args.seed,
+            event_log=self.event_log,
+            metrics=self.metrics,
+        )
 
-        self.data_items.clear()
-        for name, value in self.initial_data_items.items():
-            item = DataItem(name, value)
-            self.data_items[name] = item
-
-        self.current_transactions.clear()
-
-        for label_id in list(self.transaction_labels.keys()):
-            self.transaction_labels[label_id].destroy()
-        self.transaction_labels.clear()
-
-        self.update_gui_status()
+        self.data_item_list.set_keys(self.engine.data_items)
+        self.transaction_list.set_keys(t.id for t in self.transactions_config[self.current_mechanism])
+        self.update_gui_status(full=True)
         self.log_message("Simulation reset. Select a mechanism and click 'Start Simulation'.", "blue")
 
     def start_simulation(self):
         self.log_message(f"Starting simulation with {self.current_mechanism.upper()} mechanism...", "blue")
         self.start_button.config(state="disabled")
         self.next_step_button.config(state="normal")
-        self.message_count = 0
-        self.update_message_count(0)
-        self.global_timestamp_counter = 0
+        self.auto_run_button.config(state="normal")
 
-        for item in self.data_items.values():
-            item.reset_concurrency_state()
+        self.engine.start()
 
-        self.current_transactions.clear()
-        self.active_transactions_queue = []
-
-        for t_config_template in self.transactions_config[self.current_mechanism]:
-            self.global_timestamp_counter += 1
-            new_t = Transaction(t_config_template.id, list(t_config_template.operations), self.global_timestamp_counter)
-            new_t.reset_state(self.global_timestamp_counter)
-
-            self.current_transactions[new_t.id] = new_t
-            self.active_transactions_queue.append(new_t)
-
-            if new_t.id not in self.transaction_labels:
-                label = ttk.Label(self.transaction_scrollable_frame, text="", font=("Helvetica", 10))
-                label.pack(padx=5, pady=2, anchor="w")
-                self.transaction_labels[new_t.id] = label
-            else:
-                self.transaction_labels[new_t.id].config(text="", foreground="black")
-
-        if self.current_mechanism == "locking":
-            self.concurrency_manager = LockingConcurrencyManager(self.data_items, self.log_message, self.update_message_count)
-        else:
-            self.concurrency_manager = TimestampConcurrencyManager(self.data_items, self.log_message, self.update_message_count)
-
-        self.update_gui_status()
+        self.update_gui_status(full=True)
         self.log_message("Simulation ready. Click 'Next Step' to advance through operations.", "green")
 
-    def next_step(self):
-        self.active_transactions_queue = [t for t in self.active_transactions_queue if t.state not in ["COMMITTED", "ABORTED"]]
-
-        if not self.active_transactions_queue:
-            self.log_message("All transactions have completed or aborted. Simulation finished.", "green")
-            self.next_step_button.config(state="disabled")
-            return
-
-        current_t = self.active_transactions_queue.pop(0)
-
-        if current_t.current_op_index >= len(current_t.operations):
-            self.log_message(f"T{current_t.id}: All operations processed. Attempting COMMIT.", "blue")
-            self.concurrency_manager.commit_transaction(current_t)
-            self.update_gui_status()
-            return
-
-        op_type, item_name, *value_arg = current_t.operations[current_t.current_op_index]
-        data_item = self.data_items.get(item_name)
+    def finish_simulation(self):
+        self.stop_auto_run()
+        self.next_step_button.config(state="disabled")
+        self.auto_run_button.config(state="disabled")
 
-        if not data_item:
-            self.concurrency_manager.abort_transaction(current_t, f"Data item {item_name} not found for {current_t.id}.")
-            self.update_gui_status()
+    def next_step(self):
+        if not self.engine.step():
+            self.finish_simulation()
             return
+        self.update_gui_status()
 
-        op_succeeded = self.concurrency_manager.process_operation(
-            current_t, op_type, data_item, value_arg[0] if value_arg else None
-        )
-
-        if op_succeeded:
-            current_t.current_op_index += 1
-            self.active_transactions_queue.append(current_t)
+    def toggle_auto_run(self):
+        if self.auto_running:
+            self.stop_auto_run()
         else:
-            if current_t.state == "WAITING":
-                self.active_transactions_queue.append(current_t)
-
-        if self.current_mechanism == "locking":
-            deadlocked_t_ids = self.concurrency_manager.detect_deadlock(list(self.current_transactions.values()))
-            if deadlocked_t_ids:
-                self.log_message(f"\n{'*' * 30}\n!!! DEADLOCK DETECTED involving: {', '.join(deadlocked_t_ids)} !!!\n{'*' * 30}\n", "red")
-                for tid_in_deadlock in deadlocked_t_ids:
-                    t_to_abort = self.current_transactions.get(tid_in_deadlock)
-                    if t_to_abort and t_to_abort.state == "WAITING":
-                        self.concurrency_manager.abort_transaction(t_to_abort, "Deadlock Resolution")
-                self.active_transactions_queue = [t for t in self.active_transactions_queue if t.state not in ["COMMITTED", "ABORTED"]]
-
+            self.auto_running = True
+            self.auto_run_button.config(text="Pause")
+            self.auto_run_job = self.master.after(AUTO_RUN_INTERVAL_MS, self.auto_run_tick)
+
+    def stop_auto_run(self):
+        self.auto_running = False
+        if self.auto_run_job is not None:
+            self.master.after_cancel(self.auto_run_job)
+            self.auto_run_job = None
+        self.auto_run_button.config(text="Auto Run")
+
+    def auto_run_tick(self):
+        self.auto_run_job = None
+        if not self.auto_running:
+            return
+        for _ in range(self.speed_var.get()):
+            if not self.engine.step():
+                self.update_gui_status()
+                self.finish_simulation()
+                return
         self.update_gui_status()
+        self.auto_run_job = self.master.after(AUTO_RUN_INTERVAL_MS, self.auto_run_tick)
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    if args.headless:
+        return run_headless(args)
 
-if __name__ == "__main__":
     root = tk.Tk()
-    app = DDBMS_Simulator_GUI(root)
+    app = DDBMS_Simulator_GUI(root, args)
     root.mainloop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
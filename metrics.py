@@ -0,0 +1,158 @@
+import bisect
+import csv
+import heapq
+import math
+from collections import Counter
+
+from concurrency import ABORT_CAUSES
+
+METRIC_FAMILIES = {
+    'ddbms_lock_waits_total': ('counter', "Lock waits per data item."),
+    'ddbms_lock_wait_time_total': ('counter', "Simulated time spent waiting for locks per data item."),
+    'ddbms_aborts_total': ('counter', "Transaction aborts by cause."),
+    'ddbms_transaction_latency': ('histogram', "Simulated time from transaction start to commit."),
+    'ddbms_lock_wait_time': ('histogram', "Simulated duration of individual lock waits."),
+    'ddbms_wait_queue_depth': ('histogram', "Lock wait-queue depth seen by a transaction when it starts waiting."),
+}
+
+class Histogram:
+    def __init__(self, lowest=0.25, highest=65536.0, sub_buckets=4):
+        steps = math.ceil(math.log2(highest / lowest) * sub_buckets)
+        self.bounds = [lowest * 2 ** (step / sub_buckets) for step in range(steps + 1)]
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        if self.bounds != other.bounds:
+            raise ValueError("Only histograms with the same buckets can be merged.")
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, fraction):
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def cumulative_buckets(self):
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            yield bound, seen
+        yield math.inf, self.count
+
+class MetricsCollector:
+    def __init__(self):
+        self.item_waits = {}
+        self.waiting_since = {}
+        self.aborts = Counter()
+        self.latency = Histogram()
+        self.wait_time = Histogram()
+        self.queue_depth = Histogram(lowest=1.0, highest=4096.0, sub_buckets=1)
+
+    def wait_began(self, t_id, item_name, time, depth):
+        self.waiting_since[t_id] = (item_name, time)
+        self.queue_depth.record(depth)
+
+    def wait_ended(self, t_id, time):
+        started = self.waiting_since.pop(t_id, None)
+        if started is None:
+            return
+        item_name, since = started
+        waited = time - since
+        waits = self.item_waits.get(item_name)
+        if waits is None:
+            self.item_waits[item_name] = [1, waited]
+        else:
+            waits[0] += 1
+            waits[1] += waited
+        self.wait_time.record(waited)
+
+    def transaction_committed(self, latency):
+        self.latency.record(latency)
+
+    def transaction_aborted(self, cause):
+        self.aborts[cause or 'other'] += 1
+
+    def hottest_items(self, count=10):
+        return heapq.nlargest(count, self.item_waits.items(), key=lambda entry: (entry[1][1], entry[1][0]))
+
+    def samples(self):
+        item_names = sorted(self.item_waits)
+        for item_name in item_names:
+            yield 'ddbms_lock_waits_total', {'item': item_name}, self.item_waits[item_name][0]
+        for item_name in item_names:
+            yield 'ddbms_lock_wait_time_total', {'item': item_name}, self.item_waits[item_name][1]
+        for cause in ABORT_CAUSES:
+            yield 'ddbms_aborts_total', {'cause': cause}, self.aborts[cause]
+        for family, histogram in (('ddbms_transaction_latency', self.latency), ('ddbms_lock_wait_time', self.wait_time), ('ddbms_wait_queue_depth', self.queue_depth)):
+            for bound, count in histogram.cumulative_buckets():
+                yield f"{family}_bucket", {'le': "+Inf" if bound == math.inf else f"{bound:g}"}, count
+            yield f"{family}_sum", {}, histogram.total
+            yield f"{family}_count", {}, histogram.count
+
+def sample_family(name):
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix) and name[:-len(suffix)] in METRIC_FAMILIES:
+            return name[:-len(suffix)]
+    return name
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def format_prometheus(collector):
+    lines = []
+    family = None
+    for name, labels, value in collector.samples():
+        if sample_family(name) != family:
+            family = sample_family(name)
+            metric_type, description = METRIC_FAMILIES[family]
+            lines.append(f"# HELP {family} {description}")
+            lines.append(f"# TYPE {family} {metric_type}")
+        label_text = ",".join(f"{key}=\"{escape_label(label)}\"" for key, label in labels.items())
+        lines.append(f"{name}{{{label_text}}} {value:g}" if label_text else f"{name} {value:g}")
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(collector, path):
+    with open(path, "w", encoding="utf-8") as output_file:
+        output_file.write(format_prometheus(collector))
+
+def write_csv(collector, path):
+    with open(path, "w", encoding="utf-8", newline="") as output_file:
+        writer = csv.writer(output_file)
+        writer.writerow(["metric", "label", "label_value", "value"])
+        for name, labels, value in collector.samples():
+            label, label_value = next(iter(labels.items()), ("", ""))
+            writer.writerow([name, label, label_value, value])
+
+def format_metrics(collector, top=10):
+    lines = [
+        f"Latency p50/p95/p99: {collector.latency.percentile(0.5):.2f} / {collector.latency.percentile(0.95):.2f} / {collector.latency.percentile(0.99):.2f} (max {collector.latency.max:.2f})",
+        f"Lock waits:          {collector.wait_time.count} (mean {collector.wait_time.mean():.2f}, p95 {collector.wait_time.percentile(0.95):.2f})",
+        f"Queue depth p50/p95: {collector.queue_depth.percentile(0.5):g} / {collector.queue_depth.percentile(0.95):g} (max {collector.queue_depth.max:g})",
+        "Aborts by cause:     " + (", ".join(f"{cause}={count}" for cause, count in collector.aborts.most_common()) or "none"),
+    ]
+    hottest = collector.hottest_items(top)
+    if hottest:
+        lines.append("Hottest items:       " + ", ".join(f"{name} ({waits} waits, {waited:.1f})" for name, (waits, waited) in hottest))
+    return "\n".join(lines)
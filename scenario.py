@@ -0,0 +1,134 @@
+import argparse
+import csv
+import json
+import sys
+
+from concurrency import Transaction
+from workload import WorkloadConfig, KEY_DISTRIBUTIONS, stream_workload
+
+SCENARIO_FORMATS = ('jsonl', 'csv')
+
+def scenario_format(path, format=None):
+    if format is None:
+        format = 'csv' if path.endswith(".csv") else 'jsonl'
+    if format not in SCENARIO_FORMATS:
+        raise ValueError(f"Unknown scenario format: {format}")
+    return format
+
+def parse_csv_value(text):
+    if text == "":
+        return None
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+def jsonl_records(scenario_file):
+    for line_number, line in enumerate(scenario_file, 1):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if 'item' in record:
+            yield 'item', record['item'], record.get('value')
+        elif 'transaction' in record:
+            yield 'transaction', record['transaction'], [tuple(op) for op in record['operations']]
+        else:
+            raise ValueError(f"Line {line_number}: expected an 'item' or 'transaction' record")
+
+def csv_records(scenario_file):
+    t_id = None
+    operations = []
+    for line_number, row in enumerate(csv.reader(scenario_file), 1):
+        if not row or row[0].startswith("#"):
+            continue
+        kind = row[0]
+        if kind == 'op':
+            if len(row) < 4:
+                raise ValueError(f"Line {line_number}: expected op,<transaction>,<operation>,<item>[,<value>]")
+            if row[1] != t_id:
+                if t_id is not None:
+                    yield 'transaction', t_id, operations
+                t_id, operations = row[1], []
+            operations.append((row[2], row[3], parse_csv_value(row[4]) if len(row) > 4 else None))
+        elif kind == 'item':
+            if len(row) < 2:
+                raise ValueError(f"Line {line_number}: expected item,<name>[,<value>]")
+            if t_id is not None:
+                yield 'transaction', t_id, operations
+                t_id, operations = None, []
+            yield 'item', row[1], parse_csv_value(row[2]) if len(row) > 2 else None
+        else:
+            raise ValueError(f"Line {line_number}: unknown record kind {kind}")
+    if t_id is not None:
+        yield 'transaction', t_id, operations
+
+class ScenarioFile:
+    def __init__(self, path, format=None):
+        self.path = path
+        self.format = scenario_format(path, format)
+        self.initial_data_items = {}
+        with open(path, encoding="utf-8", newline="") as scenario_file:
+            for kind, name, value in self.records(scenario_file):
+                if kind != 'item':
+                    break
+                self.initial_data_items[name] = value
+
+    def records(self, scenario_file):
+        if self.format == 'csv':
+            return csv_records(scenario_file)
+        return jsonl_records(scenario_file)
+
+    def __iter__(self):
+        with open(self.path, encoding="utf-8", newline="") as scenario_file:
+            for kind, name, value in self.records(scenario_file):
+                if kind == 'transaction':
+                    yield Transaction(name, value)
+                elif name not in self.initial_data_items:
+                    raise ValueError(f"Data item {name} is declared after the first transaction")
+
+def write_scenario(path, initial_data_items, transactions, format=None):
+    format = scenario_format(path, format)
+    with open(path, "w", encoding="utf-8", newline="") as scenario_file:
+        if format == 'csv':
+            writer = csv.writer(scenario_file)
+            for name, value in initial_data_items.items():
+                writer.writerow(['item', name, value])
+            for transaction in transactions:
+                for operation in transaction.operations:
+                    writer.writerow(['op', transaction.id, *("" if field is None else field for field in operation)])
+        else:
+            for name, value in initial_data_items.items():
+                scenario_file.write(json.dumps({'item': name, 'value': value}) + "\n")
+            for transaction in transactions:
+                scenario_file.write(json.dumps({'transaction': transaction.id, 'operations': [list(op) for op in transaction.operations]}) + "\n")
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Write a synthetic workload as a streaming scenario file")
+    parser.add_argument("output", help="scenario file to write (.jsonl or .csv)")
+    parser.add_argument("--format", choices=SCENARIO_FORMATS, default=None, help="file format (default: from the file extension)")
+    parser.add_argument("--transactions", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--key-distribution", choices=KEY_DISTRIBUTIONS, default="zipf")
+    parser.add_argument("--read-ratio", type=float, default=0.8)
+    parser.add_argument("--txn-length", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    config = WorkloadConfig(
+        num_items=args.items,
+        num_transactions=args.transactions,
+        key_distribution=args.key_distribution,
+        read_ratio=args.read_ratio,
+        txn_length=args.txn_length,
+        seed=args.seed,
+    )
+    initial_data_items, transactions = stream_workload(config)
+    write_scenario(args.output, initial_data_items, transactions, args.format)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+import argparse
+import functools
+import json
+import mmap
+import struct
+import sys
+from collections import Counter, namedtuple
+
+from concurrency import LazyTransaction
+
+SCHEDULE_MAGIC = b"DDBSCHED"
+SCHEDULE_VERSION = 3
+HEADER = struct.Struct("<8sHHIQQQQQQQ")
+RECORD = struct.Struct("<dIIIIBBq")
+OPERATION = struct.Struct("<BBIq")
+TRANSACTION_ENTRY = struct.Struct("<IIQ")
+STRING_SPAN = struct.Struct("<QQ")
+UINT32 = struct.Struct("<I")
+UINT64 = struct.Struct("<Q")
+DOUBLE = struct.Struct("<d")
+INT64 = struct.Struct("<q")
+NO_INDEX = 0xFFFFFFFF
+CHUNK_RECORDS = 1 << 16
+STRING_CACHE_SIZE = 1 << 12
+
+OPERATION_CODES = ('read', 'write', 'request_lock', 'commit', 'begin')
+OUTCOMES = ('ok', 'blocked', 'aborted', 'committed', 'started')
+VALUE_NONE, VALUE_INT, VALUE_FLOAT, VALUE_STRING = range(4)
+
+ScheduleRecord = namedtuple('ScheduleRecord', 'time transaction op_index attempt op_type item value outcome position')
+
+class ScheduleRecorder:
+    def __init__(self, path, initial_data_items, transactions, buffer_size=1 << 20):
+        self.file = open(path, "wb", buffering=buffer_size)
+        self.file.write(HEADER.pack(SCHEDULE_MAGIC, SCHEDULE_VERSION, RECORD.size, 0, 0, 0, 0, 0, 0, 0, 0))
+        self.initial_data_items = dict(initial_data_items)
+        self.transactions = transactions
+        self.operation_codes = {op_type: code for code, op_type in enumerate(OPERATION_CODES)}
+        self.outcome_codes = {outcome: code for code, outcome in enumerate(OUTCOMES)}
+        self.strings = {}
+        self.count = 0
+
+    def intern(self, text):
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.strings)
+        return index
+
+    def encode_value(self, value):
+        if value is None:
+            return VALUE_NONE, 0
+        if isinstance(value, str):
+            return VALUE_STRING, self.intern(value)
+        if isinstance(value, float):
+            return VALUE_FLOAT, INT64.unpack(DOUBLE.pack(value))[0]
+        return VALUE_INT, value
+
+    def record(self, time, t_id, op_index, attempt, op_type, item, value, outcome):
+        op_code = self.operation_codes.get(op_type)
+        if op_code is None:
+            raise ValueError(f"Operation type {op_type} cannot be recorded")
+        kind, payload = self.encode_value(value)
+        item_index = self.intern(item) if item is not None else NO_INDEX
+        self.file.write(RECORD.pack(time, self.intern(t_id), item_index, op_index, attempt, op_code, self.outcome_codes[outcome] | kind << 4, payload))
+        self.count += 1
+
+    def write_operations(self):
+        index = bytearray()
+        offset = self.file.tell()
+        for transaction in self.transactions:
+            count = 0
+            for op_type, item, *value_arg in transaction.operations:
+                kind, payload = self.encode_value(value_arg[0] if value_arg else None)
+                self.file.write(OPERATION.pack(self.operation_codes[op_type], kind, self.intern(item), payload))
+                count += 1
+            index += TRANSACTION_ENTRY.pack(self.intern(transaction.id), count, offset)
+            offset += count * OPERATION.size
+        return index
+
+    def write_strings(self):
+        offset = self.file.tell() + (len(self.strings) + 1) * UINT64.size
+        spans = bytearray(UINT64.pack(offset))
+        encoded = []
+        for text in self.strings:
+            data = text.encode("utf-8")
+            offset += len(data)
+            spans += UINT64.pack(offset)
+            encoded.append(data)
+        self.file.write(spans)
+        for data in encoded:
+            self.file.write(data)
+
+    def close(self):
+        if self.file.closed:
+            return
+        index = self.write_operations()
+        transaction_count = len(index) // TRANSACTION_ENTRY.size
+        positions = bytearray(UINT32.pack(NO_INDEX) * len(self.strings))
+        for position, (id_index, _, _) in enumerate(TRANSACTION_ENTRY.iter_unpack(index)):
+            UINT32.pack_into(positions, id_index * UINT32.size, position)
+        index_offset = self.file.tell()
+        self.file.write(index)
+        positions_offset = self.file.tell()
+        self.file.write(positions)
+        strings_offset = self.file.tell()
+        self.write_strings()
+        footer_offset = self.file.tell()
+        self.file.write(json.dumps({'initial_data_items': self.initial_data_items}, separators=(",", ":")).encode("utf-8"))
+        self.file.seek(0)
+        self.file.write(HEADER.pack(SCHEDULE_MAGIC, SCHEDULE_VERSION, RECORD.size, 0, self.count, transaction_count, len(self.strings),
+                                    index_offset, positions_offset, strings_offset, footer_offset))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class ScheduleTrace:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"{path} is not a schedule trace")
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            self.map.madvise(mmap.MADV_SEQUENTIAL)
+        if len(self.map) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is not a schedule trace")
+        (magic, version, record_size, _, self.count, self.transaction_count, self.string_count,
+         self.index_offset, self.positions_offset, self.strings_offset, footer_offset) = HEADER.unpack_from(self.map, 0)
+        if magic != SCHEDULE_MAGIC or version != SCHEDULE_VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a schedule trace")
+        if footer_offset == 0:
+            self.close()
+            raise ValueError(f"{path} is incomplete; the recorder was not closed")
+        self.initial_data_items = json.loads(self.map[footer_offset:])['initial_data_items']
+        self.string = functools.lru_cache(maxsize=STRING_CACHE_SIZE)(self.read_string)
+
+    def read_string(self, index):
+        start, end = STRING_SPAN.unpack_from(self.map, self.strings_offset + index * UINT64.size)
+        return self.map[start:end].decode("utf-8")
+
+    def position(self, string_index):
+        return UINT32.unpack_from(self.map, self.positions_offset + string_index * UINT32.size)[0]
+
+    def operations(self, position):
+        _, count, offset = TRANSACTION_ENTRY.unpack_from(self.map, self.index_offset + position * TRANSACTION_ENTRY.size)
+        for op_code, kind, item_index, payload in OPERATION.iter_unpack(self.map[offset:offset + count * OPERATION.size]):
+            yield (OPERATION_CODES[op_code], self.string(item_index), self.decode_value(kind, payload))
+
+    def transactions(self):
+        return RecordedWorkload(self)
+
+    def decode_value(self, kind, payload):
+        if kind == VALUE_NONE:
+            return None
+        if kind == VALUE_STRING:
+            return self.string(payload)
+        if kind == VALUE_FLOAT:
+            return DOUBLE.unpack(INT64.pack(payload))[0]
+        return payload
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        string = self.string
+        end = HEADER.size + self.count * RECORD.size
+        chunk_size = CHUNK_RECORDS * RECORD.size
+        for start in range(HEADER.size, end, chunk_size):
+            for time, t_index, item_index, op_index, attempt, op_code, flags, payload in RECORD.iter_unpack(self.map[start:min(end, start + chunk_size)]):
+                yield ScheduleRecord(
+                    time,
+                    string(t_index),
+                    op_index,
+                    attempt,
+                    OPERATION_CODES[op_code],
+                    string(item_index) if item_index != NO_INDEX else None,
+                    self.decode_value(flags >> 4, payload),
+                    OUTCOMES[flags & 0xF],
+                    self.position(t_index),
+                )
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class RecordedWorkload:
+    def __init__(self, trace):
+        self.trace = trace
+
+    def __len__(self):
+        return self.trace.transaction_count
+
+    def __iter__(self):
+        trace = self.trace
+        for position in range(trace.transaction_count):
+            id_index, _, _ = TRANSACTION_ENTRY.unpack_from(trace.map, trace.index_offset + position * TRANSACTION_ENTRY.size)
+            yield LazyTransaction(trace.read_string(id_index), functools.partial(trace.operations, position))
+
+def format_record(record):
+    if record.op_type == 'begin':
+        operation = f"begin TS={record.value}"
+    else:
+        operation = record.op_type if record.item is None else f"{record.op_type}({record.item}{'' if record.value is None else f', {record.value}'})"
+    attempt = f" attempt {record.attempt + 1}" if record.attempt else ""
+    return f"{record.time:>12.2f}  {record.transaction:<10} #{record.op_index:<4} {operation:<32} {record.outcome}{attempt}"
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Inspect a recorded schedule trace")
+    parser.add_argument("trace", help="schedule trace written with --record")
+    parser.add_argument("--transaction", action="append", default=[], help="only show records of this transaction (repeatable)")
+    parser.add_argument("--limit", type=int, default=None, help="stop after printing this many records")
+    parser.add_argument("--summary", action="store_true", help="print record counts by outcome instead of the records")
+    return parser
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    selected = frozenset(args.transaction)
+    with ScheduleTrace(args.trace) as trace:
+        if args.summary:
+            outcomes = Counter(record.outcome for record in trace)
+            print(f"Records:            {len(trace)}")
+            print(f"Transactions:       {trace.transaction_count}")
+            for outcome in OUTCOMES:
+                print(f"{outcome.capitalize() + ':':<20}{outcomes[outcome]}")
+            return 0
+        printed = 0
+        for record in trace:
+            if selected and record.transaction not in selected:
+                continue
+            if args.limit is not None and printed >= args.limit:
+                break
+            print(format_record(record))
+            printed += 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
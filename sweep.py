@@ -0,0 +1,239 @@
+import argparse
+import concurrent.futures
+import hashlib
+import inspect
+import itertools
+import json
+import math
+import os
+import statistics
+import sys
+
+from benchmark import BENCHMARK_MANAGERS, BENCHMARK_WORKLOADS, benchmark_metrics
+from concurrency import CONCURRENCY_MANAGERS
+from engine import SimulationEngine
+from workload import WorkloadConfig, generate_workload
+
+SWEEP_CACHE_VERSION = 2
+SWEEP_METRICS = (
+    'commits_per_second', 'operations_per_second', 'abort_rate', 'restart_rate',
+    'messages_per_commit', 'mean_latency', 'simulated_throughput',
+)
+WALL_CLOCK_METRICS = frozenset(['commits_per_second', 'operations_per_second'])
+WORKLOAD_PARAMETERS = frozenset(inspect.signature(WorkloadConfig).parameters) - {'seed'}
+ENGINE_PARAMETERS = frozenset(['think_time', 'restart_aborted', 'max_restarts', 'backoff', 'backoff_base', 'backoff_cap'])
+
+T_CRITICAL_95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+
+def t_critical(degrees_of_freedom):
+    if degrees_of_freedom < 1:
+        return float("nan")
+    if degrees_of_freedom <= len(T_CRITICAL_95):
+        return T_CRITICAL_95[degrees_of_freedom - 1]
+    return 1.96
+
+def manager_parameters(mechanism):
+    return frozenset(list(inspect.signature(CONCURRENCY_MANAGERS[mechanism]).parameters)[3:])
+
+def cell_parameters(manager_name, workload_name, overrides):
+    mechanism, base_options = BENCHMARK_MANAGERS[manager_name]
+    accepted = manager_parameters(mechanism)
+    workload = dict(BENCHMARK_WORKLOADS[workload_name])
+    manager_options = dict(base_options)
+    engine_options = {}
+    for name, value in overrides.items():
+        if name in WORKLOAD_PARAMETERS:
+            workload[name] = value
+        elif name in ENGINE_PARAMETERS:
+            engine_options[name] = value
+        elif name in accepted:
+            manager_options[name] = value
+    return {
+        'manager': manager_name,
+        'mechanism': mechanism,
+        'workload_name': workload_name,
+        'workload': workload,
+        'manager_options': manager_options,
+        'engine_options': engine_options,
+    }
+
+def parameter_hash(cell, seed):
+    key = json.dumps({'version': SWEEP_CACHE_VERSION, 'cell': cell, 'seed': seed}, sort_keys=True)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:24]
+
+def run_cell(cell, seed):
+    config = WorkloadConfig(seed=seed, **cell['workload'])
+    initial_data_items, transactions = generate_workload(config)
+    engine = SimulationEngine(
+        cell['mechanism'],
+        initial_data_items,
+        transactions,
+        manager_options=cell['manager_options'],
+        seed=seed,
+        **cell['engine_options'],
+    )
+    engine.start()
+    stats = engine.run()
+    metrics = benchmark_metrics(stats)
+    metrics['mean_latency'] = stats.mean_latency()
+    metrics['simulated_throughput'] = stats.simulated_throughput()
+    return metrics
+
+def expand_grid(managers, workload_name, grid):
+    names = sorted(grid)
+    cells = {}
+    for manager_name in managers:
+        for values in itertools.product(*(grid[name] for name in names)):
+            cell = cell_parameters(manager_name, workload_name, dict(zip(names, values)))
+            cells[json.dumps(cell, sort_keys=True)] = cell
+    return list(cells.values())
+
+def summarize(samples):
+    count = len(samples)
+    mean = statistics.fmean(samples)
+    ordered = sorted(samples)
+    p95 = ordered[min(count - 1, math.ceil(0.95 * count) - 1)]
+    if count > 1:
+        half_width = t_critical(count - 1) * statistics.stdev(samples) / math.sqrt(count)
+    else:
+        half_width = float("nan")
+    return {'mean': mean, 'p95': p95, 'ci95': half_width, 'n': count}
+
+def summarize_metric(cell_runs, metric):
+    samples = [metrics[metric] for metrics in cell_runs if metric in metrics]
+    if not samples:
+        return {'mean': float("nan"), 'p95': float("nan"), 'ci95': float("nan"), 'n': 0}
+    return summarize(samples)
+
+def aggregate(cells, runs):
+    runs_by_cell = {}
+    for key, metrics in runs:
+        runs_by_cell.setdefault(key, []).append(metrics)
+    table = []
+    for cell in cells:
+        cell_runs = runs_by_cell.get(json.dumps(cell, sort_keys=True))
+        if not cell_runs:
+            continue
+        row = {'cell': cell}
+        for metric in SWEEP_METRICS:
+            row[metric] = summarize_metric(cell_runs, metric)
+        table.append(row)
+    return table
+
+def load_cached(cache_dir, run_hash):
+    path = os.path.join(cache_dir, f"{run_hash}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as cache_file:
+        return json.load(cache_file)['metrics']
+
+def store_cached(cache_dir, run_hash, cell, seed, metrics):
+    path = os.path.join(cache_dir, f"{run_hash}.json")
+    temporary_path = f"{path}.tmp"
+    deterministic = {name: value for name, value in metrics.items() if name not in WALL_CLOCK_METRICS}
+    with open(temporary_path, "w", encoding="utf-8") as cache_file:
+        json.dump({'cell': cell, 'seed': seed, 'metrics': deterministic}, cache_file)
+    os.replace(temporary_path, path)
+
+def run_sweep(cells, seeds, cache_dir=None, jobs=None, progress_callback=None, reuse_cached=True):
+    runs = []
+    pending = []
+    for cell in cells:
+        key = json.dumps(cell, sort_keys=True)
+        for seed in seeds:
+            run_hash = parameter_hash(cell, seed)
+            metrics = load_cached(cache_dir, run_hash) if cache_dir and reuse_cached else None
+            if metrics is not None:
+                runs.append((key, metrics))
+            else:
+                pending.append((key, cell, seed, run_hash))
+    cached = len(runs)
+
+    if pending:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {executor.submit(run_cell, cell, seed): (key, cell, seed, run_hash) for key, cell, seed, run_hash in pending}
+            for future in concurrent.futures.as_completed(futures):
+                key, cell, seed, run_hash = futures[future]
+                metrics = future.result()
+                if cache_dir:
+                    store_cached(cache_dir, run_hash, cell, seed, metrics)
+                runs.append((key, metrics))
+                if progress_callback is not None:
+                    progress_callback(cell, seed, metrics, len(runs) - cached, len(pending))
+    return aggregate(cells, runs), cached, len(pending)
+
+def parse_grid_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def parse_grid(pairs):
+    grid = {}
+    for pair in pairs:
+        name, _, values = pair.partition("=")
+        if not name or not values:
+            raise ValueError(f"Invalid sweep parameter: {pair}")
+        grid[name] = [parse_grid_value(value) for value in values.split(",")]
+    return grid
+
+def describe_cell(cell, grid):
+    settings = {**cell['workload'], **cell['manager_options'], **cell['engine_options']}
+    return " ".join(f"{name}={settings[name]}" for name in sorted(grid) if name in settings)
+
+def format_row(row, grid, metric):
+    summary = row[metric]
+    return f"{row['cell']['manager']:<22} {describe_cell(row['cell'], grid):<40} {summary['mean']:>12.3f} {summary['ci95']:>10.3f} {summary['p95']:>12.3f} {summary['n']:>4}"
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Sweep concurrency managers over a grid of workload and manager parameters")
+    parser.add_argument("--mechanism", action="append", choices=sorted(BENCHMARK_MANAGERS), help="mechanism to sweep (repeatable, default: all)")
+    parser.add_argument("--workload", choices=list(BENCHMARK_WORKLOADS), default="high_contention", help="base workload the grid parameters override")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=V1,V2,...", help="grid axis: a workload, manager or engine parameter and its values (repeatable)")
+    parser.add_argument("--seeds", type=int, default=5, help="seeds per grid cell")
+    parser.add_argument("--first-seed", type=int, default=1)
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--cache-dir", default=".sweep-cache", help="directory of cached per-run results; empty string disables caching")
+    parser.add_argument("--metric", choices=SWEEP_METRICS, default="simulated_throughput", help="metric shown in the summary table; wall-clock metrics are never cached, so choosing one recomputes every run")
+    parser.add_argument("--output", default=None, help="write the aggregated table as JSON to this file")
+    return parser
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    grid = parse_grid(args.param)
+    unknown = [name for name in grid if name not in WORKLOAD_PARAMETERS and name not in ENGINE_PARAMETERS
+               and not any(name in manager_parameters(mechanism) for mechanism in CONCURRENCY_MANAGERS)]
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(unknown)}")
+    if args.cache_dir:
+        os.makedirs(args.cache_dir, exist_ok=True)
+
+    cells = expand_grid(args.mechanism or sorted(BENCHMARK_MANAGERS), args.workload, grid)
+    seeds = list(range(args.first_seed, args.first_seed + args.seeds))
+    print(f"{len(cells)} cells x {len(seeds)} seeds", flush=True)
+    table, cached, computed = run_sweep(
+        cells,
+        seeds,
+        cache_dir=args.cache_dir or None,
+        jobs=args.jobs,
+        reuse_cached=args.metric not in WALL_CLOCK_METRICS,
+        progress_callback=lambda cell, seed, metrics, done, total: print(
+            f"[{done}/{total}] {cell['manager']} {describe_cell(cell, grid)} seed={seed}: {args.metric}={metrics[args.metric]:.3f}", flush=True),
+    )
+    print(f"{computed} runs computed, {cached} taken from cache")
+    print()
+    print(f"{'Mechanism':<22} {'Parameters':<40} {'Mean':>12} {'+/-95%':>10} {'p95':>12} {'n':>4}")
+    for row in table:
+        print(format_row(row, grid, args.metric))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({'grid': grid, 'seeds': seeds, 'workload': args.workload, 'results': table}, output_file, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,402 @@
+import unittest
+
+from concurrency import (DataItem, Transaction, LockTable, WaitForGraph, LockingConcurrencyManager, HierarchicalLockingConcurrencyManager, TimestampConcurrencyManager,
+                         MultiversionTimestampConcurrencyManager, OptimisticConcurrencyManager, DistributedConcurrencyManager, HIERARCHICAL_COMPATIBILITY, HIERARCHICAL_UPGRADES, DATABASE_RESOURCE)
+
+def quiet_log(message, color="black", **fields):
+    pass
+
+def quiet_count(count=1):
+    pass
+
+class LockTableTest(unittest.TestCase):
+    def setUp(self):
+        self.table = LockTable()
+
+    def test_shared_locks_are_granted_together(self):
+        self.assertEqual(self.table.request("T1", "X", 'S'), ("GRANTED", 'S', None))
+        self.assertEqual(self.table.request("T2", "X", 'S'), ("GRANTED", 'S', None))
+        self.assertEqual(self.table.holders("X"), {"T1": 'S', "T2": 'S'})
+
+    def test_compatible_request_queues_behind_earlier_waiter(self):
+        self.table.request("T1", "X", 'S')
+        self.assertEqual(self.table.request("T2", "X", 'X'), ("WAITING", 'X', 0))
+        self.assertEqual(self.table.request("T3", "X", 'S'), ("WAITING", 'S', 1))
+        self.assertEqual(self.table.waiting("X"), ["T2", "T3"])
+
+    def test_release_grants_waiters_in_fifo_order(self):
+        self.table.request("T1", "X", 'X')
+        self.table.request("T2", "X", 'S')
+        self.table.request("T3", "X", 'S')
+        self.table.request("T4", "X", 'X')
+        mode, granted = self.table.release("T1", "X")
+        self.assertEqual(mode, 'X')
+        self.assertEqual([request.t_id for request in granted], ["T2", "T3"])
+        self.assertEqual(self.table.waiting("X"), ["T4"])
+        self.table.release("T2", "X")
+        _, granted = self.table.release("T3", "X")
+        self.assertEqual([request.t_id for request in granted], ["T4"])
+        self.assertEqual(self.table.holders("X"), {"T4": 'X'})
+
+    def test_upgrade_is_immediate_for_sole_holder(self):
+        self.table.request("T1", "X", 'S')
+        self.assertEqual(self.table.request("T1", "X", 'X'), ("UPGRADED", 'X', None))
+        self.assertEqual(self.table.request("T1", "X", 'S'), ("HELD", 'X', None))
+
+    def test_upgrade_jumps_ahead_of_plain_waiters(self):
+        self.table.request("T1", "X", 'S')
+        self.table.request("T2", "X", 'S')
+        self.table.request("T3", "X", 'X')
+        self.assertEqual(self.table.request("T1", "X", 'X'), ("WAITING", 'X', 0))
+        self.assertEqual(self.table.waiting("X"), ["T1", "T3"])
+        _, granted = self.table.release("T2", "X")
+        self.assertEqual([(request.t_id, request.mode, request.is_upgrade) for request in granted], [("T1", 'X', True)])
+        self.assertEqual(self.table.holders("X"), {"T1": 'X'})
+        self.assertEqual(self.table.waiting("X"), ["T3"])
+
+    def test_prioritized_requests_queue_ahead_of_younger_waiters(self):
+        self.table.request("T2", "X", 'S', 2)
+        self.assertEqual(self.table.request("T5", "X", 'X', 5), ("WAITING", 'X', 0))
+        self.assertEqual(self.table.request("T3", "X", 'X', 3), ("WAITING", 'X', 0))
+        self.assertEqual(self.table.request("T1", "X", 'S', 1), ("GRANTED", 'S', None))
+        self.assertEqual(self.table.request("T4", "X", 'X', 4), ("WAITING", 'X', 1))
+        self.assertEqual(self.table.waiting("X"), ["T3", "T4", "T5"])
+
+    def test_cancel_grants_requests_behind_the_cancelled_one(self):
+        self.table.request("T1", "X", 'S')
+        self.table.request("T2", "X", 'X')
+        self.table.request("T3", "X", 'S')
+        self.table.request("T4", "X", 'X')
+        granted, position = self.table.cancel("T2", "X")
+        self.assertEqual([request.t_id for request in granted], ["T3"])
+        self.assertEqual(position, 0)
+        self.assertEqual(self.table.holders("X"), {"T1": 'S', "T3": 'S'})
+        self.assertEqual(self.table.waiting("X"), ["T4"])
+
+    def test_empty_entries_are_dropped(self):
+        self.table.request("T1", "X", 'X')
+        self.table.request("T2", "X", 'X')
+        self.table.cancel("T2", "X")
+        self.table.release("T1", "X")
+        self.assertNotIn("X", self.table.entries)
+        self.assertEqual(self.table.cancel("T3", "X"), ([], None))
+
+    def test_blockers_are_incompatible_holders_and_predecessor(self):
+        self.table.request("T1", "X", 'S')
+        self.table.request("T2", "X", 'X')
+        self.table.request("T3", "X", 'S')
+        entry = self.table.entries["X"]
+        self.assertEqual(self.table.blockers_at(entry, 0), ["T1"])
+        self.assertEqual(self.table.blockers_at(entry, 1), ["T2"])
+
+    def test_conflicts_are_incompatible_holders_and_all_earlier_waiters(self):
+        self.table.request("T1", "X", 'S')
+        self.table.request("T2", "X", 'X')
+        self.table.request("T3", "X", 'S')
+        self.table.request("T4", "X", 'X')
+        entry = self.table.entries["X"]
+        self.assertEqual(self.table.conflicting_at(entry, 0), ["T1"])
+        self.assertEqual(self.table.conflicting_at(entry, 2), ["T1", "T2", "T3"])
+
+class WaitForGraphTest(unittest.TestCase):
+    def test_set_waits_returns_only_new_edges(self):
+        graph = WaitForGraph()
+        self.assertEqual(graph.set_waits("T1", ["T2", "T3"]), ["T2", "T3"])
+        self.assertEqual(graph.set_waits("T1", ["T3", "T4", "T1"]), ["T4"])
+        self.assertEqual(list(graph.waits_for["T1"]), ["T3", "T4"])
+        self.assertNotIn("T2", graph.waited_by)
+
+    def test_finds_cycle_of_three_members(self):
+        graph = WaitForGraph()
+        graph.set_waits("T1", ["T2"])
+        graph.set_waits("T2", ["T3"])
+        self.assertIsNone(graph.find_path("T3", "T1"))
+        self.assertEqual(graph.set_waits("T3", ["T1"]), ["T1"])
+        self.assertEqual(graph.find_path("T1", "T3"), ["T3", "T1", "T2"])
+
+    def test_finds_long_cycle_through_branches(self):
+        graph = WaitForGraph()
+        graph.set_waits("T1", ["T2", "T6"])
+        graph.set_waits("T2", ["T3"])
+        graph.set_waits("T3", ["T4"])
+        graph.set_waits("T4", ["T5"])
+        graph.set_waits("T6", ["T7"])
+        graph.set_waits("T5", ["T1"])
+        cycle = graph.find_path("T1", "T5")
+        self.assertEqual(cycle, ["T5", "T1", "T2", "T3", "T4"])
+
+    def test_excluded_members_break_cycles(self):
+        graph = WaitForGraph()
+        graph.set_waits("T1", ["T2"])
+        graph.set_waits("T2", ["T3"])
+        graph.set_waits("T3", ["T1"])
+        self.assertIsNone(graph.find_path("T1", "T3", ["T2"]))
+
+    def test_remove_transaction_drops_both_directions(self):
+        graph = WaitForGraph()
+        graph.set_waits("T1", ["T2"])
+        graph.set_waits("T2", ["T3"])
+        graph.remove_transaction("T2")
+        self.assertEqual(graph.waits_for, {})
+        self.assertEqual(graph.waited_by, {})
+
+class LockingDeadlockTest(unittest.TestCase):
+    def make_manager(self, names, victim_policy="youngest"):
+        data_items = {name: DataItem(name, 0) for name in names}
+        return data_items, LockingConcurrencyManager(data_items, quiet_log, quiet_count, victim_policy=victim_policy)
+
+    def test_three_way_deadlock_picks_one_victim(self):
+        data_items, manager = self.make_manager(["A", "B", "C"])
+        transactions = [Transaction(f"T{i}", [], timestamp=i) for i in (1, 2, 3)]
+        for transaction, name in zip(transactions, ["A", "B", "C"]):
+            self.assertTrue(manager.acquire_lock(transaction, data_items[name], 'X'))
+        self.assertFalse(manager.acquire_lock(transactions[0], data_items["B"], 'X'))
+        self.assertFalse(manager.acquire_lock(transactions[1], data_items["C"], 'X'))
+        self.assertEqual(manager.detect_deadlock(), [])
+        self.assertFalse(manager.acquire_lock(transactions[2], data_items["A"], 'X'))
+        self.assertEqual(manager.detect_deadlock(), ["T3"])
+
+    def test_aborting_victim_wakes_its_waiter(self):
+        data_items, manager = self.make_manager(["A", "B", "C"])
+        woken = []
+        manager.on_wakeup = woken.append
+        transactions = [Transaction(f"T{i}", [], timestamp=i) for i in (1, 2, 3)]
+        for transaction, name in zip(transactions, ["A", "B", "C"]):
+            manager.acquire_lock(transaction, data_items[name], 'X')
+        for transaction, name in zip(transactions, ["B", "C", "A"]):
+            manager.acquire_lock(transaction, data_items[name], 'X')
+        victim_id, = manager.detect_deadlock()
+        manager.abort_transaction(transactions[2], "Deadlock Resolution", 'deadlock_victim')
+        self.assertEqual(victim_id, "T3")
+        self.assertEqual(woken, [transactions[1]])
+        self.assertEqual(transactions[1].locks_held, {"B": 'X', "C": 'X'})
+        self.assertEqual(manager.wait_for_graph.waits_for, {"T1": {"T2": None}})
+
+class WoundWaitTest(unittest.TestCase):
+    def setUp(self):
+        self.data_items = {"A": DataItem("A", 0)}
+        self.manager = LockingConcurrencyManager(self.data_items, quiet_log, quiet_count, deadlock_policy="wound_wait")
+        self.oldest, self.holder, self.waiter = (Transaction(f"T{i}", [], timestamp=i) for i in (1, 3, 5))
+
+    def test_older_requester_wounds_younger_holder_only(self):
+        self.manager.acquire_lock(self.holder, self.data_items["A"], 'X')
+        self.assertFalse(self.manager.acquire_lock(self.waiter, self.data_items["A"], 'X'))
+        self.assertTrue(self.manager.acquire_lock(self.oldest, self.data_items["A"], 'X'))
+        self.assertEqual((self.holder.state, self.waiter.state), ("ABORTED", "WAITING"))
+        self.assertEqual(self.holder.abort_cause, 'wounded')
+        self.assertEqual(self.manager.lock_table.waiting("A"), ["T5"])
+
+    def test_compatible_older_requester_passes_younger_waiter(self):
+        self.manager.acquire_lock(self.holder, self.data_items["A"], 'S')
+        self.assertFalse(self.manager.acquire_lock(self.waiter, self.data_items["A"], 'X'))
+        self.assertTrue(self.manager.acquire_lock(self.oldest, self.data_items["A"], 'S'))
+        self.assertEqual((self.holder.state, self.waiter.state), ("RUNNING", "WAITING"))
+
+class HierarchicalLockTableTest(unittest.TestCase):
+    def setUp(self):
+        self.table = LockTable(HIERARCHICAL_COMPATIBILITY, HIERARCHICAL_UPGRADES)
+
+    def test_intention_exclusive_blocks_shared_but_not_intention_shared(self):
+        self.table.request("T1", "P", 'IX')
+        self.assertEqual(self.table.request("T2", "P", 'IS'), ("GRANTED", 'IS', None))
+        self.assertEqual(self.table.request("T3", "P", 'S'), ("WAITING", 'S', 0))
+
+    def test_intention_shared_does_not_block_shared(self):
+        self.table.request("T1", "P", 'IS')
+        self.assertEqual(self.table.request("T2", "P", 'S'), ("GRANTED", 'S', None))
+        self.assertEqual(self.table.request("T3", "P", 'IX'), ("WAITING", 'IX', 0))
+
+    def test_shared_plus_intention_exclusive_upgrades_to_six(self):
+        self.table.request("T1", "P", 'S')
+        self.assertEqual(self.table.request("T1", "P", 'IX'), ("UPGRADED", 'SIX', None))
+        self.assertEqual(self.table.request("T2", "P", 'IS'), ("GRANTED", 'IS', None))
+        self.assertEqual(self.table.request("T3", "P", 'IX'), ("WAITING", 'IX', 0))
+
+class HierarchicalLockingTest(unittest.TestCase):
+    def make_manager(self, names, escalation_threshold=None):
+        data_items = {name: DataItem(name, 0) for name in names}
+        return data_items, HierarchicalLockingConcurrencyManager(data_items, quiet_log, quiet_count, partitions=1, escalation_threshold=escalation_threshold)
+
+    def test_item_locks_take_intention_locks_on_ancestors(self):
+        data_items, manager = self.make_manager(["A", "B"])
+        writer, reader = Transaction("T1", [], timestamp=1), Transaction("T2", [], timestamp=2)
+        self.assertTrue(manager.acquire_lock(writer, data_items["A"], 'X'))
+        self.assertEqual(writer.locks_held, {DATABASE_RESOURCE: 'IX', "DB/P0": 'IX', "A": 'X'})
+        self.assertTrue(manager.acquire_lock(reader, data_items["B"], 'S'))
+        self.assertEqual(reader.locks_held, {DATABASE_RESOURCE: 'IS', "DB/P0": 'IS', "B": 'S'})
+        self.assertFalse(manager.acquire_lock(reader, data_items["A"], 'S'))
+        self.assertEqual(reader.state, "WAITING")
+
+    def test_escalation_triggers_past_the_threshold(self):
+        data_items, manager = self.make_manager(["A", "B", "C", "D"], escalation_threshold=3)
+        reader = Transaction("T1", [], timestamp=1)
+        for name in ("A", "B", "C"):
+            manager.acquire_lock(reader, data_items[name], 'S')
+        self.assertEqual(manager.escalations, 0)
+        manager.acquire_lock(reader, data_items["D"], 'S')
+        self.assertEqual(manager.escalations, 1)
+        self.assertEqual(reader.locks_held, {DATABASE_RESOURCE: 'IS', "DB/P0": 'S'})
+        self.assertTrue(manager.acquire_lock(reader, data_items["A"], 'S'))
+        self.assertEqual(reader.locks_held, {DATABASE_RESOURCE: 'IS', "DB/P0": 'S'})
+
+    def test_escalation_waits_while_another_transaction_holds_intention_exclusive(self):
+        data_items, manager = self.make_manager(["A", "B", "C", "D"], escalation_threshold=2)
+        writer, reader = Transaction("T1", [], timestamp=1), Transaction("T2", [], timestamp=2)
+        manager.acquire_lock(writer, data_items["D"], 'X')
+        for name in ("A", "B", "C"):
+            self.assertTrue(manager.acquire_lock(reader, data_items[name], 'S'))
+        self.assertEqual(manager.escalations, 0)
+        self.assertEqual(reader.locks_held["DB/P0"], 'IS')
+        manager.commit_transaction(writer)
+        self.assertTrue(manager.acquire_lock(reader, data_items["D"], 'S'))
+        self.assertEqual(manager.escalations, 1)
+        self.assertEqual(reader.locks_held["DB/P0"], 'S')
+
+class DistributedCommitTest(unittest.TestCase):
+    def make_manager(self, **options):
+        self.data_items = {"A": DataItem("A", 1), "B": DataItem("B", 2)}
+        manager = DistributedConcurrencyManager(self.data_items, quiet_log, quiet_count, sites=2, partitioning='range', seed=1, **options)
+        self.transaction = Transaction("T1", [], timestamp=1)
+        self.assertTrue(manager.process_operation(self.transaction, 'write', self.data_items["A"], 10))
+        self.assertTrue(manager.process_operation(self.transaction, 'write', self.data_items["B"], 20))
+        return manager
+
+    def test_cross_site_commit_runs_two_phases(self):
+        manager = self.make_manager()
+        manager.commit_transaction(self.transaction)
+        self.assertEqual(self.transaction.state, "COMMITTED")
+        self.assertEqual((self.data_items["A"].value, self.data_items["B"].value), (10, 20))
+        self.assertEqual(manager.network.messages_by_kind['prepare'], 1)
+        self.assertEqual(manager.network.messages_by_kind['commit'], 1)
+        self.assertEqual(manager.network_stats()['cross_site_transactions'], 1)
+
+    def test_lost_participant_aborts_the_commit(self):
+        manager = self.make_manager(vote_retransmits=2)
+        manager.network.loss_rate = 0.999
+        manager.commit_transaction(self.transaction)
+        self.assertEqual(self.transaction.state, "ABORTED")
+        self.assertEqual(self.transaction.abort_cause, 'participant_lost')
+        self.assertEqual((self.data_items["A"].value, self.data_items["B"].value), (1, 2))
+        self.assertNotIn('commit', manager.network.messages_by_kind)
+        self.assertEqual(manager.participant_sites("T1"), [])
+        self.assertEqual(manager.network_stats()['committed_transactions'], 0)
+        for site in manager.sites:
+            self.assertEqual(site.manager.lock_table.entries, {})
+
+    def test_vote_retransmits_are_bounded(self):
+        manager = self.make_manager(vote_retransmits=2)
+        manager.network.loss_rate = 0.999
+        manager.commit_transaction(self.transaction)
+        self.assertEqual(manager.network.messages_by_kind['prepare'], 3)
+
+class TimestampRollbackTest(unittest.TestCase):
+    def setUp(self):
+        self.item = DataItem("D2", 100)
+        self.manager = TimestampConcurrencyManager({"D2": self.item}, quiet_log, quiet_count)
+        self.older = Transaction("T18", [], timestamp=18)
+        self.newer = Transaction("T20", [], timestamp=20)
+        self.manager.process_operation(self.older, 'write', self.item, 186)
+        self.manager.process_operation(self.newer, 'write', self.item, 200)
+
+    def test_aborts_in_write_order_restore_the_committed_value(self):
+        self.manager.abort_transaction(self.older, "test")
+        self.assertEqual(self.item.value, 200)
+        self.manager.abort_transaction(self.newer, "test")
+        self.assertEqual((self.item.value, self.item.write_timestamp), (100, 0))
+        self.assertEqual(self.manager.pending_writes, {})
+
+    def test_abort_of_newer_writer_restores_live_older_write(self):
+        self.manager.abort_transaction(self.newer, "test")
+        self.assertEqual((self.item.value, self.item.write_timestamp), (186, 18))
+        self.manager.commit_transaction(self.older)
+        self.assertEqual((self.item.value, self.item.write_timestamp), (186, 18))
+        self.assertEqual(self.manager.pending_writes, {})
+
+    def test_abort_below_committed_writer_keeps_newer_value(self):
+        self.manager.commit_transaction(self.newer)
+        self.manager.abort_transaction(self.older, "test")
+        self.assertEqual((self.item.value, self.item.write_timestamp), (200, 20))
+        self.assertEqual(self.manager.pending_writes, {})
+
+    def test_committed_write_below_aborted_one_survives(self):
+        self.manager.commit_transaction(self.older)
+        self.manager.abort_transaction(self.newer, "test")
+        self.assertEqual((self.item.value, self.item.write_timestamp), (186, 18))
+
+class MultiversionTimestampTest(unittest.TestCase):
+    def setUp(self):
+        self.data_items = {"D1": DataItem("D1", 0)}
+        self.manager = MultiversionTimestampConcurrencyManager(self.data_items, quiet_log, quiet_count)
+
+    def test_write_below_committed_version_is_skipped(self):
+        older = Transaction("T1", [], timestamp=1)
+        newer = Transaction("T2", [], timestamp=2)
+        self.manager.begin_transaction(older)
+        self.manager.process_operation(newer, 'write', self.data_items["D1"], 20)
+        self.manager.commit_transaction(newer)
+        self.assertTrue(self.manager.process_operation(older, 'write', self.data_items["D1"], 10))
+        self.assertEqual(self.manager.writes_skipped, 1)
+        self.manager.commit_transaction(older)
+        self.assertEqual(self.data_items["D1"].value, 20)
+
+    def test_write_below_uncommitted_version_survives_its_abort(self):
+        older = Transaction("T1", [], timestamp=1)
+        newer = Transaction("T2", [], timestamp=2)
+        self.manager.process_operation(newer, 'write', self.data_items["D1"], 20)
+        self.assertTrue(self.manager.process_operation(older, 'write', self.data_items["D1"], 10))
+        self.assertEqual(self.manager.writes_skipped, 0)
+        self.manager.commit_transaction(older)
+        self.manager.abort_transaction(newer, "test")
+        self.assertEqual(self.data_items["D1"].value, 10)
+        self.assertEqual(self.data_items["D1"].write_timestamp, 1)
+
+class OptimisticValidationTest(unittest.TestCase):
+    def make_manager(self, validation, forward_victim='readers'):
+        self.data_items = {"X": DataItem("X", 1), "Y": DataItem("Y", 2)}
+        manager = OptimisticConcurrencyManager(self.data_items, quiet_log, quiet_count, validation, forward_victim)
+        self.reader = Transaction("T1", [], timestamp=1)
+        self.writer = Transaction("T2", [], timestamp=2)
+        for transaction in (self.reader, self.writer):
+            manager.begin_transaction(transaction)
+        manager.process_operation(self.reader, 'read', self.data_items["X"])
+        manager.process_operation(self.writer, 'write', self.data_items["X"], 10)
+        return manager
+
+    def test_backward_validation_aborts_reader_of_overwritten_item(self):
+        manager = self.make_manager('backward')
+        manager.commit_transaction(self.writer)
+        manager.commit_transaction(self.reader)
+        self.assertEqual((self.writer.state, self.reader.state), ("COMMITTED", "ABORTED"))
+        self.assertEqual(self.reader.abort_cause, 'validation_failed')
+        self.assertEqual(self.data_items["X"].value, 10)
+
+    def test_backward_validation_passes_without_overlap(self):
+        manager = self.make_manager('backward')
+        manager.commit_transaction(self.reader)
+        manager.commit_transaction(self.writer)
+        self.assertEqual((self.reader.state, self.writer.state), ("COMMITTED", "COMMITTED"))
+
+    def test_forward_validation_aborts_active_readers(self):
+        manager = self.make_manager('forward')
+        aborted = []
+        manager.on_abort = aborted.append
+        manager.commit_transaction(self.writer)
+        self.assertEqual((self.writer.state, self.reader.state), ("COMMITTED", "ABORTED"))
+        self.assertEqual(aborted, [self.reader])
+        self.assertEqual(manager.active_readers, {})
+        self.assertEqual(self.data_items["X"].value, 10)
+
+    def test_forward_validation_can_abort_the_validator(self):
+        manager = self.make_manager('forward', 'validator')
+        manager.commit_transaction(self.writer)
+        self.assertEqual((self.writer.state, self.reader.state), ("ABORTED", "RUNNING"))
+        self.assertEqual(self.data_items["X"].value, 1)
+        manager.commit_transaction(self.reader)
+        self.assertEqual(self.reader.state, "COMMITTED")
+
+    def test_unknown_forward_victim_is_rejected(self):
+        with self.assertRaises(ValueError):
+            OptimisticConcurrencyManager({}, quiet_log, quiet_count, 'forward', 'oldest')
+
+if __name__ == "__main__":
+    unittest.main()
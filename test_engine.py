@@ -0,0 +1,134 @@
+import random
+import unittest
+
+from engine import SimulationEngine, backoff_delay
+from eventlog import EventLog
+from workload import WorkloadConfig, generate_workload
+
+def run_engine(mechanism, initial_data_items, transactions, **options):
+    messages = []
+    engine = SimulationEngine(mechanism, initial_data_items, transactions, log_callback=lambda message, color="black": messages.append(message), **options)
+    engine.start()
+    engine.run()
+    return engine, messages
+
+def serial_replay(initial_data_items, transactions):
+    state = dict(initial_data_items)
+    for transaction in transactions:
+        for op_type, item_name, *value_arg in transaction.operations:
+            if op_type == 'write':
+                state[item_name] = value_arg[0]
+    return state
+
+class SerialReplayTest(unittest.TestCase):
+    SEEDS = range(40)
+
+    def run_seeds(self, mechanism, **options):
+        for seed in self.SEEDS:
+            initial_data_items, transactions = generate_workload(WorkloadConfig(num_items=6, num_transactions=25, txn_length=4, read_ratio=0.5, seed=seed))
+            engine = SimulationEngine(mechanism, initial_data_items, transactions, **options)
+            engine.start()
+            committed = []
+            while engine.step():
+                committed.extend(t for t in engine.transactions.values() if t.state == "COMMITTED" and t not in committed)
+            final_state = {name: item.value for name, item in engine.data_items.items()}
+            yield seed, initial_data_items, committed, final_state
+
+    def assert_matches_timestamp_order(self, mechanism, **options):
+        for seed, initial_data_items, committed, final_state in self.run_seeds(mechanism, **options):
+            with self.subTest(seed=seed):
+                self.assertEqual(final_state, serial_replay(initial_data_items, sorted(committed, key=lambda t: t.timestamp)))
+
+    def assert_matches_commit_order(self, mechanism, **options):
+        for seed, initial_data_items, committed, final_state in self.run_seeds(mechanism, **options):
+            with self.subTest(seed=seed):
+                self.assertEqual(final_state, serial_replay(initial_data_items, committed))
+
+    def test_timestamp_ordering(self):
+        self.assert_matches_timestamp_order("timestamping")
+
+    def test_timestamp_ordering_with_restarts(self):
+        self.assert_matches_timestamp_order("timestamping", restart_aborted=True, max_restarts=20)
+
+    def test_mvto_with_thomas_write_rule(self):
+        self.assert_matches_timestamp_order("mvto")
+
+    def test_mvto_without_thomas_write_rule(self):
+        self.assert_matches_timestamp_order("mvto", manager_options={'thomas_write_rule': False})
+
+    def test_mvto_with_restarts(self):
+        self.assert_matches_timestamp_order("mvto", restart_aborted=True, max_restarts=20)
+
+    def test_locking_with_restarts(self):
+        self.assert_matches_commit_order("locking", restart_aborted=True, max_restarts=20)
+
+    def test_locking_with_wound_wait(self):
+        self.assert_matches_commit_order("locking", manager_options={'deadlock_policy': 'wound_wait'}, restart_aborted=True)
+
+    def test_optimistic_backward_validation(self):
+        self.assert_matches_commit_order("optimistic", restart_aborted=True, max_restarts=20)
+
+    def test_optimistic_forward_validation(self):
+        for forward_victim in ("readers", "validator"):
+            self.assert_matches_commit_order("optimistic", manager_options={'validation': 'forward', 'forward_victim': forward_victim}, restart_aborted=True, max_restarts=20)
+
+class BackoffDelayTest(unittest.TestCase):
+    def test_exponential_delay_stops_at_the_cap(self):
+        self.assertEqual([backoff_delay('exponential', restarts, 2.0, 64.0, None) for restarts in (0, 4, 5, 6)], [2.0, 32.0, 64.0, 64.0])
+
+    def test_large_restart_counts_do_not_overflow(self):
+        self.assertEqual(backoff_delay('exponential', 1100, 2.0, 64.0, None), 64.0)
+        self.assertLessEqual(backoff_delay('jittered', 100000, 2.0, 64.0, random.Random(1)), 64.0)
+
+class ItemSink:
+    def __init__(self):
+        self.items = set()
+
+    def write(self, event):
+        if event.item is not None:
+            self.items.add(event.item)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class ItemEventTest(unittest.TestCase):
+    def test_every_item_change_is_reported_with_its_item(self):
+        initial_data_items, transactions = generate_workload(WorkloadConfig(num_items=6, num_transactions=40, txn_length=4, read_ratio=0.4, seed=11))
+        for mechanism in ("locking", "timestamping", "mvto", "optimistic", "distributed"):
+            with self.subTest(mechanism=mechanism):
+                sink = ItemSink()
+                engine = SimulationEngine(mechanism, initial_data_items, transactions, event_log=EventLog([sink]), restart_aborted=True, max_restarts=5)
+                engine.start()
+                before = {name: (item.value, item.write_timestamp) for name, item in engine.data_items.items()}
+                while engine.step():
+                    after = {name: (item.value, item.write_timestamp) for name, item in engine.data_items.items()}
+                    changed = {name for name in after if after[name] != before[name]}
+                    self.assertLessEqual(changed, sink.items)
+                    sink.items.clear()
+                    before = after
+
+class LockRequestTest(unittest.TestCase):
+    def test_lock_requests_finish_under_every_lock_free_manager(self):
+        initial_data_items, transactions = generate_workload(WorkloadConfig(num_items=20, num_transactions=200, read_ratio=0.5, lock_request_ratio=0.3, seed=3))
+        for mechanism in ("timestamping", "mvto", "optimistic"):
+            with self.subTest(mechanism=mechanism):
+                engine, messages = run_engine(mechanism, initial_data_items, transactions)
+                self.assertEqual(engine.stats.commits + engine.stats.aborts, len(transactions))
+                self.assertFalse([t.id for t in engine.transactions.values() if t.state == "RUNNING" or t.state == "WAITING"])
+                self.assertIn("All transactions have completed or aborted. Simulation finished.", messages)
+
+class EndOfRunTest(unittest.TestCase):
+    def test_unscheduled_running_transactions_are_reported_as_stalled(self):
+        initial_data_items, transactions = generate_workload(WorkloadConfig(num_items=5, num_transactions=3, seed=0))
+        messages = []
+        engine = SimulationEngine("timestamping", initial_data_items, transactions, log_callback=lambda message, color="black": messages.append(message))
+        engine.start()
+        engine.event_queue.clear()
+        self.assertFalse(engine.step())
+        self.assertIn("No runnable transactions left; 3 unfinished (0 WAITING). Simulation stalled.", messages)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+
+from engine import SimulationEngine
+from scenario import ScenarioFile, write_scenario
+from workload import WorkloadConfig, generate_workload
+
+def padded(operation):
+    return tuple(operation) + (None,) * (3 - len(operation))
+
+class ScenarioFileTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8", newline="") as scenario_file:
+            scenario_file.write(text)
+        return path
+
+    def test_round_trip_in_both_formats(self):
+        initial_data_items, transactions = generate_workload(WorkloadConfig(num_items=10, num_transactions=20, lock_request_ratio=0.2, seed=1))
+        for name in ("run.jsonl", "run.csv"):
+            with self.subTest(format=name):
+                path = os.path.join(self.directory, name)
+                write_scenario(path, initial_data_items, transactions)
+                scenario = ScenarioFile(path)
+                self.assertEqual(scenario.initial_data_items, initial_data_items)
+                loaded = list(scenario)
+                self.assertEqual([t.id for t in loaded], [t.id for t in transactions])
+                for original, read in zip(transactions, loaded):
+                    self.assertEqual([padded(op) for op in read.operations], [padded(op) for op in original.operations])
+
+    def test_csv_values_are_typed(self):
+        path = self.write("typed.csv", "item,A,5\nitem,B,2.5\nitem,C\nop,T1,write,A,7\nop,T1,request_lock,B,X\nop,T1,read,C\n")
+        scenario = ScenarioFile(path)
+        self.assertEqual(scenario.initial_data_items, {"A": 5, "B": 2.5, "C": None})
+        transaction, = scenario
+        self.assertEqual(transaction.operations, [('write', 'A', 7), ('request_lock', 'B', 'X'), ('read', 'C', None)])
+
+    def test_consecutive_csv_rows_form_one_transaction(self):
+        path = self.write("split.csv", "item,A,1\nop,T1,read,A\nop,T2,read,A\nop,T1,write,A,3\n")
+        self.assertEqual([(t.id, len(t.operations)) for t in ScenarioFile(path)], [("T1", 1), ("T2", 1), ("T1", 1)])
+
+    def test_item_declared_after_first_transaction_is_rejected(self):
+        cases = {
+            "late.jsonl": '{"item": "A", "value": 1}\n{"transaction": "T1", "operations": [["read", "A"]]}\n{"item": "B", "value": 2}\n',
+            "late.csv": "item,A,1\nop,T1,read,A\nitem,B,2\nop,T2,read,B\n",
+        }
+        for name, text in cases.items():
+            with self.subTest(format=name):
+                scenario = ScenarioFile(self.write(name, text))
+                self.assertEqual(scenario.initial_data_items, {"A": 1})
+                with self.assertRaisesRegex(ValueError, "B is declared after the first transaction"):
+                    list(scenario)
+
+    def test_malformed_records_are_rejected(self):
+        cases = {
+            "bad.jsonl": '{"item": "A", "value": 1}\n{"name": "T1"}\n',
+            "bad.csv": "item,A,1\nrow,T1,read,A\n",
+            "short.csv": "item,A,1\nop,T1,read\n",
+        }
+        for name, text in cases.items():
+            with self.subTest(format=name):
+                with self.assertRaisesRegex(ValueError, "Line 2"):
+                    list(ScenarioFile(self.write(name, text)))
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ScenarioFile(self.write("run.jsonl", ""), format="xml")
+
+    def test_engine_runs_a_streamed_scenario(self):
+        path = self.write("run.csv", "item,A,1\nitem,B,2\nop,T1,read,A\nop,T1,write,B,5\nop,T2,write,A,9\n")
+        scenario = ScenarioFile(path)
+        engine = SimulationEngine("locking", scenario.initial_data_items, scenario, multiprogramming_level=1, retain_finished=False)
+        engine.start()
+        engine.run()
+        self.assertEqual(engine.stats.commits, 2)
+        self.assertEqual({name: item.value for name, item in engine.data_items.items()}, {"A": 9, "B": 5})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from engine import SimulationEngine
+from scheduletrace import ScheduleRecorder, ScheduleTrace
+from workload import WorkloadConfig, generate_workload
+
+class ScheduleTraceTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "run.sched")
+
+    def test_workload_is_decoded_per_transaction(self):
+        initial_data_items, transactions = generate_workload(WorkloadConfig(num_items=10, num_transactions=20, lock_request_ratio=0.2, seed=2))
+        with ScheduleRecorder(self.path, initial_data_items, transactions):
+            pass
+        with ScheduleTrace(self.path) as trace:
+            self.assertEqual(trace.initial_data_items, initial_data_items)
+            self.assertEqual(len(trace.transactions()), len(transactions))
+            for original, recorded in zip(transactions, trace.transactions()):
+                self.assertEqual(recorded.id, original.id)
+                self.assertEqual(list(recorded.operations), [tuple(op) for op in original.operations])
+
+    def test_large_attempt_numbers_round_trip(self):
+        with ScheduleRecorder(self.path, {"X": 1}, []) as recorder:
+            recorder.record(1.5, "T1", 0, 70000, 'write', "X", 2.5, "ok")
+        with ScheduleTrace(self.path) as trace:
+            record, = trace
+        self.assertEqual((record.transaction, record.attempt, record.value), ("T1", 70000, 2.5))
+
+    def test_replay_reproduces_the_recorded_run(self):
+        initial_data_items, transactions = generate_workload(WorkloadConfig(num_items=20, num_transactions=150, read_ratio=0.5, seed=5))
+        options = {'restart_aborted': True, 'max_restarts': 3}
+        recorder = ScheduleRecorder(self.path, initial_data_items, transactions)
+        recorded = SimulationEngine("timestamping", initial_data_items, transactions, recorder=recorder, **options)
+        recorded.start()
+        recorded.run()
+        recorder.close()
+
+        with ScheduleTrace(self.path) as trace:
+            replayed = SimulationEngine("timestamping", trace.initial_data_items, trace.transactions(), replay=trace, retain_finished=False, **options)
+            replayed.start()
+            replayed.run()
+        self.assertEqual(replayed.stats.replay_skipped, 0)
+        self.assertEqual(replayed.stats.commits, recorded.stats.commits)
+        self.assertEqual(replayed.stats.restarts, recorded.stats.restarts)
+        self.assertEqual({name: item.value for name, item in replayed.data_items.items()}, {name: item.value for name, item in recorded.data_items.items()})
+
+class AdmissionReplayTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "run.sched")
+
+    def assert_replay_matches(self, mechanism, **options):
+        initial_data_items, transactions = generate_workload(WorkloadConfig(num_items=20, num_transactions=300, read_ratio=0.5, seed=7))
+        recorder = ScheduleRecorder(self.path, initial_data_items, transactions)
+        recorded = SimulationEngine(mechanism, initial_data_items, transactions, recorder=recorder, restart_aborted=True, max_restarts=10, **options)
+        recorded.start()
+        recorded.run()
+        recorder.close()
+
+        with ScheduleTrace(self.path) as trace:
+            replayed = SimulationEngine(mechanism, trace.initial_data_items, trace.transactions(), replay=trace, restart_aborted=True, max_restarts=10, **options)
+            replayed.start()
+            replayed.run()
+        self.assertEqual(replayed.stats.replay_skipped, 0)
+        self.assertEqual((replayed.stats.commits, replayed.stats.aborts), (recorded.stats.commits, recorded.stats.aborts))
+        self.assertEqual({name: item.value for name, item in replayed.data_items.items()}, {name: item.value for name, item in recorded.data_items.items()})
+
+    def test_multiprogramming_level_round_trip(self):
+        for mechanism in ("timestamping", "mvto"):
+            with self.subTest(mechanism=mechanism):
+                self.assert_replay_matches(mechanism, multiprogramming_level=8)
+
+    def test_arrival_rate_round_trip(self):
+        self.assert_replay_matches("timestamping", arrival_rate=0.5)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import random
+import unittest
+
+from concurrency import DEADLOCK_POLICIES
+from workers import WORKER_MODES, Backoff, run_workers
+from workload import WorkloadConfig, generate_workload
+
+class BackoffTest(unittest.TestCase):
+    def test_exponential_backoff_doubles_up_to_the_cap(self):
+        backoff = Backoff('exponential', 0.001, 0.004)
+        self.assertEqual([backoff.delay(restarts, None) for restarts in range(4)], [0.001, 0.002, 0.004, 0.004])
+
+    def test_long_restart_chains_stay_at_the_cap(self):
+        rng = random.Random(3)
+        for policy in ('exponential', 'jittered'):
+            backoff = Backoff(policy, 0.001, 0.5)
+            for restarts in (1024, 1100, 5000, 100000):
+                self.assertLessEqual(backoff.delay(restarts, rng), 0.5)
+
+    def test_unknown_policy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Backoff('linear')
+
+class RunWorkersTest(unittest.TestCase):
+    def test_every_transaction_finishes_under_every_policy(self):
+        initial_data_items, transactions = generate_workload(WorkloadConfig(num_items=5, num_transactions=100, read_ratio=0.3, seed=4))
+        for mode in WORKER_MODES:
+            for deadlock_policy in DEADLOCK_POLICIES:
+                with self.subTest(mode=mode, deadlock_policy=deadlock_policy):
+                    result = run_workers(mode, initial_data_items, transactions, 4, deadlock_policy=deadlock_policy, max_restarts=50, backoff='jittered', seed=1)
+                    self.assertEqual(result['commits'] + sum(result['aborts'].values()) - result['restarts'], len(transactions))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,537 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from benchmark import BENCHMARK_WORKLOADS
+from concurrency import DataItem, Transaction, LockTable, WaitForGraph, Partitioner, VICTIM_POLICIES, DEADLOCK_POLICIES, older_conflicts, younger_conflicts, choose_victim
+from engine import BACKOFF_POLICIES, backoff_delay
+from metrics import Histogram
+from workload import WorkloadConfig, generate_workload
+
+WORKER_MODES = ('thread', 'asyncio')
+
+OPERATION_LOCK_MODES = {
+    'read': 'S',
+    'write': 'X',
+}
+
+class TransactionAborted(Exception):
+    def __init__(self, cause, restartable=True):
+        super().__init__(cause)
+        self.cause = cause
+        self.restartable = restartable
+
+class WorkerTransaction(Transaction):
+    def reset_state(self, timestamp=None):
+        super().reset_state(timestamp)
+        self.abort_requested = None
+        self.wait_signal = None
+
+class Latch:
+    __slots__ = ('lock', 'acquisitions', 'contended')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.acquisitions = 0
+        self.contended = 0
+
+    def __enter__(self):
+        if not self.lock.acquire(blocking=False):
+            self.lock.acquire()
+            self.contended += 1
+        self.acquisitions += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self.lock.release()
+
+class NullLatch:
+    __slots__ = ('acquisitions', 'contended')
+
+    def __init__(self):
+        self.acquisitions = 0
+        self.contended = 0
+
+    def __enter__(self):
+        self.acquisitions += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+class LockBucket:
+    __slots__ = ('latch', 'table', 'requests', 'waits')
+
+    def __init__(self, latch):
+        self.latch = latch
+        self.table = LockTable()
+        self.requests = 0
+        self.waits = 0
+
+class ThreadSafeLockManager:
+    def __init__(self, data_items, buckets=64, deadlock_policy="detection", victim_policy="youngest"):
+        if buckets < 1:
+            raise ValueError("A lock manager needs at least one bucket.")
+        if deadlock_policy not in DEADLOCK_POLICIES:
+            raise ValueError(f"Unknown deadlock policy: {deadlock_policy}")
+        if victim_policy not in VICTIM_POLICIES:
+            raise ValueError(f"Unknown deadlock victim policy: {victim_policy}")
+        self.data_items = data_items
+        self.partitioner = Partitioner(data_items, buckets)
+        self.buckets = [LockBucket(self.new_latch()) for _ in range(buckets)]
+        self.deadlock_policy = deadlock_policy
+        self.victim_cost = VICTIM_POLICIES[victim_policy]
+        self.wait_for_graph = WaitForGraph()
+        self.deadlock_victims = set()
+        self.graph_latch = self.new_latch()
+
+    def new_latch(self):
+        return Latch()
+
+    def new_signal(self):
+        return threading.Event()
+
+    def fire(self, signal):
+        signal.set()
+
+    def bucket_for(self, resource):
+        return self.buckets[self.partitioner.primary(resource)]
+
+    def request(self, transaction, resource, mode):
+        bucket = self.bucket_for(resource)
+        with bucket.latch:
+            bucket.requests += 1
+            if transaction.abort_requested is not None:
+                raise TransactionAborted(transaction.abort_requested)
+            priority = transaction.timestamp if self.deadlock_policy == "wound_wait" else None
+            status, granted_mode, position = bucket.table.request(transaction, resource, mode, priority)
+            if status != "WAITING":
+                transaction.locks_held[resource] = granted_mode
+                return None
+
+            bucket.waits += 1
+            transaction.state = "WAITING"
+            transaction.waiting_for = resource
+            signal = transaction.wait_signal = self.new_signal()
+            if self.deadlock_policy == "wait_die":
+                if older_conflicts(transaction, bucket.table.conflicting_at(bucket.table.entries[resource], position)):
+                    self.cancel(bucket, transaction, resource)
+                    raise TransactionAborted('wait_die')
+            elif self.deadlock_policy == "wound_wait":
+                for victim in younger_conflicts(transaction, bucket.table.incompatible_holders(bucket.table.entries[resource], position)):
+                    self.request_abort(victim, 'wounded')
+            else:
+                self.update_waits(bucket.table, resource, (), (position, position + 1))
+            if transaction.abort_requested is not None:
+                self.cancel(bucket, transaction, resource)
+                raise TransactionAborted(transaction.abort_requested)
+            return signal
+
+    def finish_wait(self, transaction, resource):
+        bucket = self.bucket_for(resource)
+        with bucket.latch:
+            transaction.wait_signal = None
+            if transaction.waiting_for != resource:
+                return
+            self.cancel(bucket, transaction, resource)
+            raise TransactionAborted(transaction.abort_requested or 'other')
+
+    def acquire(self, transaction, resource, mode):
+        signal = self.request(transaction, resource, mode)
+        if signal is None:
+            return None
+        started = time.perf_counter()
+        signal.wait()
+        waited = time.perf_counter() - started
+        self.finish_wait(transaction, resource)
+        return waited
+
+    def request_abort(self, transaction, cause):
+        if transaction.abort_requested is None:
+            transaction.abort_requested = cause
+        signal = transaction.wait_signal
+        if signal is not None:
+            self.fire(signal)
+
+    def grant(self, resource, granted_requests):
+        for request in granted_requests:
+            waiter = request.t_id
+            waiter.locks_held[resource] = request.mode
+            waiter.waiting_for = None
+            waiter.state = "RUNNING"
+            signal = waiter.wait_signal
+            if signal is not None:
+                self.fire(signal)
+
+    def cancel(self, bucket, transaction, resource):
+        granted_requests, position = bucket.table.cancel(transaction, resource)
+        transaction.waiting_for = None
+        transaction.wait_signal = None
+        self.grant(resource, granted_requests)
+        self.update_waits(bucket.table, resource, granted_requests, (0,) if position is None else (0, position))
+
+    def update_waits(self, table, resource, granted_requests, positions):
+        if self.deadlock_policy != "detection":
+            return
+        entry = table.entries.get(resource)
+        if not granted_requests and (entry is None or not entry.waiters):
+            return
+        with self.graph_latch:
+            for request in granted_requests:
+                self.wait_for_graph.remove_waits(request.t_id)
+            if entry is None:
+                return
+            for index in sorted(set(positions)):
+                if index < len(entry.waiters):
+                    waiter = entry.waiters[index].t_id
+                    for blocker in self.wait_for_graph.set_waits(waiter, table.blockers_at(entry, index)):
+                        self.check_cycle(waiter, blocker)
+
+    def check_cycle(self, waiter, blocker):
+        cycle = self.wait_for_graph.find_path(blocker, waiter, self.deadlock_victims)
+        while cycle:
+            victim = choose_victim(cycle, self.victim_cost)
+            self.deadlock_victims.add(victim)
+            self.request_abort(victim, 'deadlock_victim')
+            cycle = self.wait_for_graph.find_path(blocker, waiter, self.deadlock_victims)
+
+    def release_all(self, transaction):
+        for resource in list(transaction.locks_held):
+            bucket = self.bucket_for(resource)
+            with bucket.latch:
+                _, granted_requests = bucket.table.release(transaction, resource)
+                self.grant(resource, granted_requests)
+                self.update_waits(bucket.table, resource, granted_requests, (0,))
+        transaction.locks_held.clear()
+        if self.deadlock_policy == "detection":
+            with self.graph_latch:
+                self.wait_for_graph.remove_transaction(transaction)
+                self.deadlock_victims.discard(transaction)
+
+    def commit(self, transaction):
+        transaction.undo_log.clear()
+        self.release_all(transaction)
+        transaction.state = "COMMITTED"
+
+    def abort(self, transaction, cause='other'):
+        transaction.abort_cause = cause
+        for data_item, value in reversed(transaction.undo_log):
+            data_item.value = value
+        transaction.undo_log.clear()
+        self.release_all(transaction)
+        transaction.state = "ABORTED"
+
+    def lock_stats(self):
+        latches = [bucket.latch for bucket in self.buckets] + [self.graph_latch]
+        return {
+            'buckets': len(self.buckets),
+            'lock_entries': sum(len(bucket.table.entries) for bucket in self.buckets),
+            'lock_requests': sum(bucket.requests for bucket in self.buckets),
+            'lock_waits': sum(bucket.waits for bucket in self.buckets),
+            'latch_acquisitions': sum(latch.acquisitions for latch in latches),
+            'latch_contended': sum(latch.contended for latch in latches),
+        }
+
+class AsyncLockManager(ThreadSafeLockManager):
+    def new_latch(self):
+        return NullLatch()
+
+    def new_signal(self):
+        return asyncio.get_running_loop().create_future()
+
+    def fire(self, signal):
+        if not signal.done():
+            signal.set_result(None)
+
+    async def acquire(self, transaction, resource, mode):
+        signal = self.request(transaction, resource, mode)
+        if signal is None:
+            return None
+        started = time.perf_counter()
+        await signal
+        waited = time.perf_counter() - started
+        self.finish_wait(transaction, resource)
+        return waited
+
+LOCK_MANAGERS = {
+    'thread': ThreadSafeLockManager,
+    'asyncio': AsyncLockManager,
+}
+
+class TransactionSource:
+    def __init__(self, templates):
+        self.templates = iter(templates)
+        self.timestamps = itertools.count(1)
+        self.latch = threading.Lock()
+
+    def take(self):
+        with self.latch:
+            template = next(self.templates, None)
+            if template is None:
+                return None
+            return WorkerTransaction(template.id, list(template.operations), next(self.timestamps))
+
+class WorkerStats:
+    def __init__(self):
+        self.commits = 0
+        self.operations = 0
+        self.restarts = 0
+        self.aborts = Counter()
+        self.lock_waits = 0
+        self.wait_time = 0.0
+        self.latency = Histogram(lowest=0.001)
+
+    def lock_waited(self, waited):
+        if waited is not None:
+            self.lock_waits += 1
+            self.wait_time += waited
+
+    def merge(self, other):
+        self.commits += other.commits
+        self.operations += other.operations
+        self.restarts += other.restarts
+        self.aborts.update(other.aborts)
+        self.lock_waits += other.lock_waits
+        self.wait_time += other.wait_time
+        self.latency.merge(other.latency)
+
+def lock_mode(manager, op_type, item_name, value):
+    if item_name not in manager.data_items:
+        raise TransactionAborted('missing_item', restartable=False)
+    if op_type == 'request_lock':
+        return value
+    mode = OPERATION_LOCK_MODES.get(op_type)
+    if mode is None:
+        raise TransactionAborted('other', restartable=False)
+    return mode
+
+def apply_operation(manager, transaction, op_type, item_name, value):
+    if op_type == 'write':
+        data_item = manager.data_items[item_name]
+        transaction.undo_log.append((data_item, data_item.value))
+        data_item.value = value
+
+class Backoff:
+    __slots__ = ('policy', 'base', 'cap')
+
+    def __init__(self, policy='immediate', base=0.001, cap=1.0):
+        if policy not in BACKOFF_POLICIES:
+            raise ValueError(f"Unknown backoff policy: {policy}")
+        self.policy = policy
+        self.base = base
+        self.cap = cap
+
+    def delay(self, restarts, rng):
+        return backoff_delay(self.policy, restarts, self.base, self.cap, rng)
+
+def handle_abort(manager, transaction, aborted, stats, restarts, max_restarts):
+    manager.abort(transaction, aborted.cause)
+    stats.aborts[aborted.cause] += 1
+    if not aborted.restartable or max_restarts is not None and restarts >= max_restarts:
+        return False
+    stats.restarts += 1
+    transaction.reset_state(transaction.timestamp)
+    return True
+
+def run_transaction(manager, transaction, stats, op_time, max_restarts, backoff, rng):
+    started = time.perf_counter()
+    restarts = 0
+    while True:
+        try:
+            operation = transaction.current_operation()
+            while operation is not None:
+                op_type, item_name, *value_arg = operation
+                value = value_arg[0] if value_arg else None
+                stats.lock_waited(manager.acquire(transaction, item_name, lock_mode(manager, op_type, item_name, value)))
+                apply_operation(manager, transaction, op_type, item_name, value)
+                stats.operations += 1
+                time.sleep(op_time)
+                transaction.current_op_index += 1
+                operation = transaction.current_operation()
+            manager.commit(transaction)
+            stats.commits += 1
+            stats.latency.record((time.perf_counter() - started) * 1000.0)
+            return
+        except TransactionAborted as aborted:
+            if not handle_abort(manager, transaction, aborted, stats, restarts, max_restarts):
+                return
+            time.sleep(backoff.delay(restarts, rng))
+            restarts += 1
+
+async def run_transaction_async(manager, transaction, stats, op_time, max_restarts, backoff, rng):
+    started = time.perf_counter()
+    restarts = 0
+    while True:
+        try:
+            operation = transaction.current_operation()
+            while operation is not None:
+                op_type, item_name, *value_arg = operation
+                value = value_arg[0] if value_arg else None
+                stats.lock_waited(await manager.acquire(transaction, item_name, lock_mode(manager, op_type, item_name, value)))
+                apply_operation(manager, transaction, op_type, item_name, value)
+                stats.operations += 1
+                await asyncio.sleep(op_time)
+                transaction.current_op_index += 1
+                operation = transaction.current_operation()
+            manager.commit(transaction)
+            stats.commits += 1
+            stats.latency.record((time.perf_counter() - started) * 1000.0)
+            return
+        except TransactionAborted as aborted:
+            if not handle_abort(manager, transaction, aborted, stats, restarts, max_restarts):
+                return
+            await asyncio.sleep(backoff.delay(restarts, rng))
+            restarts += 1
+
+def thread_worker(manager, source, stats, op_time, max_restarts, backoff, rng):
+    transaction = source.take()
+    while transaction is not None:
+        run_transaction(manager, transaction, stats, op_time, max_restarts, backoff, rng)
+        transaction = source.take()
+
+async def task_worker(manager, source, stats, op_time, max_restarts, backoff, rng):
+    transaction = source.take()
+    while transaction is not None:
+        await run_transaction_async(manager, transaction, stats, op_time, max_restarts, backoff, rng)
+        transaction = source.take()
+
+def run_threads(manager, source, worker_stats, rngs, op_time, max_restarts, backoff):
+    threads = [
+        threading.Thread(target=thread_worker, args=(manager, source, stats, op_time, max_restarts, backoff, rng), name=f"worker-{index}")
+        for index, (stats, rng) in enumerate(zip(worker_stats, rngs))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+async def run_tasks(manager, source, worker_stats, rngs, op_time, max_restarts, backoff):
+    await asyncio.gather(*(
+        task_worker(manager, source, stats, op_time, max_restarts, backoff, rng)
+        for stats, rng in zip(worker_stats, rngs)
+    ))
+
+def run_workers(mode, initial_data_items, transactions, workers, buckets=64, deadlock_policy="detection", victim_policy="youngest",
+                op_time=0.0, max_restarts=None, backoff='immediate', backoff_base=0.001, backoff_cap=1.0, seed=None):
+    if mode not in WORKER_MODES:
+        raise ValueError(f"Unknown worker mode: {mode}")
+    if workers < 1:
+        raise ValueError("At least one worker is needed.")
+    restart_backoff = Backoff(backoff, backoff_base, backoff_cap)
+    data_items = {name: DataItem(name, value) for name, value in initial_data_items.items()}
+    manager = LOCK_MANAGERS[mode](data_items, buckets, deadlock_policy, victim_policy)
+    source = TransactionSource(transactions)
+    worker_stats = [WorkerStats() for _ in range(workers)]
+    rngs = [random.Random(None if seed is None else seed * 1000003 + index) for index in range(workers)]
+
+    started = time.perf_counter()
+    if mode == "thread":
+        run_threads(manager, source, worker_stats, rngs, op_time, max_restarts, restart_backoff)
+    else:
+        asyncio.run(run_tasks(manager, source, worker_stats, rngs, op_time, max_restarts, restart_backoff))
+    wall_time = time.perf_counter() - started
+
+    stats = WorkerStats()
+    for other in worker_stats:
+        stats.merge(other)
+    lock_stats = manager.lock_stats()
+    attempts = stats.commits + sum(stats.aborts.values())
+    return {
+        'mode': mode,
+        'workers': workers,
+        'deadlock_policy': deadlock_policy,
+        'op_time': op_time,
+        'backoff': backoff,
+        'wall_time': wall_time,
+        'commits': stats.commits,
+        'operations': stats.operations,
+        'restarts': stats.restarts,
+        'aborts': dict(stats.aborts),
+        'commits_per_second': stats.commits / wall_time if wall_time > 0 else 0.0,
+        'abort_rate': sum(stats.aborts.values()) / attempts if attempts else 0.0,
+        'lock_waits': stats.lock_waits,
+        'mean_wait_ms': stats.wait_time * 1000.0 / stats.lock_waits if stats.lock_waits else 0.0,
+        'latency_p50_ms': stats.latency.percentile(0.5),
+        'latency_p99_ms': stats.latency.percentile(0.99),
+        'latch_contention': lock_stats['latch_contended'] / lock_stats['latch_acquisitions'] if lock_stats['latch_acquisitions'] else 0.0,
+        **lock_stats,
+    }
+
+def format_result(result):
+    return (
+        f"{result['mode']:<8} {result['workers']:>7} {result['commits_per_second']:>10.1f} "
+        f"{result['abort_rate']:>7.1%} {result['lock_waits']:>7} {result['mean_wait_ms']:>9.2f} "
+        f"{result['latency_p50_ms']:>8.2f} {result['latency_p99_ms']:>8.2f} "
+        f"{result['latch_acquisitions']:>9} {result['latch_contention']:>8.2%}"
+    )
+
+WORKERS_HEADER = (
+    f"{'Mode':<8} {'Workers':>7} {'Commits/s':>10} {'Aborts':>7} {'Waits':>7} {'Wait ms':>9} "
+    f"{'p50 ms':>8} {'p99 ms':>8} {'Latches':>9} {'Contended':>8}"
+)
+
+def parse_worker_counts(text):
+    counts = [int(part) for part in text.split(",") if part.strip()]
+    if not counts or min(counts) < 1:
+        raise ValueError("--workers needs a comma separated list of positive counts")
+    return counts
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Run concurrent thread or asyncio workers against a shared lock manager")
+    parser.add_argument("--mode", action="append", choices=WORKER_MODES, help="worker kind (repeatable, default: thread)")
+    parser.add_argument("--workers", default="1,2,4,8", help="comma separated worker counts to run")
+    parser.add_argument("--buckets", type=int, default=64, help="lock table buckets, each guarded by its own latch")
+    parser.add_argument("--deadlock-policy", choices=DEADLOCK_POLICIES, default="detection")
+    parser.add_argument("--victim-policy", choices=sorted(VICTIM_POLICIES), default="youngest", help="deadlock victim selection for detection")
+    parser.add_argument("--op-time", type=float, default=0.0, help="seconds each operation sleeps while holding its locks")
+    parser.add_argument("--max-restarts", type=int, default=None, help="give up on a transaction after this many restarts")
+    parser.add_argument("--backoff", choices=BACKOFF_POLICIES, default="immediate", help="delay policy before restarting an aborted transaction")
+    parser.add_argument("--backoff-base", type=float, default=0.001, help="first exponential backoff delay in seconds; doubled on every further restart")
+    parser.add_argument("--backoff-cap", type=float, default=1.0, help="upper bound of the exponential backoff delay in seconds")
+    parser.add_argument("--workload", choices=list(BENCHMARK_WORKLOADS), default="high_contention")
+    parser.add_argument("--transactions", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="write results as JSON to this file")
+    return parser
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    worker_counts = parse_worker_counts(args.workers)
+    config = WorkloadConfig(num_transactions=args.transactions, seed=args.seed, **BENCHMARK_WORKLOADS[args.workload])
+    initial_data_items, transactions = generate_workload(config)
+
+    print(WORKERS_HEADER)
+    results = []
+    for mode in args.mode or ["thread"]:
+        for workers in worker_counts:
+            result = run_workers(
+                mode,
+                initial_data_items,
+                transactions,
+                workers,
+                buckets=args.buckets,
+                deadlock_policy=args.deadlock_policy,
+                victim_policy=args.victim_policy,
+                op_time=args.op_time,
+                max_restarts=args.max_restarts,
+                backoff=args.backoff,
+                backoff_base=args.backoff_base,
+                backoff_cap=args.backoff_cap,
+                seed=args.seed,
+            )
+            results.append(result)
+            print(format_result(result), flush=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({'workload': args.workload, 'config': config.as_dict(), 'buckets': args.buckets, 'results': results}, output_file, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
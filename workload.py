@@ -0,0 +1,175 @@
+import bisect
+import functools
+import gc
+import itertools
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from concurrency import Transaction, LazyTransaction
+
+KEY_DISTRIBUTIONS = ('uniform', 'zipf', 'hotspot')
+LENGTH_DISTRIBUTIONS = ('fixed', 'uniform', 'geometric')
+OPERATION_TYPES = ('read', 'write', 'request_lock')
+
+class WorkloadConfig:
+    def __init__(self, num_items=1000, num_transactions=1000, key_distribution='zipf', zipf_theta=0.99,
+                 hotspot_fraction=0.1, hotspot_probability=0.9, read_ratio=0.8, lock_request_ratio=0.0,
+                 txn_length=5, length_distribution='fixed', max_txn_length=None, value_range=1000, seed=None):
+        if key_distribution not in KEY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown key distribution: {key_distribution}")
+        if length_distribution not in LENGTH_DISTRIBUTIONS:
+            raise ValueError(f"Unknown transaction length distribution: {length_distribution}")
+        if num_items < 1 or txn_length < 1:
+            raise ValueError("A workload needs at least one data item and one operation per transaction.")
+        self.num_items = num_items
+        self.num_transactions = num_transactions
+        self.key_distribution = key_distribution
+        self.zipf_theta = zipf_theta
+        self.hotspot_fraction = hotspot_fraction
+        self.hotspot_probability = hotspot_probability
+        self.read_ratio = read_ratio
+        self.lock_request_ratio = lock_request_ratio
+        self.txn_length = txn_length
+        self.length_distribution = length_distribution
+        self.max_txn_length = max_txn_length if max_txn_length is not None else txn_length * 4
+        self.value_range = value_range
+        self.seed = seed
+
+    def as_dict(self):
+        return dict(vars(self))
+
+def item_names(num_items):
+    return [f"D{i}" for i in range(num_items)]
+
+def generate_workload(config):
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        if np is not None:
+            return _generate_with_numpy(config)
+        return _generate_with_random(config)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+def _hot_count(config):
+    return min(config.num_items, max(1, int(config.num_items * config.hotspot_fraction)))
+
+def _generate_with_numpy(config):
+    rng = np.random.default_rng(config.seed)
+    names = np.array(item_names(config.num_items), dtype=object)
+    initial_data_items = dict(zip(names.tolist(), rng.integers(0, config.value_range, config.num_items).tolist()))
+
+    n = config.num_transactions
+    if config.length_distribution == 'fixed':
+        lengths = np.full(n, config.txn_length, dtype=np.int64)
+    elif config.length_distribution == 'uniform':
+        lengths = rng.integers(1, 2 * config.txn_length, n, endpoint=False)
+    else:
+        lengths = rng.geometric(1.0 / config.txn_length, n)
+    lengths = np.clip(lengths, 1, config.max_txn_length)
+    total = int(lengths.sum())
+
+    if config.key_distribution == 'uniform':
+        keys = rng.integers(0, config.num_items, total)
+    elif config.key_distribution == 'zipf':
+        weights = 1.0 / np.power(np.arange(1, config.num_items + 1, dtype=np.float64), config.zipf_theta)
+        cdf = np.cumsum(weights)
+        keys = np.searchsorted(cdf, rng.random(total) * cdf[-1], side='right')
+        keys = np.minimum(keys, config.num_items - 1)
+    else:
+        hot = _hot_count(config)
+        is_hot = rng.random(total) < config.hotspot_probability
+        if hot < config.num_items:
+            keys = np.where(is_hot, rng.integers(0, hot, total), rng.integers(hot, config.num_items, total))
+        else:
+            keys = rng.integers(0, hot, total)
+
+    is_lock_request = rng.random(total) < config.lock_request_ratio
+    is_read = rng.random(total) < config.read_ratio
+    op_codes = np.where(is_lock_request, 2, np.where(is_read, 0, 1))
+    op_types = np.array(OPERATION_TYPES, dtype=object)[op_codes]
+
+    values = rng.integers(0, config.value_range, total).astype(object)
+    values[is_read & ~is_lock_request] = None
+    values[is_lock_request] = np.where(is_read[is_lock_request], 'S', 'X')
+
+    operations = list(zip(op_types.tolist(), names[keys].tolist(), values.tolist()))
+    offsets = np.concatenate(([0], np.cumsum(lengths))).tolist()
+
+    transactions = [
+        Transaction(f"T{i + 1}", operations[offsets[i]:offsets[i + 1]])
+        for i in range(n)
+    ]
+    return initial_data_items, transactions
+
+def _key_picker(config):
+    if config.key_distribution == 'zipf':
+        cdf = list(itertools.accumulate(1.0 / (rank ** config.zipf_theta) for rank in range(1, config.num_items + 1)))
+        return lambda rng: min(bisect.bisect_right(cdf, rng.random() * cdf[-1]), config.num_items - 1)
+    if config.key_distribution == 'hotspot':
+        hot = _hot_count(config)
+        if hot < config.num_items:
+            return lambda rng: rng.randrange(hot) if rng.random() < config.hotspot_probability else rng.randrange(hot, config.num_items)
+        return lambda rng: rng.randrange(hot)
+    return lambda rng: rng.randrange(config.num_items)
+
+def _transaction_operations(config, names, pick_key, rng):
+    if config.length_distribution == 'fixed':
+        length = config.txn_length
+    elif config.length_distribution == 'uniform':
+        length = rng.randrange(1, 2 * config.txn_length)
+    else:
+        length = 1
+        while rng.random() > 1.0 / config.txn_length:
+            length += 1
+    length = max(1, min(length, config.max_txn_length))
+
+    for _ in range(length):
+        name = names[pick_key(rng)]
+        is_read = rng.random() < config.read_ratio
+        if rng.random() < config.lock_request_ratio:
+            yield ('request_lock', name, 'S' if is_read else 'X')
+        elif is_read:
+            yield ('read', name, None)
+        else:
+            yield ('write', name, rng.randrange(config.value_range))
+
+def _generate_with_random(config):
+    rng = random.Random(config.seed)
+    names = item_names(config.num_items)
+    initial_data_items = {name: rng.randrange(config.value_range) for name in names}
+    pick_key = _key_picker(config)
+
+    transactions = [
+        Transaction(f"T{i + 1}", list(_transaction_operations(config, names, pick_key, rng)))
+        for i in range(config.num_transactions)
+    ]
+    return initial_data_items, transactions
+
+def _seeded_operations(config, names, pick_key, seed):
+    return _transaction_operations(config, names, pick_key, random.Random(seed))
+
+class WorkloadStream:
+    def __init__(self, config):
+        self.config = config
+        self.names = item_names(config.num_items)
+        self.pick_key = _key_picker(config)
+        self.base_seed = config.seed if config.seed is not None else random.randrange(1 << 32)
+
+    def __len__(self):
+        return self.config.num_transactions
+
+    def __iter__(self):
+        for i in range(self.config.num_transactions):
+            seed = self.base_seed * 1000003 + i
+            yield LazyTransaction(f"T{i + 1}", functools.partial(_seeded_operations, self.config, self.names, self.pick_key, seed))
+
+def stream_workload(config):
+    rng = random.Random(config.seed)
+    initial_data_items = {name: rng.randrange(config.value_range) for name in item_names(config.num_items)}
+    return initial_data_items, WorkloadStream(config)